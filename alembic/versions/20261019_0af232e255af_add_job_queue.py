@@ -0,0 +1,54 @@
+"""Add job_queue table for the Postgres queue backend
+
+Revision ID: 0af232e255af
+Revises: f4309e1dcd42
+Create Date: 2026-10-19 09:28:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0af232e255af'
+down_revision: Union[str, None] = 'f4309e1dcd42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'job_queue',
+        sa.Column('id', sa.BigInteger(), sa.Identity(always=False), nullable=False),
+        sa.Column('task', sa.String(), nullable=False),
+        sa.Column('args', postgresql.JSONB(astext_type=sa.Text()), server_default='[]', nullable=False),
+        sa.Column('available_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('attempts', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('claimed_by', sa.String(), nullable=True),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('dead_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(
+        'ix_job_queue_available',
+        'job_queue',
+        ['available_at', 'id'],
+        unique=False,
+        postgresql_where=sa.text('dead_at IS NULL'),
+    )
+    # Rows are updated on every claim and heartbeat; vacuum the small,
+    # hot table early so dead tuples do not slow down the claim scan
+    op.execute(
+        "ALTER TABLE job_queue SET (autovacuum_vacuum_scale_factor = 0.01, "
+        "autovacuum_vacuum_threshold = 100)"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_job_queue_available', table_name='job_queue', postgresql_where=sa.text('dead_at IS NULL'))
+    op.drop_table('job_queue')
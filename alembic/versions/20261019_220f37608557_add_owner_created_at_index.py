@@ -0,0 +1,33 @@
+"""Add owner_id/created_at index on job_applications
+
+Revision ID: 220f37608557
+Revises: 0c2aa3b34638
+Create Date: 2026-10-19 09:07:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '220f37608557'
+down_revision: Union[str, None] = '0c2aa3b34638'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_job_applications_owner_id_created_at',
+        'job_applications',
+        ['owner_id', 'created_at'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        'ix_job_applications_owner_id_created_at', table_name='job_applications'
+    )
@@ -0,0 +1,136 @@
+"""Add canonical job URL with a unique index per owner
+
+Revision ID: 2db67e8e94cd
+Revises: b4a3d7e9a1f5
+Create Date: 2026-10-19 10:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+import re
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2db67e8e94cd'
+down_revision: Union[str, None] = 'b4a3d7e9a1f5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 1000
+
+# Frozen copy of app.urls.canonicalize_url as of this revision, so the
+# backfill keeps producing the same values when the app's rules change
+TRACKING_PARAMS = frozenset(
+    {
+        'gclid',
+        'gclsrc',
+        'dclid',
+        'fbclid',
+        'msclkid',
+        'yclid',
+        'twclid',
+        'li_fat_id',
+        'mc_cid',
+        'mc_eid',
+        '_hsenc',
+        '_hsmi',
+        'igshid',
+        'ref_src',
+        'referrer',
+        'trk',
+        'trkinfo',
+        'trackingid',
+        'refid',
+        'gh_src',
+        'lever-source',
+        'lever-origin',
+        'lever-source[]',
+    }
+)
+TRACKING_PREFIXES = ('utm_', 'pk_', 'mtm_')
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+_SLASHES = re.compile(r'/{2,}')
+
+
+def _is_tracking(name: str) -> bool:
+    name = name.lower()
+    return name in TRACKING_PARAMS or name.startswith(TRACKING_PREFIXES)
+
+
+def canonicalize_url(url: str) -> str:
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+
+    host = (parts.hostname or '').lower().rstrip('.')
+    if host.startswith('www.'):
+        host = host[4:]
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+    netloc = host if port in (None, DEFAULT_PORTS.get(scheme)) else f'{host}:{port}'
+
+    path = _SLASHES.sub('/', parts.path).rstrip('/')
+
+    query = urlencode(
+        sorted(
+            (name, value)
+            for name, value in parse_qsl(parts.query, keep_blank_values=True)
+            if not _is_tracking(name)
+        )
+    )
+
+    fragment = parts.fragment if parts.fragment.startswith(('/', '!')) else ''
+    return urlunsplit((scheme, netloc, path, query, fragment))
+
+
+def _backfill() -> None:
+    """
+    Sets canonical_url on existing rows, oldest first. A row whose canonical
+    URL the owner already has keeps NULL, so the unique index can be built
+    and the oldest application stays the one later submissions resolve to.
+    """
+    connection = op.get_bind()
+    rows = connection.execution_options(yield_per=BATCH_SIZE).execute(
+        sa.text('SELECT id, owner_id, job_url FROM job_applications ORDER BY id')
+    )
+    update = sa.text(
+        'UPDATE job_applications SET canonical_url = :canonical_url WHERE id = :id'
+    )
+    seen = set()
+    batch = []
+    for row in rows:
+        canonical_url = canonicalize_url(row.job_url)
+        if (row.owner_id, canonical_url) in seen:
+            continue
+        seen.add((row.owner_id, canonical_url))
+        batch.append({'id': row.id, 'canonical_url': canonical_url})
+        if len(batch) >= BATCH_SIZE:
+            connection.execute(update, batch)
+            batch = []
+    if batch:
+        connection.execute(update, batch)
+
+
+def upgrade() -> None:
+    op.add_column(
+        'job_applications', sa.Column('canonical_url', sa.String(), nullable=True)
+    )
+    _backfill()
+    op.create_index(
+        'uq_job_applications_owner_id_canonical_url',
+        'job_applications',
+        ['owner_id', 'canonical_url'],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        'uq_job_applications_owner_id_canonical_url', table_name='job_applications'
+    )
+    op.drop_column('job_applications', 'canonical_url')
@@ -0,0 +1,30 @@
+"""Add version column to user profiles
+
+Revision ID: 5d40ec04c84a
+Revises: ec133cf1c056
+Create Date: 2026-10-19 09:49:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d40ec04c84a'
+down_revision: Union[str, None] = 'ec133cf1c056'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Version counter for optimistic locking and JSON Patch If-Match checks
+    op.add_column(
+        'user_profiles',
+        sa.Column('version', sa.Integer(), server_default='1', nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('user_profiles', 'version')
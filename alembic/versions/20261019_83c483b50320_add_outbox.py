@@ -0,0 +1,43 @@
+"""Add outbox table for the Celery dispatch relay
+
+Revision ID: 83c483b50320
+Revises: 0af232e255af
+Create Date: 2026-10-19 09:35:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '83c483b50320'
+down_revision: Union[str, None] = '0af232e255af'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'outbox',
+        sa.Column('id', sa.BigInteger(), sa.Identity(always=False), nullable=False),
+        sa.Column('task', sa.String(), nullable=False),
+        sa.Column('args', postgresql.JSONB(astext_type=sa.Text()), server_default='[]', nullable=False),
+        sa.Column('attempts', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    # Every row is inserted once and deleted once; vacuum early so the relay's
+    # ORDER BY id scan does not wade through dead tuples
+    op.execute(
+        "ALTER TABLE outbox SET (autovacuum_vacuum_scale_factor = 0.01, "
+        "autovacuum_vacuum_threshold = 100)"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('outbox')
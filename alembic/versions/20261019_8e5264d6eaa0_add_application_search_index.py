@@ -0,0 +1,42 @@
+"""Add trigram search index on job_applications
+
+Revision ID: 8e5264d6eaa0
+Revises: 5d40ec04c84a
+Create Date: 2026-10-19 09:56:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e5264d6eaa0'
+down_revision: Union[str, None] = '5d40ec04c84a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Must match models.application_search_text for queries to use the index
+SEARCH_TEXT = (
+    "lower(coalesce(extracted_company_name, '') || ' ' || "
+    "coalesce(extracted_job_title, '') || ' ' || job_url)"
+)
+
+
+def upgrade() -> None:
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    # GIN operator class for owner_id, so it can join the trigram index
+    op.execute('CREATE EXTENSION IF NOT EXISTS btree_gin')
+    op.execute(
+        'CREATE INDEX ix_job_applications_owner_id_search_trgm '
+        'ON job_applications USING gin '
+        f'(owner_id, {SEARCH_TEXT} gin_trgm_ops)'
+    )
+
+
+def downgrade() -> None:
+    # The extensions stay: other objects may depend on them
+    op.drop_index(
+        'ix_job_applications_owner_id_search_trgm', table_name='job_applications'
+    )
@@ -0,0 +1,50 @@
+"""Add resume_extractions and user_profiles.resume_hash
+
+Revision ID: b4a3d7e9a1f5
+Revises: 8e5264d6eaa0
+Create Date: 2026-10-19 10:03:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b4a3d7e9a1f5'
+down_revision: Union[str, None] = '8e5264d6eaa0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'resume_extractions',
+        sa.Column('content_hash', sa.String(length=64), nullable=False),
+        sa.Column('text', sa.Text(), nullable=False),
+        sa.Column(
+            'sections',
+            postgresql.JSONB(astext_type=sa.Text()),
+            server_default='{}',
+            nullable=False,
+        ),
+        sa.Column('page_count', sa.Integer(), nullable=False),
+        sa.Column(
+            'created_at',
+            sa.DateTime(timezone=True),
+            server_default=sa.text('now()'),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint('content_hash'),
+    )
+    op.add_column(
+        'user_profiles', sa.Column('resume_hash', sa.String(length=64), nullable=True)
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('user_profiles', 'resume_hash')
+    op.drop_table('resume_extractions')
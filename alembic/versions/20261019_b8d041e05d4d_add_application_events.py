@@ -0,0 +1,90 @@
+"""Add partitioned application_events log
+
+Revision ID: b8d041e05d4d
+Revises: 220f37608557
+Create Date: 2026-10-19 09:14:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from datetime import date, datetime, timezone
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8d041e05d4d'
+down_revision: Union[str, None] = '220f37608557'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Monthly partitions created up front; later months are added by
+# app/services/event_partitions.py (Celery beat).
+INITIAL_MONTHS = 3
+
+
+def _add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        CREATE TABLE application_events (
+            id BIGINT GENERATED ALWAYS AS IDENTITY,
+            created_at TIMESTAMP WITH TIME ZONE DEFAULT now() NOT NULL,
+            application_id INTEGER NOT NULL,
+            owner_id INTEGER NOT NULL,
+            from_status jobapplicationstatus,
+            to_status jobapplicationstatus NOT NULL,
+            error_message TEXT,
+            PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+        """
+    )
+    op.create_index(
+        'ix_application_events_application_id_created_at',
+        'application_events',
+        ['application_id', 'created_at'],
+        unique=False,
+    )
+    op.create_index(
+        'ix_application_events_created_at_brin',
+        'application_events',
+        ['created_at'],
+        unique=False,
+        postgresql_using='brin',
+    )
+    # Catches rows outside every monthly partition instead of failing inserts
+    op.execute(
+        "CREATE TABLE application_events_default "
+        "PARTITION OF application_events DEFAULT"
+    )
+    month = datetime.now(timezone.utc).date().replace(day=1)
+    for offset in range(INITIAL_MONTHS):
+        start, end = _add_months(month, offset), _add_months(month, offset + 1)
+        op.execute(
+            f"CREATE TABLE application_events_y{start:%Y}m{start:%m} "
+            f"PARTITION OF application_events "
+            f"FOR VALUES FROM ('{start.isoformat()} 00:00:00+00') "
+            f"TO ('{end.isoformat()} 00:00:00+00')"
+        )
+
+    # Seed the log with each application's current status, dated when the
+    # application was received so the seed rows are not counted as arrivals
+    # in the last hour's throughput; months before the initial partitions
+    # land in the default partition
+    op.execute(
+        """
+        INSERT INTO application_events (created_at, application_id, owner_id, to_status, error_message)
+        SELECT coalesce(created_at, now()), id, owner_id, status, error_message
+        FROM job_applications
+        """
+    )
+
+
+def downgrade() -> None:
+    # Dropping the parent drops every partition with it
+    op.drop_table('application_events')
@@ -0,0 +1,36 @@
+"""Add partial index on waiting job applications
+
+Revision ID: ec133cf1c056
+Revises: 83c483b50320
+Create Date: 2026-10-19 09:42:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'ec133cf1c056'
+down_revision: Union[str, None] = '83c483b50320'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_job_applications_pending_created_at',
+        'job_applications',
+        ['created_at'],
+        unique=False,
+        postgresql_where=sa.text("status IN ('RECEIVED', 'QUEUED')"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        'ix_job_applications_pending_created_at',
+        table_name='job_applications',
+        postgresql_where=sa.text("status IN ('RECEIVED', 'QUEUED')"),
+    )
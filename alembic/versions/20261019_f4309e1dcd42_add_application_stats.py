@@ -0,0 +1,67 @@
+"""Add incremental per-user and per-domain application stats
+
+Revision ID: f4309e1dcd42
+Revises: b8d041e05d4d
+Create Date: 2026-10-19 09:21:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f4309e1dcd42'
+down_revision: Union[str, None] = 'b8d041e05d4d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+STATUS_ENUM = postgresql.ENUM(name='jobapplicationstatus', create_type=False)
+
+# Host of job_url, lowercased and without "www."; matches crud.job_domain()
+DOMAIN_SQL = (
+    "regexp_replace(lower(coalesce(substring(job_url from "
+    "'^[a-zA-Z][a-zA-Z0-9+.-]*://(?:[^@/?#]*@)?([^/:?#]+)'), '')), '^www\\.', '')"
+)
+
+
+def upgrade() -> None:
+    op.create_table(
+        'user_application_stats',
+        sa.Column('owner_id', sa.Integer(), nullable=False),
+        sa.Column('status', STATUS_ENUM, nullable=False),
+        sa.Column('count', sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint('owner_id', 'status'),
+    )
+    op.create_table(
+        'domain_application_stats',
+        sa.Column('owner_id', sa.Integer(), nullable=False),
+        sa.Column('domain', sa.String(), nullable=False),
+        sa.Column('status', STATUS_ENUM, nullable=False),
+        sa.Column('count', sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint('owner_id', 'domain', 'status'),
+    )
+
+    # Backfill from the current applications
+    op.execute(
+        """
+        INSERT INTO user_application_stats (owner_id, status, count)
+        SELECT owner_id, status, count(*) FROM job_applications
+        GROUP BY owner_id, status
+        """
+    )
+    op.execute(
+        f"""
+        INSERT INTO domain_application_stats (owner_id, domain, status, count)
+        SELECT owner_id, {DOMAIN_SQL}, status, count(*) FROM job_applications
+        GROUP BY 1, 2, 3
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('domain_application_stats')
+    op.drop_table('user_application_stats')
@@ -9,7 +9,7 @@ from sqlalchemy.orm import Session
 
 from . import crud, models, schemas
 from .config import settings
-from .database import get_db
+from .database import get_db, get_read_db
 
 # Password Hashing Context
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -47,7 +47,9 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
 
 
 async def get_current_user(
-    token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_read_db),
+    primary_db: Session = Depends(get_db),
 ) -> models.User:
     """
     Dependency to get the current user from a JWT token.
@@ -70,6 +72,9 @@ async def get_current_user(
         raise credentials_exception
 
     user = crud.get_user_by_email(db, email=token_data.email)
+    if user is None and db is not primary_db:
+        # Registered moments ago and not replicated yet
+        user = crud.get_user_by_email(primary_db, email=token_data.email)
     if user is None:
         raise credentials_exception
     # Optional: Check if user is active
@@ -1,8 +1,99 @@
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from sqlalchemy import (
+    BigInteger,
+    Text,
+    cast,
+    func,
+    insert,
+    literal,
+    literal_column,
+    or_,
+    select,
+    update,
+)
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session, aliased, defer
+from sqlalchemy.orm.exc import StaleDataError
+from typing import Iterator, List, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
 from pydantic import HttpUrl  # Import HttpUrl
 
 from . import models, schemas, auth  # Import auth for password hashing
+from .urls import canonicalize_url
+
+
+def _row_version(model):
+    """
+    Postgres row version (xmin) of the given model's table, as a bigint.
+    xmin changes on every UPDATE, so it catches changes updated_at alone can miss.
+    """
+    xmin = literal_column(f"{model.__tablename__}.xmin")
+    return cast(cast(xmin, Text), BigInteger)
+
+
+# Columns selected by the read paths that skip ORM object construction.
+# Keep these in sync with schemas.UserProfile / schemas.JobApplication.
+USER_PROFILE_COLUMNS = (
+    models.UserProfile.id,
+    models.UserProfile.user_id,
+    models.UserProfile.version,
+    models.UserProfile.first_name,
+    models.UserProfile.last_name,
+    models.UserProfile.phone,
+    models.UserProfile.address,
+    models.UserProfile.linkedin_url,
+    models.UserProfile.portfolio_url,
+    models.UserProfile.resume_path,
+    models.UserProfile.work_experience,
+    models.UserProfile.education,
+    models.UserProfile.skills,
+    models.UserProfile.common_qna,
+    models.UserProfile.created_at,
+    models.UserProfile.updated_at,
+)
+
+JOB_APPLICATION_COLUMNS = (
+    models.JobApplication.id,
+    models.JobApplication.owner_id,
+    models.JobApplication.job_url,
+    models.JobApplication.status,
+    models.JobApplication.submission_timestamp,
+    models.JobApplication.extracted_job_title,
+    models.JobApplication.extracted_company_name,
+    models.JobApplication.error_message,
+    models.JobApplication.created_at,
+    models.JobApplication.updated_at,
+)
+
+# Listing columns by field name, for fields= selection
+JOB_APPLICATION_FIELDS = {column.key: column for column in JOB_APPLICATION_COLUMNS}
+# Unbounded text, loaded only when asked for
+JOB_APPLICATION_HEAVY_FIELDS = ("error_message",)
+JOB_APPLICATION_SUMMARY_FIELDS = tuple(
+    name for name in JOB_APPLICATION_FIELDS if name not in JOB_APPLICATION_HEAVY_FIELDS
+)
+
+# Applications no worker has started on yet
+PENDING_STATUSES = (
+    models.JobApplicationStatus.RECEIVED,
+    models.JobApplicationStatus.QUEUED,
+)
+
+# Outcomes counted by the success rate in the stats endpoint
+SUCCESS_STATUSES = (models.JobApplicationStatus.SUBMITTED,)
+FAILURE_STATUSES = (
+    models.JobApplicationStatus.PARSING_FAILED,
+    models.JobApplicationStatus.FILLING_FAILED,
+    models.JobApplicationStatus.SUBMISSION_FAILED,
+)
+
+
+def job_domain(job_url: str) -> str:
+    """Host of a job URL as used by the per-domain stats (lowercase, no www.)."""
+    host = (urlsplit(job_url).hostname or "").lower()
+    return host[4:] if host.startswith("www.") else host
+
 
 # --- User CRUD ---
 
@@ -42,6 +133,117 @@ def get_user_profile(db: Session, user_id: int) -> Optional[models.UserProfile]:
     )
 
 
+def get_user_profile_row(db: Session, user_id: int) -> Optional[Row]:
+    """Gets a user's profile as a plain column row (no ORM object)."""
+    return (
+        db.query(*USER_PROFILE_COLUMNS)
+        .filter(models.UserProfile.user_id == user_id)
+        .first()
+    )
+
+
+def get_user_resume_path(db: Session, user_id: int) -> Optional[str]:
+    """Gets only the resume_path of a user's profile."""
+    return (
+        db.query(models.UserProfile.resume_path)
+        .filter(models.UserProfile.user_id == user_id)
+        .scalar()
+    )
+
+
+def get_resume_extraction(
+    db: Session, content_hash: str
+) -> Optional[models.ResumeExtraction]:
+    return db.get(models.ResumeExtraction, content_hash)
+
+
+def save_resume_extraction(
+    db: Session, content_hash: str, text: str, sections: dict, page_count: int
+) -> None:
+    """Stores an extraction; a concurrent extraction of the same file wins."""
+    db.execute(
+        pg_insert(models.ResumeExtraction)
+        .values(
+            content_hash=content_hash,
+            text=text,
+            sections=sections,
+            page_count=page_count,
+        )
+        .on_conflict_do_nothing(index_elements=["content_hash"])
+    )
+    db.commit()
+
+
+def set_user_resume_hash(
+    db: Session, user_id: int, resume_uri: str, content_hash: str
+) -> bool:
+    """
+    Links the extraction of resume_uri to the user's profile, if that is still
+    the profile's resume. Returns whether the profile was updated.
+    """
+    result = db.execute(
+        update(models.UserProfile)
+        .where(
+            models.UserProfile.user_id == user_id,
+            models.UserProfile.resume_path == resume_uri,
+        )
+        .values(resume_hash=content_hash, version=models.UserProfile.version + 1)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return result.rowcount > 0
+
+
+def _user_profile_version_columns():
+    return (
+        models.UserProfile.id,
+        _row_version(models.UserProfile),
+        models.UserProfile.updated_at,
+        models.UserProfile.version,
+    )
+
+
+def get_user_profile_version(db: Session, user_id: int) -> Optional[Tuple]:
+    """
+    Returns (id, row version, updated_at, version) of a user's profile without
+    loading the JSONB columns, for ETag computation.
+    """
+    return (
+        db.query(*_user_profile_version_columns())
+        .filter(models.UserProfile.user_id == user_id)
+        .first()
+    )
+
+
+def patch_user_profile(
+    db: Session, user_id: int, expected_version: int, values: dict, conditions: list
+) -> Optional[Tuple]:
+    """
+    Applies compiled patch expressions (see services/profile_patch.py) in one
+    UPDATE, if the profile is still at expected_version and every condition
+    holds. Returns the new (id, row version, updated_at, version), or None
+    when nothing was updated; the JSONB documents are never read back.
+    """
+    where = (
+        models.UserProfile.user_id == user_id,
+        models.UserProfile.version == expected_version,
+        *conditions,
+    )
+    if not values:
+        # Only "test" operations: check them without writing
+        matched = db.query(models.UserProfile.id).filter(*where).first()
+        return get_user_profile_version(db, user_id) if matched else None
+    row = db.execute(
+        update(models.UserProfile)
+        .where(*where)
+        .values(**values, version=models.UserProfile.version + 1)
+        .returning(*_user_profile_version_columns())
+        .execution_options(synchronize_session=False)
+    ).first()
+    db.commit()
+    return row
+
+
 def create_user_profile(
     db: Session, profile: schemas.UserProfileCreate, user_id: int
 ) -> models.UserProfile:
@@ -62,20 +264,45 @@ def create_user_profile(
 
 
 def update_user_profile(
-    db: Session, profile_update: schemas.UserProfileUpdate, user_id: int
+    db: Session,
+    profile_update: schemas.UserProfileUpdate,
+    user_id: int,
+    commit: bool = True,
 ) -> Optional[models.UserProfile]:
-    db_profile = get_user_profile(db, user_id)
-    if db_profile:
-        update_data = profile_update.model_dump(exclude_unset=True)
+    """
+    With commit=False the update is only flushed, so the caller can add to the
+    transaction before committing; call it before anything else is staged,
+    since a concurrent patch rolls the session back and retries.
+    """
+    update_data = profile_update.model_dump(exclude_unset=True)
+    for attempt in range(2):
+        db_profile = get_user_profile(db, user_id)
+        if not db_profile:
+            return None
+        new_resume_path = update_data.get("resume_path", db_profile.resume_path)
+        if new_resume_path != db_profile.resume_path:
+            # The extracted text belongs to the previous file
+            db_profile.resume_hash = None
         for key, value in update_data.items():
             # Convert HttpUrl to string before setting attribute
             if isinstance(value, HttpUrl):
                 setattr(db_profile, key, str(value))
             else:
                 setattr(db_profile, key, value)
-        db.commit()
+        try:
+            if commit:
+                db.commit()
+            else:
+                db.flush()
+        except StaleDataError:
+            # Patched concurrently (version changed); whole-field updates
+            # simply apply on top of the newer version
+            db.rollback()
+            if attempt:
+                raise
+            continue
         db.refresh(db_profile)
-    return db_profile
+        return db_profile
 
 
 # --- JobApplication CRUD ---
@@ -95,12 +322,77 @@ def get_job_application(
     )
 
 
+def get_job_application_version(
+    db: Session, application_id: int, owner_id: int
+) -> Optional[Tuple]:
+    """Returns (id, row version, updated_at) of an application owned by the user."""
+    return (
+        db.query(
+            models.JobApplication.id,
+            _row_version(models.JobApplication),
+            models.JobApplication.updated_at,
+        )
+        .filter(
+            models.JobApplication.id == application_id,
+            models.JobApplication.owner_id == owner_id,
+        )
+        .first()
+    )
+
+
+def get_job_application_created_at(
+    db: Session, application_id: int, owner_id: int
+) -> Optional[Row]:
+    """Returns (created_at,) of an application owned by the user, or None."""
+    return (
+        db.query(models.JobApplication.created_at)
+        .filter(
+            models.JobApplication.id == application_id,
+            models.JobApplication.owner_id == owner_id,
+        )
+        .first()
+    )
+
+
+def get_job_applications_version(
+    db: Session, owner_id: int, skip: int = 0, limit: int = 100
+) -> Tuple:
+    """
+    Returns a version of one page of a user's applications, the rows that
+    get_job_application_rows_by_user returns for skip/limit:
+    (row count, md5 of the page's ids and row versions).
+    Any insert, delete or update that changes the page changes the digest,
+    and only the page is read, however many applications the user has.
+    """
+    page = (
+        select(
+            models.JobApplication.id.label("id"),
+            _row_version(models.JobApplication).label("version"),
+        )
+        .where(models.JobApplication.owner_id == owner_id)
+        .order_by(models.JobApplication.created_at.desc())
+        .offset(skip)
+        .limit(limit)
+        .subquery()
+    )
+    entry = cast(page.c.id, Text) + ":" + cast(page.c.version, Text)
+    return db.execute(
+        select(
+            func.count(),
+            func.md5(
+                func.string_agg(entry, aggregate_order_by(literal(","), page.c.id))
+            ),
+        )
+    ).one()
+
+
 def get_job_applications_by_user(
     db: Session, owner_id: int, skip: int = 0, limit: int = 100
 ) -> List[models.JobApplication]:
-    """Gets all applications for a specific user."""
+    """Gets all applications for a specific user (error_message loads on access)."""
     return (
         db.query(models.JobApplication)
+        .options(defer(models.JobApplication.error_message))
         .filter(models.JobApplication.owner_id == owner_id)
         .order_by(models.JobApplication.created_at.desc())
         .offset(skip)
@@ -109,10 +401,121 @@ def get_job_applications_by_user(
     )
 
 
+def get_job_application_rows_by_user(
+    db: Session,
+    owner_id: int,
+    skip: int = 0,
+    limit: int = 100,
+    fields: Sequence[str] = JOB_APPLICATION_SUMMARY_FIELDS,
+) -> List[Row]:
+    """
+    Gets a page of a user's applications as plain column rows (no ORM objects),
+    selecting only the given JOB_APPLICATION_FIELDS.
+    """
+    return (
+        db.query(*(JOB_APPLICATION_FIELDS[name] for name in fields))
+        .filter(models.JobApplication.owner_id == owner_id)
+        .order_by(models.JobApplication.created_at.desc())
+        .offset(skip)
+        .limit(limit)
+        .all()
+    )
+
+
+def iter_job_application_rows(
+    db: Session,
+    owner_id: int,
+    fields: Sequence[str] = tuple(JOB_APPLICATION_FIELDS),
+    batch_size: int = 1000,
+) -> Iterator[List[Row]]:
+    """
+    Yields all of a user's applications, oldest first, in lists of up to
+    batch_size rows. The rows come from a server-side cursor (yield_per), so
+    memory use does not depend on how many applications the user has.
+    """
+    result = db.execute(
+        select(*(JOB_APPLICATION_FIELDS[name] for name in fields))
+        .where(models.JobApplication.owner_id == owner_id)
+        .order_by(models.JobApplication.created_at, models.JobApplication.id)
+        .execution_options(yield_per=batch_size)
+    )
+    yield from result.partitions()
+
+
+def _like_pattern(term: str) -> str:
+    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def search_job_application_rows(
+    db: Session, owner_id: int, query: str, min_similarity: float, limit: int = 20
+) -> List[Row]:
+    """
+    Finds a user's applications whose company name, job title or URL contains
+    the query, or a word close to it (pg_trgm word similarity of at least
+    min_similarity), best matches first. Returns plain column rows with a
+    "score" between 0 and 1.
+
+    Both conditions are answered by the GIN trigram index on
+    (owner_id, models.application_search_text), so the cost follows the
+    number of matches rather than the number of applications.
+    """
+    term = query.strip().lower()
+    search_text = models.application_search_text(
+        models.JobApplication.extracted_company_name,
+        models.JobApplication.extracted_job_title,
+        models.JobApplication.job_url,
+    )
+    # Threshold of the <% operator, for this transaction only
+    db.execute(
+        select(
+            func.set_config(
+                "pg_trgm.word_similarity_threshold", str(min_similarity), True
+            )
+        )
+    )
+    score = func.word_similarity(term, search_text)
+    return (
+        db.query(*JOB_APPLICATION_COLUMNS, score.label("score"))
+        .filter(
+            models.JobApplication.owner_id == owner_id,
+            or_(
+                search_text.like(_like_pattern(term)),
+                literal(term).op("<%")(search_text),
+            ),
+        )
+        .order_by(score.desc(), models.JobApplication.created_at.desc())
+        .limit(limit)
+        .all()
+    )
+
+
+def get_job_application_by_canonical_url(
+    db: Session, owner_id: int, canonical_url: str
+) -> Optional[models.JobApplication]:
+    """The owner's application for a posting, whatever form its URL was sent in."""
+    return (
+        db.query(models.JobApplication)
+        .filter(
+            models.JobApplication.owner_id == owner_id,
+            models.JobApplication.canonical_url == canonical_url,
+        )
+        .first()
+    )
+
+
 def create_job_application(
-    db: Session, application: schemas.JobApplicationCreate, owner_id: int
+    db: Session,
+    application: schemas.JobApplicationCreate,
+    owner_id: int,
+    commit: bool = True,
 ) -> models.JobApplication:
-    """Creates a new job application."""
+    """
+    Creates a new job application. With commit=False the row is only flushed,
+    so the caller can add more work (e.g. enqueue its job) to the transaction.
+    Raises IntegrityError if the owner already has an application for the
+    same canonical URL.
+    """
     application_data = application.model_dump()
     # Convert HttpUrl to string before creating the model instance
     if "job_url" in application_data and isinstance(
@@ -122,29 +525,244 @@ def create_job_application(
 
     db_application = models.JobApplication(
         **application_data,
+        canonical_url=canonicalize_url(application_data["job_url"]),
         owner_id=owner_id,
         status=models.JobApplicationStatus.RECEIVED  # Initial status
     )
     db.add(db_application)
-    db.commit()
-    db.refresh(db_application)
+    db.flush()
+    _record_application_event(
+        db, db_application, None, models.JobApplicationStatus.RECEIVED
+    )
+    _bump_application_stats(
+        db, db_application, None, models.JobApplicationStatus.RECEIVED
+    )
+    if commit:
+        db.commit()
+        db.refresh(db_application)
     return db_application
 
 
+def _record_application_event(
+    db: Session,
+    application: models.JobApplication,
+    from_status: Optional[models.JobApplicationStatus],
+    to_status: models.JobApplicationStatus,
+    error_message: Optional[str] = None,
+) -> None:
+    """
+    Appends a status transition to application_events in the caller's
+    transaction. A plain INSERT without RETURNING: nothing is read back.
+    """
+    db.execute(
+        insert(models.ApplicationEvent).values(
+            application_id=application.id,
+            owner_id=application.owner_id,
+            from_status=from_status,
+            to_status=to_status,
+            error_message=error_message,
+        )
+    )
+
+
+def _bump_application_stats(
+    db: Session,
+    application: models.JobApplication,
+    from_status: Optional[models.JobApplicationStatus],
+    to_status: models.JobApplicationStatus,
+) -> None:
+    """
+    Moves one application from from_status to to_status in the per-user and
+    per-domain counters, with one upsert per table in the caller's transaction.
+    """
+    deltas = [(to_status, 1)]
+    if from_status is not None:
+        deltas.append((from_status, -1))
+    # Touch counter rows in a fixed order so concurrent transitions can't deadlock
+    deltas.sort(key=lambda delta: delta[0].value)
+    targets = (
+        (models.UserApplicationStat, {"owner_id": application.owner_id}),
+        (
+            models.DomainApplicationStat,
+            {
+                "owner_id": application.owner_id,
+                "domain": job_domain(application.job_url),
+            },
+        ),
+    )
+    for model, key in targets:
+        stmt = pg_insert(model).values(
+            [{**key, "status": s, "count": delta} for s, delta in deltas]
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[*key, "status"],
+            set_={"count": model.count + stmt.excluded.count},
+        )
+        db.execute(stmt)
+
+
+def get_application_status_counts(db: Session, owner_id: int) -> List[Row]:
+    """(status, count) rows for a user, read from the incremental counters."""
+    return (
+        db.query(models.UserApplicationStat.status, models.UserApplicationStat.count)
+        .filter(
+            models.UserApplicationStat.owner_id == owner_id,
+            models.UserApplicationStat.count > 0,
+        )
+        .all()
+    )
+
+
+def get_pending_application_count(db: Session) -> int:
+    """Applications waiting for a worker, across all users, from the counters."""
+    total = (
+        db.query(func.sum(models.UserApplicationStat.count))
+        .filter(models.UserApplicationStat.status.in_(PENDING_STATUSES))
+        .scalar()
+    )
+    return int(total or 0)
+
+
+def get_application_status_totals(db: Session) -> List[Row]:
+    """(status, count) rows across all users, read from the counters."""
+    return (
+        db.query(
+            models.UserApplicationStat.status,
+            func.sum(models.UserApplicationStat.count).label("count"),
+        )
+        .group_by(models.UserApplicationStat.status)
+        .all()
+    )
+
+
+def get_oldest_pending_application_created_at(db: Session):
+    """created_at of the longest-waiting RECEIVED/QUEUED application, or None."""
+    return (
+        db.query(func.min(models.JobApplication.created_at))
+        .filter(models.JobApplication.status.in_(PENDING_STATUSES))
+        .scalar()
+    )
+
+
+def get_recent_throughput(db: Session, since, run_since) -> Row:
+    """
+    (received, finished, avg_run_seconds) from the events since a point in
+    time. A run lasts from its PROCESSING event to the event that left
+    PROCESSING; run_since bounds how far back the start is searched, so only
+    recent partitions are read.
+    """
+    event = models.ApplicationEvent
+    started = aliased(models.ApplicationEvent)
+    run_started_at = (
+        db.query(func.max(started.created_at))
+        .filter(
+            started.application_id == event.application_id,
+            started.to_status == models.JobApplicationStatus.PROCESSING,
+            started.created_at >= run_since,
+            started.created_at <= event.created_at,
+        )
+        .correlate(event)
+        .scalar_subquery()
+    )
+    finished = event.from_status == models.JobApplicationStatus.PROCESSING
+    return (
+        db.query(
+            func.count().filter(event.from_status.is_(None)).label("received"),
+            func.count().filter(finished).label("finished"),
+            func.avg(
+                func.extract("epoch", event.created_at - run_started_at)
+            ).filter(finished).label("avg_run_seconds"),
+        )
+        .filter(event.created_at >= since)
+        .one()
+    )
+
+
+def get_application_domain_stats(
+    db: Session, owner_id: int, limit: int = 20
+) -> List[Row]:
+    """(domain, total, submitted, failed) rows for a user's busiest domains."""
+    stat = models.DomainApplicationStat
+    total = func.sum(stat.count)
+    return (
+        db.query(
+            stat.domain,
+            total.label("total"),
+            func.coalesce(
+                func.sum(stat.count).filter(stat.status.in_(SUCCESS_STATUSES)), 0
+            ).label("submitted"),
+            func.coalesce(
+                func.sum(stat.count).filter(stat.status.in_(FAILURE_STATUSES)), 0
+            ).label("failed"),
+        )
+        .filter(stat.owner_id == owner_id)
+        .group_by(stat.domain)
+        .having(total > 0)
+        .order_by(total.desc(), stat.domain)
+        .limit(limit)
+        .all()
+    )
+
+
+def get_application_event_rows(
+    db: Session, application_id: int, since=None, limit: int = 500
+) -> List[Row]:
+    """
+    Status history of one application, oldest first. Pass the application's
+    created_at as since, so Postgres skips partitions from before it existed.
+    """
+    query = db.query(
+        models.ApplicationEvent.id,
+        models.ApplicationEvent.application_id,
+        models.ApplicationEvent.from_status,
+        models.ApplicationEvent.to_status,
+        models.ApplicationEvent.error_message,
+        models.ApplicationEvent.created_at,
+    ).filter(models.ApplicationEvent.application_id == application_id)
+    if since is not None:
+        query = query.filter(models.ApplicationEvent.created_at >= since)
+    return (
+        query.order_by(
+            models.ApplicationEvent.created_at, models.ApplicationEvent.id
+        )
+        .limit(limit)
+        .all()
+    )
+
+
 def update_job_application_status(
     db: Session,
     application_id: int,
     status: models.JobApplicationStatus,
     error_message: Optional[str] = None,
+    only_from: Optional[Tuple[models.JobApplicationStatus, ...]] = None,
+    commit: bool = True,
 ) -> Optional[models.JobApplication]:
-    """Updates the status and optionally an error message of a job application."""
-    db_application = (
-        db.query(models.JobApplication)
-        .filter(models.JobApplication.id == application_id)
-        .first()
+    """
+    Updates the status and optionally an error message of a job application.
+    With only_from, the row is locked and only updated from one of those
+    statuses; returns None otherwise, so concurrent callers cannot both win.
+    With commit=False the change is only flushed, for the caller to commit.
+    """
+    query = db.query(models.JobApplication).filter(
+        models.JobApplication.id == application_id
     )
+    if only_from is not None:
+        query = query.populate_existing().with_for_update()
+    db_application = query.first()
+    if db_application and only_from is not None:
+        if db_application.status not in only_from:
+            db.rollback()
+            return None
     if db_application:
+        previous_status = db_application.status
         db_application.status = status
+        if previous_status != status or error_message:
+            _record_application_event(
+                db, db_application, previous_status, status, error_message
+            )
+        if previous_status != status:
+            _bump_application_stats(db, db_application, previous_status, status)
         if error_message:
             db_application.error_message = error_message
         # Potentially update submission timestamp if status is SUBMITTED
@@ -155,8 +773,11 @@ def update_job_application_status(
                 datetime.utcnow()
             )  # Or use timezone aware if needed
 
-        db.commit()
-        db.refresh(db_application)
+        if commit:
+            db.commit()
+            db.refresh(db_application)
+        else:
+            db.flush()
     return db_application
 
 
@@ -1,3 +1,4 @@
+from fastapi import Depends, Request
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
@@ -13,6 +14,18 @@ engine = create_engine(settings.DATABASE_URL)
 # Create a configured "Session" class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Optional read replica for GET traffic (see services/replica.py)
+replica_engine = (
+    create_engine(settings.DATABASE_REPLICA_URL, pool_pre_ping=True)
+    if settings.DATABASE_REPLICA_URL
+    else None
+)
+ReplicaSessionLocal = (
+    sessionmaker(autocommit=False, autoflush=False, bind=replica_engine)
+    if replica_engine is not None
+    else None
+)
+
 # Create a Base class for our models to inherit from
 Base = declarative_base()
 
@@ -24,3 +37,46 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+# Only safe requests may read from the replica. Write routes share the auth
+# dependency (get_read_db) with reads, and their user must come from the
+# primary session they write with.
+REPLICA_METHODS = ("GET", "HEAD")
+
+
+def _reads_from_replica(request: Request) -> bool:
+    if request.method not in REPLICA_METHODS:
+        return False
+    from .services import replica
+    from .tokens import bearer_subject
+
+    subject = bearer_subject(request.headers.get("authorization", ""))
+    return replica.use_replica(replica_engine, subject)
+
+
+def get_read_db(request: Request, db=Depends(get_db)):
+    """
+    Session for read-only work: for GET and HEAD requests, a replica session
+    when the replica is fresh enough and the user has not just written;
+    otherwise the request's primary session (shared with get_db, and only
+    connected if it is used).
+    """
+    if not _reads_from_replica(request):
+        yield db
+        return
+    read_db = ReplicaSessionLocal()
+    try:
+        yield read_db
+    finally:
+        read_db.close()
+
+
+def new_read_session(request: Request):
+    """
+    A session of its own, routed like get_read_db, for reads that outlive the
+    request handler (streamed responses). The caller must close it.
+    """
+    if _reads_from_replica(request):
+        return ReplicaSessionLocal()
+    return SessionLocal()
@@ -0,0 +1,67 @@
+import hashlib
+from typing import Any
+
+from fastapi import Request, Response, status
+
+# Clients must revalidate on every request, but may reuse the cached body on a 304.
+CACHE_CONTROL = "private, no-cache"
+
+# CompressionMiddleware tags compressed representations as "<etag>-<encoding>".
+_ENCODING_SUFFIXES = ('-gzip"', '-br"')
+
+
+def make_etag(*parts: Any) -> str:
+    """Builds a strong ETag from the values that identify a representation."""
+    digest = hashlib.sha1("|".join(str(part) for part in parts).encode()).hexdigest()
+    return f'"{digest}"'
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    """Checks the request's If-None-Match header against the current ETag."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison (RFC 9110, section 13.1.2).
+    return any(
+        _strip_encoding(candidate.strip().removeprefix("W/")) == etag
+        for candidate in header.split(",")
+    )
+
+
+def precondition_failed(request: Request, etag: str) -> bool:
+    """
+    Checks the request's If-Match header: True when it is present and names
+    neither the current ETag nor "*". If-Match uses strong comparison, but the
+    compressed variants of a tag still denote the same representation.
+    """
+    header = request.headers.get("if-match")
+    if not header or header.strip() == "*":
+        return False
+    return all(
+        candidate.strip().startswith("W/")
+        or _strip_encoding(candidate.strip()) != etag
+        for candidate in header.split(",")
+    )
+
+
+def _strip_encoding(tag: str) -> str:
+    for suffix in _ENCODING_SUFFIXES:
+        if tag.endswith(suffix):
+            return tag[: -len(suffix)] + '"'
+    return tag
+
+
+def not_modified(etag: str) -> Response:
+    """Returns an empty 304 response for the given ETag."""
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": etag, "Cache-Control": CACHE_CONTROL},
+    )
+
+
+def set_etag(response: Response, etag: str) -> None:
+    """Attaches the ETag and revalidation headers to a full response."""
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
@@ -1,5 +1,8 @@
 from fastapi import FastAPI
 
+from .config import settings
+from .middleware import CompressionMiddleware, RateLimitMiddleware
+
 # Import database components - uncomment create_all if needed for initial setup
 # from .database import engine, Base
 # from . import models # Ensure models are imported so Base knows about them
@@ -8,6 +11,7 @@ from fastapi import FastAPI
 from .routers import auth as auth_router
 from .routers import profile as profile_router
 from .routers import applications as applications_router
+from .routers import metrics as metrics_router
 
 # models.Base.metadata.create_all(bind=engine)
 
@@ -18,12 +22,29 @@ app = FastAPI(
     version="0.1.0",
 )
 
+# Negotiated brotli/gzip compression for larger payloads (listings, profiles)
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+    gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+    brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+)
+
+# Submission rate limits and backlog admission control; added last so it runs
+# first and turns requests away before any other work
+app.add_middleware(
+    RateLimitMiddleware,
+    paths=[p.strip() for p in settings.RATE_LIMIT_PATHS.split(",") if p.strip()],
+    trust_forwarded=settings.RATE_LIMIT_TRUST_FORWARDED,
+)
+
 # Include routers
 app.include_router(auth_router.router, prefix="/auth", tags=["Authentication"])
 app.include_router(profile_router.router, prefix="/api/profile", tags=["User Profile"])
 app.include_router(
     applications_router.router, prefix="/api/applications", tags=["Job Applications"]
 )
+app.include_router(metrics_router.router, prefix="/metrics", tags=["Metrics"])
 
 
 # Root endpoint
@@ -0,0 +1,300 @@
+import zlib
+from typing import Dict, Iterable, Optional
+
+import anyio
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .services import rate_limit
+from .tokens import bearer_subject
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+
+# Content types worth compressing; PDFs, images and archives are sent as-is.
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+)
+
+
+class _GzipCompressor:
+    def __init__(self, level: int):
+        # 16 + MAX_WBITS writes a gzip header/trailer instead of raw zlib.
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class _BrotliCompressor:
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """
+    Picks "br" or "gzip" from an Accept-Encoding header, honouring q-values.
+    Brotli wins ties when the brotli package is installed.
+    """
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        weights[name] = quality
+
+    wildcard = weights.get("*", 0.0)
+    candidates = ["br", "gzip"] if brotli is not None else ["gzip"]
+    best, best_quality = None, 0.0
+    for encoding in candidates:
+        quality = weights.get(encoding, wildcard)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def _compressible(message: Message) -> bool:
+    """
+    Whether the response of an http.response.start message is one that gets
+    compressed for clients accepting it. 304s count: they stand for the body
+    the client holds.
+    """
+    if message["status"] == 304:
+        return True
+    headers = Headers(raw=message["headers"])
+    content_type = headers.get("content-type", "")
+    return not (
+        "content-encoding" in headers
+        or content_type.startswith("text/event-stream")
+        or not content_type.startswith(COMPRESSIBLE_TYPES)
+    )
+
+
+class CompressionMiddleware:
+    """
+    Compresses responses with brotli or gzip, negotiated via Accept-Encoding.
+
+    Bodies smaller than ``minimum_size`` are sent as-is, as are responses that
+    already carry a Content-Encoding, are server-sent event streams or have a
+    content type that does not compress well. Every response that would be
+    compressed for some client carries Vary: Accept-Encoding, whether or not
+    it was compressed for this one, so shared caches keep the variants apart.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(
+            Headers(scope=scope).get("accept-encoding", "")
+        )
+        if encoding is None:
+
+            async def send_with_vary(message: Message) -> None:
+                if message["type"] == "http.response.start" and _compressible(message):
+                    MutableHeaders(raw=message["headers"]).add_vary_header(
+                        "Accept-Encoding"
+                    )
+                await send(message)
+
+            await self.app(scope, receive, send_with_vary)
+            return
+
+        if encoding == "br":
+            compressor = _BrotliCompressor(self.brotli_quality)
+        else:
+            compressor = _GzipCompressor(self.gzip_level)
+        responder = _CompressionResponder(
+            self.app, encoding, compressor, self.minimum_size
+        )
+        await responder(scope, receive, send)
+
+
+class _CompressionResponder:
+    def __init__(
+        self, app: ASGIApp, encoding: str, compressor, minimum_size: int
+    ) -> None:
+        self.app = app
+        self.encoding = encoding
+        self.compressor = compressor
+        self.minimum_size = minimum_size
+        self.send: Send = None
+        self.initial_message: Message = None
+        self.started = False
+        self.passthrough = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.send = send
+        await self.app(scope, receive, self.send_with_compression)
+
+    async def send_with_compression(self, message: Message) -> None:
+        message_type = message["type"]
+        if message_type == "http.response.start":
+            # Hold the start message until the first body chunk tells us the size.
+            self.initial_message = message
+            self.passthrough = not _compressible(message)
+            if not self.passthrough:
+                MutableHeaders(raw=message["headers"]).add_vary_header(
+                    "Accept-Encoding"
+                )
+            return
+
+        if message_type != "http.response.body" or self.passthrough:
+            # e.g. http.response.pathsend: the server sends the file itself.
+            await self._start()
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if not self.started:
+            if not more_body and len(body) < self.minimum_size:
+                if self.initial_message["status"] == 304:
+                    # Echo the tag of the compressed representation the client holds.
+                    self._tag_etag(MutableHeaders(raw=self.initial_message["headers"]))
+                await self._start()
+                await self.send(message)
+                self.passthrough = True
+                return
+
+            headers = MutableHeaders(raw=self.initial_message["headers"])
+            headers["Content-Encoding"] = self.encoding
+            self._tag_etag(headers)
+            if not more_body:
+                body = self.compressor.compress(body) + self.compressor.finish()
+                headers["Content-Length"] = str(len(body))
+                await self._start()
+                await self.send({"type": "http.response.body", "body": body})
+                return
+            del headers["Content-Length"]
+            await self._start()
+
+        chunk = self.compressor.compress(body)
+        if not more_body:
+            chunk += self.compressor.finish()
+        await self.send(
+            {"type": "http.response.body", "body": chunk, "more_body": more_body}
+        )
+
+    def _tag_etag(self, headers: MutableHeaders) -> None:
+        etag = headers.get("etag")
+        if etag and etag.endswith('"') and not etag.startswith("W/"):
+            # A different byte representation needs a different strong tag.
+            headers["ETag"] = f'{etag[:-1]}-{self.encoding}"'
+
+    async def _start(self) -> None:
+        if not self.started:
+            self.started = True
+            await self.send(self.initial_message)
+
+
+class RateLimitMiddleware:
+    """
+    Turns away POSTs to the given paths with 429 and Retry-After when the
+    worker backlog or the client's submission rate is over its limit
+    (see services/rate_limit.py). Admitted requests that end in an error
+    response are refunded.
+    """
+
+    def __init__(
+        self, app: ASGIApp, paths: Iterable[str], trust_forwarded: bool = False
+    ) -> None:
+        self.app = app
+        self.paths = frozenset(paths)
+        self.trust_forwarded = trust_forwarded
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["method"] != "POST"
+            or scope["path"] not in self.paths
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        subject = bearer_subject(headers.get("authorization", ""))
+        client_ip = self._client_ip(scope, headers)
+        member = rate_limit.new_member()
+        # Redis and the backlog query are blocking calls
+        rejection = await anyio.to_thread.run_sync(
+            rate_limit.admit, subject, client_ip, member
+        )
+        if rejection is None:
+            # Lets the route refund the charge (rate_limit.refund_request)
+            scope.setdefault("state", {})[rate_limit.CHARGE_STATE] = (
+                subject,
+                client_ip,
+                member,
+            )
+            response_status = None
+
+            async def send_with_status(message: Message) -> None:
+                nonlocal response_status
+                if message["type"] == "http.response.start":
+                    response_status = message["status"]
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_status)
+            finally:
+                # Rejected (401, 422, ...) or failed requests start no run
+                if response_status is None or response_status >= 400:
+                    await anyio.to_thread.run_sync(
+                        rate_limit.refund, subject, client_ip, member
+                    )
+            return
+        response = JSONResponse(
+            {"detail": rejection.detail},
+            status_code=429,
+            headers={"Retry-After": str(rejection.retry_after)},
+        )
+        await response(scope, receive, send)
+
+    def _client_ip(self, scope: Scope, headers: Headers) -> Optional[str]:
+        if self.trust_forwarded:
+            forwarded = headers.get("x-forwarded-for", "")
+            if forwarded:
+                return forwarded.split(",")[0].strip()
+        client = scope.get("client")
+        return client[0] if client else None
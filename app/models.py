@@ -1,6 +1,8 @@
 import enum
 from sqlalchemy import (
+    BigInteger,
     Column,
+    Identity,
     Integer,
     String,
     Boolean,
@@ -9,6 +11,7 @@ from sqlalchemy import (
     Text,
     JSON,
     Enum,
+    Index,
 )
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -64,6 +67,9 @@ class UserProfile(Base):
     linkedin_url = Column(String, nullable=True)
     portfolio_url = Column(String, nullable=True)
     resume_path = Column(String, nullable=True)  # Path/reference to stored resume
+    # SHA-256 of the resume file, i.e. its resume_extractions row; NULL until
+    # the upload's extraction has run
+    resume_hash = Column(String(64), nullable=True)
 
     # Using JSONB for structured but flexible data
     work_experience = Column(JSONB, nullable=True)  # List of work experiences
@@ -71,11 +77,31 @@ class UserProfile(Base):
     skills = Column(JSONB, nullable=True)  # List or object of skills
     common_qna = Column(JSONB, nullable=True)  # {"question_hash": "answer"}
 
+    # Optimistic concurrency: bumped by every update (the ORM does it through
+    # version_id_col, JSON Patch updates in their UPDATE) and part of the ETag
+    version = Column(Integer, nullable=False, server_default="1")
+
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
     user = relationship("User", back_populates="profile")
 
+    __mapper_args__ = {"version_id_col": version}
+
+
+def application_search_text(company_name, job_title, job_url):
+    """
+    The lowercased text matched by application search. The trigram index is
+    on this exact expression, so queries must build it the same way to use it.
+    """
+    return func.lower(
+        func.coalesce(company_name, "")
+        + " "
+        + func.coalesce(job_title, "")
+        + " "
+        + job_url
+    )
+
 
 class JobApplication(Base):
     __tablename__ = "job_applications"
@@ -83,6 +109,9 @@ class JobApplication(Base):
     id = Column(Integer, primary_key=True, index=True)
     owner_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     job_url = Column(String, nullable=False, index=True)
+    # urls.canonicalize_url(job_url): one application per posting and owner.
+    # NULL only for rows whose URL duplicated an older one at backfill time.
+    canonical_url = Column(String, nullable=True)
     status = Column(
         Enum(JobApplicationStatus),
         default=JobApplicationStatus.RECEIVED,
@@ -98,6 +127,174 @@ class JobApplication(Base):
 
     owner = relationship("User", back_populates="applications")
 
-    # Consider adding a unique constraint for (owner_id, job_url) if needed
-    # from sqlalchemy import UniqueConstraint
-    # __table_args__ = (UniqueConstraint('owner_id', 'job_url', name='_owner_job_uc'),)
+    __table_args__ = (
+        # Serves the per-user listing (ordered by created_at) and its ETag aggregate
+        Index("ix_job_applications_owner_id_created_at", "owner_id", "created_at"),
+        # Oldest waiting application for the autoscaling signal; only holds the
+        # few rows not yet picked up by a worker
+        Index(
+            "ix_job_applications_pending_created_at",
+            "created_at",
+            postgresql_where=status.in_(
+                [JobApplicationStatus.RECEIVED, JobApplicationStatus.QUEUED]
+            ),
+        ),
+        # Search within one user's applications: btree_gin lets owner_id share
+        # the GIN index with the trigrams, so both filters use one index scan
+        Index(
+            "ix_job_applications_owner_id_search_trgm",
+            "owner_id",
+            application_search_text(
+                extracted_company_name, extracted_job_title, job_url
+            ).label("search_text"),
+            postgresql_using="gin",
+            postgresql_ops={"search_text": "gin_trgm_ops"},
+        ),
+        # Resubmitting a posting returns the existing application (see the
+        # submit route), also when two submissions race
+        Index(
+            "uq_job_applications_owner_id_canonical_url",
+            "owner_id",
+            "canonical_url",
+            unique=True,
+        ),
+    )
+
+
+class ApplicationEvent(Base):
+    """
+    Append-only log of application status transitions.
+
+    Range-partitioned by month on created_at (see services/event_partitions.py),
+    so old months are dropped as whole partitions instead of being deleted
+    and vacuumed. There is deliberately no foreign key: inserts stay cheap and
+    history outlives the application row.
+    """
+
+    __tablename__ = "application_events"
+
+    id = Column(BigInteger, Identity(always=True), primary_key=True)
+    # Part of the primary key because Postgres requires the partition key in it
+    created_at = Column(
+        DateTime(timezone=True), server_default=func.now(), primary_key=True
+    )
+    application_id = Column(Integer, nullable=False)
+    owner_id = Column(Integer, nullable=False)
+    from_status = Column(
+        Enum(JobApplicationStatus, create_type=False), nullable=True
+    )  # NULL for the creation event
+    to_status = Column(Enum(JobApplicationStatus, create_type=False), nullable=False)
+    error_message = Column(Text, nullable=True)
+
+    __table_args__ = (
+        Index(
+            "ix_application_events_application_id_created_at",
+            "application_id",
+            "created_at",
+        ),
+        # Events arrive in time order, so a tiny BRIN index serves time-range scans
+        Index(
+            "ix_application_events_created_at_brin",
+            "created_at",
+            postgresql_using="brin",
+        ),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+
+
+class UserApplicationStat(Base):
+    """
+    Number of a user's applications currently in each status.
+    Maintained incrementally by crud on every status transition.
+    """
+
+    __tablename__ = "user_application_stats"
+
+    owner_id = Column(Integer, primary_key=True)
+    status = Column(Enum(JobApplicationStatus, create_type=False), primary_key=True)
+    count = Column(BigInteger, nullable=False, default=0)
+
+
+class DomainApplicationStat(Base):
+    """Like UserApplicationStat, broken down by the job URL's host."""
+
+    __tablename__ = "domain_application_stats"
+
+    owner_id = Column(Integer, primary_key=True)
+    domain = Column(String, primary_key=True)
+    status = Column(Enum(JobApplicationStatus, create_type=False), primary_key=True)
+    count = Column(BigInteger, nullable=False, default=0)
+
+
+class JobQueueItem(Base):
+    """
+    Pending work for the Postgres queue backend (QUEUE_BACKEND=postgres).
+
+    A row is available once available_at has passed. Claiming pushes
+    available_at forward by the visibility timeout, so work held by a crashed
+    worker becomes claimable again; finished work is deleted.
+    """
+
+    __tablename__ = "job_queue"
+
+    id = Column(BigInteger, Identity(), primary_key=True)
+    task = Column(String, nullable=False)
+    args = Column(JSONB, nullable=False, server_default="[]")
+    available_at = Column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+    attempts = Column(Integer, nullable=False, server_default="0")
+    claimed_by = Column(String, nullable=True)
+    last_error = Column(Text, nullable=True)
+    dead_at = Column(DateTime(timezone=True), nullable=True)  # Out of attempts
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        # The claim query: live rows in availability order
+        Index(
+            "ix_job_queue_available",
+            "available_at",
+            "id",
+            postgresql_where=dead_at.is_(None),
+        ),
+    )
+
+
+class OutboxMessage(Base):
+    """
+    A task message waiting to be published to the Celery broker.
+
+    Written in the same transaction as the change that needs the task, and
+    deleted by the relay (worker/outbox.py) once the broker has accepted it.
+    """
+
+    __tablename__ = "outbox"
+
+    id = Column(BigInteger, Identity(), primary_key=True)  # Publish order
+    task = Column(String, nullable=False)
+    args = Column(JSONB, nullable=False, server_default="[]")
+    attempts = Column(Integer, nullable=False, server_default="0")
+    last_error = Column(Text, nullable=True)
+    created_at = Column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+
+
+class ResumeExtraction(Base):
+    """
+    Text and sections extracted from a resume PDF (services/resume_text.py).
+
+    Keyed by the SHA-256 of the file, so the same file is extracted once no
+    matter how often it is uploaded, and applications read it from here
+    instead of parsing the PDF.
+    """
+
+    __tablename__ = "resume_extractions"
+
+    content_hash = Column(String(64), primary_key=True)
+    text = Column(Text, nullable=False)
+    sections = Column(JSONB, nullable=False, server_default="{}")
+    page_count = Column(Integer, nullable=False)
+    created_at = Column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
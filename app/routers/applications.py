@@ -1,12 +1,27 @@
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    status,
+    BackgroundTasks,
+    Header,
+    Request,
+    Response,
+)
+from fastapi.responses import StreamingResponse
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional, Tuple
 
-from .. import crud, schemas, models, auth
-from ..database import get_db
+from .. import crud, schemas, models, auth, etags, serializers
+from ..config import settings
+from ..database import get_db, get_read_db, new_read_session
+from ..services import idempotency, rate_limit, replica
+from ..urls import canonicalize_url
 
-# Import the placeholder task - adjust path if needed when worker is fully defined
-from ..worker.tasks import process_application_placeholder
+# Tasks are enqueued by name so the API never imports the worker's task modules
+# (and with them browser_use, LangChain and the Gemini client).
+from ..worker import dispatch
 
 router = APIRouter()
 
@@ -17,6 +32,9 @@ router = APIRouter()
 async def submit_job_application(
     application_in: schemas.JobApplicationCreate,
     background_tasks: BackgroundTasks,  # Use BackgroundTasks for simple cases, or integrate Celery directly
+    request: Request,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
     db: Session = Depends(get_db),
     current_user: models.User = Depends(auth.get_current_active_user),
 ):
@@ -24,26 +42,92 @@ async def submit_job_application(
     Submit a new job application URL.
     - Creates a JobApplication record with RECEIVED status.
     - Adds a background task to process the application.
+    - If an Idempotency-Key header is sent, retries with the same key return the
+      original application instead of creating and dispatching a new one.
+    - A URL for a posting the user already submitted (same canonical URL, see
+      urls.py) returns that application with 200. No new run is started while
+      it is pending or after it succeeded; a failed application is queued
+      again.
     """
-    # Optional: Check if the user has already submitted this exact URL
-    # existing_app = db.query(models.JobApplication).filter(
-    #     models.JobApplication.owner_id == current_user.id,
-    #     models.JobApplication.job_url == str(application_in.job_url) # Ensure URL comparison is robust
-    # ).first()
-    # if existing_app:
-    #     raise HTTPException(
-    #         status_code=status.HTTP_409_CONFLICT,
-    #         detail="Application for this URL already submitted."
-    #     )
-
-    # Create the application entry in the database
-    db_application = crud.create_job_application(
-        db=db, application=application_in, owner_id=current_user.id
+    request_fingerprint = None
+    if idempotency_key:
+        if len(idempotency_key) > idempotency.MAX_KEY_LENGTH:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Idempotency-Key header is too long.",
+            )
+        request_fingerprint = idempotency.fingerprint(str(application_in.job_url))
+        record = idempotency.reserve(
+            current_user.id, idempotency_key, request_fingerprint
+        )
+        if record is not None:
+            # A replay starts no run, so it does not count against the rate limit
+            rate_limit.refund_request(request)
+            return _replay_idempotent_submission(
+                record, request_fingerprint, response, db, current_user
+            )
+
+    # A posting already submitted (in any URL form) is not run again
+    canonical_url = canonicalize_url(str(application_in.job_url))
+    existing = crud.get_job_application_by_canonical_url(
+        db, owner_id=current_user.id, canonical_url=canonical_url
     )
+    if existing is not None:
+        return _existing_application(
+            request,
+            db,
+            existing,
+            response,
+            idempotency_key,
+            request_fingerprint,
+            current_user,
+        )
+
+    try:
+        # Create the application entry in the database
+        db_application = crud.create_job_application(
+            db=db, application=application_in, owner_id=current_user.id, commit=False
+        )
+        # Queue processing as part of the same transaction (see worker/dispatch.py)
+        dispatch.enqueue_application(db, db_application.id)
+        db.commit()
+        db.refresh(db_application)
+    except IntegrityError:
+        # A concurrent submission of the same posting won the unique index
+        db.rollback()
+        existing = crud.get_job_application_by_canonical_url(
+            db, owner_id=current_user.id, canonical_url=canonical_url
+        )
+        if existing is None:
+            if idempotency_key:
+                idempotency.release(current_user.id, idempotency_key)
+            raise
+        return _existing_application(
+            request,
+            db,
+            existing,
+            response,
+            idempotency_key,
+            request_fingerprint,
+            current_user,
+        )
+    except Exception:
+        if idempotency_key:
+            # Let the client retry with the same key instead of waiting for expiry.
+            idempotency.release(current_user.id, idempotency_key)
+        raise
+
+    # The user's next reads (e.g. the listing) must include this application
+    replica.mark_recent_write(current_user.email)
 
-    # Trigger the background task (Celery integration)
-    # Use .delay() for Celery tasks
-    process_application_placeholder.delay(db_application.id)
+    if idempotency_key:
+        idempotency.complete(
+            current_user.id,
+            idempotency_key,
+            request_fingerprint,
+            application_id=db_application.id,
+            status_code=status.HTTP_201_CREATED,
+        )
 
     # Alternatively, using FastAPI's BackgroundTasks for simpler, non-distributed tasks:
     # background_tasks.add_task(process_application_placeholder, db_application.id)
@@ -53,32 +137,290 @@ async def submit_job_application(
     return db_application
 
 
-@router.get("/", response_model=List[schemas.JobApplication])
+def _existing_application(
+    request: Request,
+    db: Session,
+    db_application: models.JobApplication,
+    response: Response,
+    idempotency_key: Optional[str],
+    request_fingerprint: Optional[str],
+    current_user: models.User,
+) -> models.JobApplication:
+    """
+    Answers a resubmitted posting with its application (200). A pending or
+    finished application is returned as is; a failed one is moved back to
+    RECEIVED and queued again, in one transaction.
+    """
+    requeued = None
+    if db_application.status in crud.FAILURE_STATUSES:
+        requeued = crud.update_job_application_status(
+            db,
+            db_application.id,
+            models.JobApplicationStatus.RECEIVED,
+            only_from=crud.FAILURE_STATUSES,
+            commit=False,
+        )
+        # None: a concurrent resubmission already requeued it
+        if requeued is not None:
+            requeued.error_message = None
+            dispatch.enqueue_application(db, requeued.id)
+            db.commit()
+            db.refresh(requeued)
+            replica.mark_recent_write(current_user.email)
+            db_application = requeued
+    if requeued is None:
+        # No run was started, so the submission does not count against the limit
+        rate_limit.refund_request(request)
+    response.status_code = status.HTTP_200_OK
+    if idempotency_key:
+        idempotency.complete(
+            current_user.id,
+            idempotency_key,
+            request_fingerprint,
+            application_id=db_application.id,
+            status_code=status.HTTP_200_OK,
+        )
+    return db_application
+
+
+def _replay_idempotent_submission(
+    record: idempotency.IdempotencyRecord,
+    request_fingerprint: str,
+    response: Response,
+    db: Session,
+    current_user: models.User,
+) -> models.JobApplication:
+    """Builds the response for a submission whose Idempotency-Key was seen before."""
+    if record.fingerprint != request_fingerprint:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Idempotency-Key was already used with a different request.",
+        )
+    if record.is_pending:
+        # The original request is still being processed.
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A request with this Idempotency-Key is already in progress.",
+            headers={"Retry-After": "1"},
+        )
+
+    db_application = crud.get_job_application(
+        db, application_id=record.application_id, owner_id=current_user.id
+    )
+    if db_application is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Job application not found"
+        )
+    response.status_code = record.status_code or status.HTTP_201_CREATED
+    response.headers["Idempotent-Replayed"] = "true"
+    return db_application
+
+
+def _listing_fields(
+    fields: Optional[str],
+    default: Tuple[str, ...] = crud.JOB_APPLICATION_SUMMARY_FIELDS,
+) -> Tuple[str, ...]:
+    """Parses fields=a,b,c into listing columns; "id" is always included."""
+    if fields is None:
+        return default
+    requested = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in requested if name not in crud.JOB_APPLICATION_FIELDS]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(unknown)}. "
+            f"Available: {', '.join(crud.JOB_APPLICATION_FIELDS)}",
+        )
+    return tuple(dict.fromkeys(["id", *requested]))
+
+
+@router.get("/", response_model=List[schemas.JobApplicationSummary])
 def list_job_applications(
+    request: Request,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    fields: Optional[str] = None,
+    db: Session = Depends(get_read_db),
     current_user: models.User = Depends(auth.get_current_active_user),
 ):
     """
     Retrieve a list of job applications submitted by the current user.
+    By default every field except error_message is returned; pass e.g.
+    fields=id,status,extracted_company_name to get only those keys (and
+    fields=...,error_message to include it). Only the selected columns are
+    read from the database.
+    Supports conditional requests via ETag / If-None-Match. Rows are selected
+    as plain columns and rendered with orjson, bypassing response_model
+    validation of ORM objects.
     """
-    applications = crud.get_job_applications_by_user(
+    selected = _listing_fields(fields)
+    version = crud.get_job_applications_version(
         db, owner_id=current_user.id, skip=skip, limit=limit
     )
-    return applications
+    etag = etags.make_etag(
+        "applications", current_user.id, skip, limit, ",".join(selected), *version
+    )
+    if etags.is_not_modified(request, etag):
+        return etags.not_modified(etag)
+
+    rows = crud.get_job_application_rows_by_user(
+        db, owner_id=current_user.id, skip=skip, limit=limit, fields=selected
+    )
+    fast_response = serializers.rows_response(rows)
+    etags.set_etag(fast_response, etag)
+    return fast_response
+
+
+# Declared before /{application_id} so "search" is not parsed as an ID
+@router.get("/search", response_model=List[schemas.JobApplicationSearchResult])
+def search_job_applications(
+    q: str,
+    limit: int = 20,
+    db: Session = Depends(get_read_db),
+    current_user: models.User = Depends(auth.get_current_active_user),
+):
+    """
+    Search the current user's applications by company name, job title or URL.
+    Matches substrings and near spellings ("gogle" finds Google), ranked by
+    trigram similarity, and served by a trigram index instead of scanning
+    every application.
+    """
+    if len(q.strip()) < 2:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Search query must be at least 2 characters.",
+        )
+    rows = crud.search_job_application_rows(
+        db,
+        owner_id=current_user.id,
+        query=q,
+        min_similarity=settings.SEARCH_SIMILARITY_THRESHOLD,
+        limit=max(1, min(limit, settings.SEARCH_MAX_RESULTS)),
+    )
+    return serializers.rows_response(rows)
+
+
+EXPORT_FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv; charset=utf-8"}
+
+
+# Declared before /{application_id} so "export" is not parsed as an ID
+@router.get("/export")
+def export_job_applications(
+    request: Request,
+    format: str = "ndjson",
+    fields: Optional[str] = None,
+    current_user: models.User = Depends(auth.get_current_active_user),
+):
+    """
+    Download all of the current user's applications, oldest first, as NDJSON
+    (one JSON object per line) or CSV. All fields are included unless fields=
+    narrows them.
+    The response is streamed from a server-side cursor in batches of
+    EXPORT_BATCH_SIZE rows, so memory use stays flat however many applications
+    there are, and the first bytes go out before the last row is read. Send
+    Accept-Encoding: gzip to have it compressed on the fly.
+    """
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported format, use one of: {', '.join(EXPORT_FORMATS)}",
+        )
+    selected = _listing_fields(fields, default=tuple(crud.JOB_APPLICATION_FIELDS))
+    # The stream outlives this handler, so it gets a session of its own
+    db = new_read_session(request)
+
+    def batches():
+        try:
+            yield from crud.iter_job_application_rows(
+                db,
+                owner_id=current_user.id,
+                fields=selected,
+                batch_size=settings.EXPORT_BATCH_SIZE,
+            )
+        finally:
+            db.close()
+
+    if format == "csv":
+        chunks = serializers.csv_chunks(batches(), selected)
+    else:
+        chunks = serializers.ndjson_chunks(batches())
+    return StreamingResponse(
+        chunks,
+        media_type=EXPORT_FORMATS[format],
+        headers={
+            "Content-Disposition": f'attachment; filename="applications.{format}"'
+        },
+    )
+
+
+def _success_rate(submitted: int, failed: int) -> Optional[float]:
+    finished = submitted + failed
+    return round(submitted / finished, 4) if finished else None
+
+
+# Declared before /{application_id} so "stats" is not parsed as an ID
+@router.get("/stats", response_model=schemas.ApplicationStats)
+def read_job_application_stats(
+    domain_limit: int = 20,
+    db: Session = Depends(get_read_db),
+    current_user: models.User = Depends(auth.get_current_active_user),
+):
+    """
+    Summary of the current user's applications: counts per status, overall
+    success rate, and per-domain outcomes for the busiest domains. Served from
+    counters maintained on every status transition, so the cost does not grow
+    with the number of applications.
+    """
+    by_status = {
+        row.status.value: int(row.count)
+        for row in crud.get_application_status_counts(db, owner_id=current_user.id)
+    }
+    submitted = sum(by_status.get(s.value, 0) for s in crud.SUCCESS_STATUSES)
+    failed = sum(by_status.get(s.value, 0) for s in crud.FAILURE_STATUSES)
+    domains = [
+        schemas.DomainApplicationStats(
+            domain=row.domain,
+            total=int(row.total),
+            submitted=int(row.submitted),
+            failed=int(row.failed),
+            success_rate=_success_rate(int(row.submitted), int(row.failed)),
+        )
+        for row in crud.get_application_domain_stats(
+            db, owner_id=current_user.id, limit=domain_limit
+        )
+    ]
+    return schemas.ApplicationStats(
+        total=sum(by_status.values()),
+        by_status=by_status,
+        success_rate=_success_rate(submitted, failed),
+        domains=domains,
+    )
 
 
 @router.get("/{application_id}", response_model=schemas.JobApplication)
 def read_job_application(
     application_id: int,
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db),
     current_user: models.User = Depends(auth.get_current_active_user),
 ):
     """
     Retrieve the details of a specific job application by its ID.
     Ensures the application belongs to the current user.
+    Supports conditional requests via ETag / If-None-Match.
     """
+    version = crud.get_job_application_version(
+        db, application_id=application_id, owner_id=current_user.id
+    )
+    if version is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Job application not found"
+        )
+    etag = etags.make_etag("application", *version)
+    if etags.is_not_modified(request, etag):
+        return etags.not_modified(etag)
+
     db_application = crud.get_job_application(
         db, application_id=application_id, owner_id=current_user.id
     )
@@ -86,9 +428,36 @@ def read_job_application(
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Job application not found"
         )
+    etags.set_etag(response, etag)
     return db_application
 
 
+@router.get(
+    "/{application_id}/events", response_model=List[schemas.ApplicationEvent]
+)
+def read_job_application_events(
+    application_id: int,
+    limit: int = 500,
+    db: Session = Depends(get_read_db),
+    current_user: models.User = Depends(auth.get_current_active_user),
+):
+    """
+    Retrieve the status history of a job application, oldest first.
+    Ensures the application belongs to the current user.
+    """
+    application = crud.get_job_application_created_at(
+        db, application_id=application_id, owner_id=current_user.id
+    )
+    if application is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Job application not found"
+        )
+    rows = crud.get_application_event_rows(
+        db, application_id=application_id, since=application.created_at, limit=limit
+    )
+    return serializers.rows_response(rows)
+
+
 # Potential future endpoints:
 # DELETE /{application_id}: Cancel/delete an application (if allowed)
 # POST /{application_id}/review: Endpoint for user to review and confirm submission after automated filling
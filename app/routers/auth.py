@@ -6,6 +6,7 @@ from datetime import timedelta
 from .. import crud, schemas, auth, models
 from ..database import get_db
 from ..config import settings
+from ..services import replica
 
 router = APIRouter()
 
@@ -24,6 +25,8 @@ def register_user(user: schemas.UserCreate, db: Session = Depends(get_db)):
             status_code=status.HTTP_400_BAD_REQUEST, detail="Email already registered"
         )
     new_user = crud.create_user(db=db, user=user)
+    # Keep the new user's first reads (e.g. the empty profile) on the primary
+    replica.mark_recent_write(new_user.email)
     return new_user
 
 
@@ -0,0 +1,56 @@
+import hmac
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from fastapi.responses import PlainTextResponse
+from sqlalchemy.orm import Session
+
+from .. import schemas
+from ..config import settings
+from ..database import get_db
+from ..services import autoscale
+
+router = APIRouter()
+
+
+def require_metrics_token(authorization: Optional[str] = Header(None)) -> None:
+    """
+    Scrapers send METRICS_TOKEN as a bearer token. Without a configured token
+    the endpoints are disabled (404) rather than left open.
+    """
+    if not settings.METRICS_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    expected = f"Bearer {settings.METRICS_TOKEN}"
+    if not authorization or not hmac.compare_digest(authorization, expected):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid metrics token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
+@router.get(
+    "/autoscale",
+    response_model=schemas.AutoscaleSignal,
+    dependencies=[Depends(require_metrics_token)],
+)
+def read_autoscale_signal(db: Session = Depends(get_db)):
+    """
+    Worker demand signal for an external autoscaler: queue depths, waiting and
+    in-flight applications, recent arrival/service rates and a recommended
+    worker count. Cached for AUTOSCALE_CACHE_SECONDS, so it can be polled often.
+    """
+    return autoscale.get_signal(db)
+
+
+@router.get(
+    "",
+    response_class=PlainTextResponse,
+    dependencies=[Depends(require_metrics_token)],
+)
+def read_metrics(db: Session = Depends(get_db)):
+    """The autoscale signal as Prometheus gauges."""
+    return PlainTextResponse(
+        autoscale.to_prometheus(autoscale.get_signal(db)),
+        media_type="text/plain; version=0.0.4",
+    )
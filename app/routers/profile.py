@@ -1,29 +1,62 @@
-from fastapi import APIRouter, Depends, HTTPException, status, File, UploadFile
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    status,
+    File,
+    UploadFile,
+    Request,
+    Response,
+)
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, StreamingResponse
 from sqlalchemy.orm import Session
-from typing import Optional
+from typing import List, Optional
+from datetime import datetime, timedelta, timezone
+import os
+import tempfile
+import time
 
-from .. import crud, schemas, models, auth
-from ..database import get_db
-from ..services.storage import upload_file_to_gcs  # Import the GCS upload service
+from .. import crud, schemas, models, auth, etags, serializers
+from ..config import settings
+from ..database import get_db, get_read_db
+from ..services import profile_patch, replica, storage
+from ..services.storage_backends import UploadTarget, backend_for_uri, get_backend
+from ..worker import dispatch
 
 router = APIRouter()
 
 
 @router.get("/", response_model=schemas.UserProfile)
 def read_user_profile(
-    db: Session = Depends(get_db),
+    request: Request,
+    db: Session = Depends(get_read_db),
     current_user: models.User = Depends(auth.get_current_active_user),
 ):
     """
     Retrieve the profile for the currently authenticated user.
+    Supports conditional requests: a matching If-None-Match returns 304
+    without loading or serializing the profile. Full responses are built
+    straight from the selected columns and rendered with orjson.
     """
-    profile = crud.get_user_profile(db, user_id=current_user.id)
-    if profile is None:
+    version = crud.get_user_profile_version(db, user_id=current_user.id)
+    if version is None:
         # This shouldn't happen if profile is created upon user registration
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="User profile not found"
         )
-    return profile
+    etag = etags.make_etag("profile", *version)
+    if etags.is_not_modified(request, etag):
+        return etags.not_modified(etag)
+
+    profile_row = crud.get_user_profile_row(db, user_id=current_user.id)
+    if profile_row is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="User profile not found"
+        )
+    fast_response = serializers.row_response(profile_row)
+    etags.set_etag(fast_response, etag)
+    return fast_response
 
 
 @router.put("/", response_model=schemas.UserProfile)
@@ -35,7 +68,14 @@ def update_user_profile(
     """
     Update the profile for the currently authenticated user.
     Allows partial updates (PATCH-like behavior with PUT).
+    resume_path may only point into the user's own storage area.
     """
+    resume_path = profile_update.resume_path
+    if resume_path and not storage.is_user_object(resume_path, current_user.id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="resume_path must refer to a resume uploaded by this user.",
+        )
     updated_profile = crud.update_user_profile(
         db, profile_update=profile_update, user_id=current_user.id
     )
@@ -45,6 +85,92 @@ def update_user_profile(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User profile not found, cannot update",
         )
+    replica.mark_recent_write(current_user.email)
+    return updated_profile
+
+
+@router.patch("/", status_code=status.HTTP_204_NO_CONTENT)
+def patch_user_profile(
+    operations: List[schemas.JsonPatchOperation],
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(auth.get_current_active_user),
+):
+    """
+    Apply a JSON Patch (RFC 6902) to the current user's profile, e.g.
+    [{"op": "add", "path": "/skills/-", "value": "Rust"}].
+    The patch runs inside Postgres (jsonb_set, jsonb_insert, #-), so a change
+    to one item of a large document costs the same as any other small update,
+    and nothing is read back: the response is empty, with the new ETag.
+    Send If-Match with the ETag you last saw to reject concurrent changes
+    (412 Precondition Failed). A failed "test" or a missing target path
+    answers 409 Conflict; the patch is applied completely or not at all.
+    """
+    try:
+        values, conditions = profile_patch.compile_patch(operations)
+    except profile_patch.PatchError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e)
+        )
+
+    version = crud.get_user_profile_version(db, user_id=current_user.id)
+    if version is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="User profile not found"
+        )
+    if etags.precondition_failed(request, etags.make_etag("profile", *version)):
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail="Profile has changed since the given ETag",
+        )
+
+    new_version = crud.patch_user_profile(
+        db,
+        user_id=current_user.id,
+        expected_version=version.version,
+        values=values,
+        conditions=conditions,
+    )
+    if new_version is None:
+        current = crud.get_user_profile_version(db, user_id=current_user.id)
+        if current is not None and current.version != version.version:
+            raise HTTPException(
+                status_code=status.HTTP_412_PRECONDITION_FAILED,
+                detail="Profile was modified concurrently",
+            )
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Patch does not apply: a test failed or a target path is missing",
+        )
+
+    replica.mark_recent_write(current_user.email)
+    response = Response(status_code=status.HTTP_204_NO_CONTENT)
+    etags.set_etag(response, etags.make_etag("profile", *new_version))
+    return response
+
+
+def _save_resume_path(
+    db: Session, user_id: int, resume_uri: str
+) -> models.UserProfile:
+    """
+    Saves resume_uri as the profile's resume and queues its text extraction
+    in the same commit. Blocking; the async resume routes run it in the
+    threadpool.
+    """
+    profile_update = schemas.UserProfileUpdate(resume_path=resume_uri)
+    updated_profile = crud.update_user_profile(
+        db, profile_update=profile_update, user_id=user_id, commit=False
+    )
+    if updated_profile is None:
+        # Should not happen if user exists and profile was created
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User profile not found, cannot update resume path.",
+        )
+    # Extract the text once, in the background, for every later application
+    dispatch.enqueue_resume_extraction(db, user_id, resume_uri)
+    db.commit()
+    db.refresh(updated_profile)
     return updated_profile
 
 
@@ -56,7 +182,9 @@ async def upload_user_resume(
 ):
     """
     Upload or replace the resume for the currently authenticated user.
-    The resume is stored in GCS, and the path is saved in the user profile.
+    The resume is stored in the configured storage backend (STORAGE_URI),
+    and its URI is saved in the user profile. Its text is extracted in the
+    background for the automation agent.
     """
     if not resume.content_type or not resume.content_type.startswith("application/pdf"):
         # Example: Restrict to PDF only. Adjust as needed.
@@ -65,32 +193,210 @@ async def upload_user_resume(
             detail="Invalid file type. Only PDF resumes are accepted.",
         )
 
-    # Upload file to GCS
-    gcs_resume_path = await upload_file_to_gcs(file=resume, user_id=current_user.id)
+    # Store the file (upload_resume raises HTTPException on failure)
+    resume_uri = await storage.upload_resume(file=resume, user_id=current_user.id)
+
+    # Update the user profile with the new resume path
+    updated_profile = await run_in_threadpool(
+        _save_resume_path, db, current_user.id, resume_uri
+    )
+    replica.mark_recent_write(current_user.email)
+    return updated_profile
+
 
-    if not gcs_resume_path:
-        # The upload_file_to_gcs function raises HTTPException on failure,
-        # but we add a check here for robustness.
+@router.post("/resume/upload-url", response_model=schemas.ResumeUploadTicket)
+async def create_resume_upload_url(
+    upload_request: schemas.ResumeUploadRequest,
+    request: Request,
+    current_user: models.User = Depends(auth.get_current_active_user),
+):
+    """
+    Start a direct resume upload. Returns a short-lived URL the client uploads
+    the PDF to (a signed bucket URL, so the bytes never pass through the API),
+    plus an upload token to hand to /resume/confirm afterwards. Backends without
+    signed uploads get a token-authorized URL on this API instead.
+    """
+    if not upload_request.content_type.startswith(storage.PDF_CONTENT_TYPE):
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to get GCS path after upload.",
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid file type. Only PDF resumes are accepted.",
+        )
+    if upload_request.size is not None and not (
+        0 < upload_request.size <= settings.RESUME_MAX_BYTES
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Resume must be between 1 byte and {settings.RESUME_MAX_BYTES} bytes.",
         )
+    try:
+        backend = get_backend()
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Storage service is not configured or available.",
+        ) from e
 
-    # Update the user profile with the new resume path
-    profile_update = schemas.UserProfileUpdate(resume_path=gcs_resume_path)
-    updated_profile = crud.update_user_profile(
-        db, profile_update=profile_update, user_id=current_user.id
+    key = storage.new_resume_key(current_user.id)
+    upload_token = storage.create_upload_token(
+        current_user.id, key, storage.PDF_CONTENT_TYPE
+    )
+    # Signing may call the IAM API, so keep it off the event loop
+    target = await backend.run(
+        backend.generate_upload_url,
+        backend.make_uri(key),
+        storage.PDF_CONTENT_TYPE,
+        settings.RESUME_MAX_BYTES,
+        settings.RESUME_UPLOAD_URL_TTL_SECONDS,
+    )
+    if target is None:
+        target = UploadTarget(
+            url=str(request.url_for("upload_resume_with_token", upload_token=upload_token)),
+            method="PUT",
+            headers={"Content-Type": storage.PDF_CONTENT_TYPE},
+        )
+    return schemas.ResumeUploadTicket(
+        upload_url=target.url,
+        method=target.method,
+        headers=target.headers,
+        upload_token=upload_token,
+        expires_at=datetime.now(timezone.utc)
+        + timedelta(seconds=settings.RESUME_UPLOAD_URL_TTL_SECONDS),
     )
 
-    if updated_profile is None:
-        # Should not happen if user exists and profile was created
+
+@router.put(
+    "/resume/uploads/{upload_token}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    name="upload_resume_with_token",
+)
+async def upload_resume_with_token(upload_token: str, request: Request):
+    """
+    Receive a direct upload for backends without signed URLs (local disk).
+    Authorized by the upload token alone, like a signed bucket URL. The body is
+    the raw PDF; it is spooled with a size cap and stored off the event loop.
+    """
+    claims = storage.decode_upload_token(upload_token)
+    if claims is None or claims["upload_until"] < time.time():
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User profile not found, cannot update resume path.",
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Upload URL is invalid or has expired.",
+        )
+    content_type = request.headers.get("content-type", "")
+    if not content_type.startswith(claims["ct"]):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid file type. Only PDF resumes are accepted.",
         )
+    declared_size = request.headers.get("content-length")
+    if (
+        declared_size
+        and declared_size.isdigit()
+        and int(declared_size) > settings.RESUME_MAX_BYTES
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Resume must not exceed {settings.RESUME_MAX_BYTES} bytes.",
+        )
+
+    backend = get_backend()
+    with tempfile.SpooledTemporaryFile(max_size=1024 * 1024) as spool:
+        received = 0
+        async for chunk in request.stream():
+            received += len(chunk)
+            if received > settings.RESUME_MAX_BYTES:
+                raise HTTPException(
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    detail=f"Resume must not exceed {settings.RESUME_MAX_BYTES} bytes.",
+                )
+            spool.write(chunk)
+        spool.seek(0)
+        await backend.run(backend.save, claims["key"], spool, claims["ct"])
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
 
+
+@router.post("/resume/confirm", response_model=schemas.UserProfile)
+async def confirm_resume_upload(
+    confirmation: schemas.ResumeUploadConfirm,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(auth.get_current_active_user),
+):
+    """
+    Finish a direct upload: check the stored object's size, content type and
+    PDF magic bytes, then save its URI as the profile's resume and queue its
+    text extraction. Invalid uploads are deleted.
+    """
+    claims = storage.decode_upload_token(confirmation.upload_token)
+    if claims is None or claims["sub"] != str(current_user.id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Upload token is invalid or has expired.",
+        )
+    backend = get_backend()
+    resume_uri = backend.make_uri(claims["key"])
+    error = await backend.run(storage.validate_stored_resume, backend, resume_uri)
+    if error is not None:
+        await backend.run(backend.delete, resume_uri)
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
+
+    updated_profile = await run_in_threadpool(
+        _save_resume_path, db, current_user.id, resume_uri
+    )
+    replica.mark_recent_write(current_user.email)
     return updated_profile
 
 
+@router.get("/resume")
+def download_user_resume(
+    db: Session = Depends(get_read_db),
+    current_user: models.User = Depends(auth.get_current_active_user),
+):
+    """
+    Download the resume of the currently authenticated user.
+    Files on the local storage backend are handed to the server (X-Accel-Redirect
+    when configured, otherwise FileResponse, which uses pathsend/sendfile where
+    the server supports it); remote objects are streamed in chunks.
+    """
+    resume_uri = crud.get_user_resume_path(db, user_id=current_user.id)
+    if not resume_uri or not storage.is_user_object(resume_uri, current_user.id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="No resume uploaded"
+        )
+
+    backend = backend_for_uri(resume_uri)
+    filename = os.path.basename(resume_uri)
+    local_path = backend.local_path(resume_uri)
+    if local_path is not None:
+        if not os.path.isfile(local_path):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Resume file not found"
+            )
+        if settings.STORAGE_ACCEL_REDIRECT_PREFIX:
+            # nginx serves the file itself with sendfile from an internal location
+            relative_path = os.path.relpath(local_path, backend.root)
+            return Response(
+                headers={
+                    "X-Accel-Redirect": settings.STORAGE_ACCEL_REDIRECT_PREFIX.rstrip("/")
+                    + "/"
+                    + relative_path,
+                    "Content-Disposition": f'attachment; filename="{filename}"',
+                }
+            )
+        return FileResponse(local_path, filename=filename)
+
+    info = backend.stat(resume_uri)
+    if info is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Resume file not found"
+        )
+    return StreamingResponse(
+        backend.iter_bytes(resume_uri),
+        media_type=info.content_type or "application/octet-stream",
+        headers={
+            "Content-Length": str(info.size),
+            "Content-Disposition": f'attachment; filename="{filename}"',
+        },
+    )
+
+
 # Consider adding a PATCH endpoint if strict PATCH semantics are preferred over PUT for partial updates.
 # FastAPI typically handles partial updates gracefully with PUT when using Pydantic models with optional fields.
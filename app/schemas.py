@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr, HttpUrl, Field
-from typing import List, Optional, Dict, Any
+from typing import List, Literal, Optional, Dict, Any
 from datetime import datetime
 import enum
 
@@ -81,9 +81,19 @@ class UserProfileUpdate(UserProfileBase):
     pass
 
 
+class JsonPatchOperation(BaseModel):
+    """One RFC 6902 operation; paths are JSON Pointers into the profile."""
+
+    op: Literal["add", "remove", "replace", "move", "copy", "test"]
+    path: str
+    value: Any = None  # add, replace, test
+    from_: Optional[str] = Field(None, alias="from")  # move, copy
+
+
 class UserProfile(UserProfileBase):
     id: int
     user_id: int
+    version: int = 1  # Incremented on every update; part of the ETag
     created_at: datetime
     updated_at: Optional[datetime] = None
 
@@ -91,6 +101,23 @@ class UserProfile(UserProfileBase):
         from_attributes = True
 
 
+class ResumeUploadRequest(BaseModel):
+    content_type: str = "application/pdf"
+    size: Optional[int] = None  # Declared size in bytes, checked against the limit
+
+
+class ResumeUploadTicket(BaseModel):
+    upload_url: str
+    method: str
+    headers: Dict[str, str]  # Headers the client must send with the upload
+    upload_token: str  # Pass to /resume/confirm once the upload has finished
+    expires_at: datetime
+
+
+class ResumeUploadConfirm(BaseModel):
+    upload_token: str
+
+
 # Update User schema to include profile after UserProfile is defined
 # User.model_rebuild() # Pydantic V2
 # User.update_forward_refs() # Pydantic V1
@@ -114,14 +141,18 @@ class JobApplicationUpdate(BaseModel):
     error_message: Optional[str] = None
 
 
-class JobApplication(JobApplicationBase):
+class JobApplicationSummary(JobApplicationBase):
+    """
+    An application without its heavy columns (error_message), as listed by
+    default. With fields=, the listing returns only the requested keys.
+    """
+
     id: int
     owner_id: int
     status: JobApplicationStatus
     submission_timestamp: Optional[datetime] = None
     extracted_job_title: Optional[str] = None
     extracted_company_name: Optional[str] = None
-    error_message: Optional[str] = None
     created_at: datetime
     updated_at: Optional[datetime] = None
 
@@ -129,3 +160,52 @@ class JobApplication(JobApplicationBase):
         from_attributes = True
         # Pydantic V2 needs this to serialize Enum correctly
         use_enum_values = True
+
+
+class JobApplication(JobApplicationSummary):
+    error_message: Optional[str] = None
+
+
+class JobApplicationSearchResult(JobApplication):
+    score: float  # Trigram word similarity to the query, 0 to 1
+
+
+class ApplicationEvent(BaseModel):
+    id: int
+    application_id: int
+    from_status: Optional[JobApplicationStatus] = None
+    to_status: JobApplicationStatus
+    error_message: Optional[str] = None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+        use_enum_values = True
+
+
+class DomainApplicationStats(BaseModel):
+    domain: str
+    total: int
+    submitted: int
+    failed: int
+    success_rate: Optional[float] = None  # submitted / (submitted + failed)
+
+
+class ApplicationStats(BaseModel):
+    total: int
+    by_status: Dict[str, int]
+    success_rate: Optional[float] = None  # submitted / (submitted + failed)
+    domains: List[DomainApplicationStats]
+
+
+class AutoscaleSignal(BaseModel):
+    queues: Dict[str, int]  # Messages waiting per queue
+    outbox_lag_seconds: Optional[float] = None  # Celery backend only
+    pending_applications: int  # RECEIVED or QUEUED
+    oldest_pending_age_seconds: float
+    in_flight: int  # PROCESSING
+    arrival_rate_per_minute: float
+    service_rate_per_minute: float
+    avg_run_seconds: Optional[float] = None  # None without recent finished runs
+    recommended_workers: int
+    generated_at: datetime
@@ -0,0 +1,70 @@
+import csv
+import enum
+import io
+from datetime import datetime
+from typing import Any, Iterable, Iterator, Optional, Sequence
+
+import orjson
+from fastapi.responses import Response
+from sqlalchemy.engine import Row
+
+# OPT_UTC_Z matches Pydantic's "Z" suffix for UTC datetimes.
+ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+
+class FastJSONResponse(Response):
+    """
+    JSON response rendered with orjson.
+
+    Used by the read paths that build plain dicts straight from column rows,
+    skipping Pydantic validation of ORM objects. orjson handles datetimes and
+    Enum members natively.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=ORJSON_OPTIONS)
+
+
+def rows_response(
+    rows: Iterable[Row], headers: Optional[dict] = None
+) -> FastJSONResponse:
+    """Builds a JSON array response from column-select rows."""
+    return FastJSONResponse([row._asdict() for row in rows], headers=headers)
+
+
+def row_response(row: Row, headers: Optional[dict] = None) -> FastJSONResponse:
+    """Builds a JSON object response from a single column-select row."""
+    return FastJSONResponse(row._asdict(), headers=headers)
+
+
+def ndjson_chunks(batches: Iterable[Iterable[Row]]) -> Iterator[bytes]:
+    """Encodes batches of rows as newline-delimited JSON, one chunk per batch."""
+    options = ORJSON_OPTIONS | orjson.OPT_APPEND_NEWLINE
+    for batch in batches:
+        yield b"".join(orjson.dumps(row._asdict(), option=options) for row in batch)
+
+
+def _csv_value(value: Any) -> Any:
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def csv_chunks(
+    batches: Iterable[Iterable[Row]], fields: Sequence[str]
+) -> Iterator[bytes]:
+    """Encodes batches of rows as CSV with a header line, one chunk per batch."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+    for batch in batches:
+        writer.writerows([_csv_value(value) for value in row] for row in batch)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()  # No rows: just the header
@@ -0,0 +1,152 @@
+"""
+Text-first agent steps with vision on demand.
+
+Most application forms are fully described by browser_use's DOM element list,
+so steps run without the screenshot. A step is sent with the screenshot
+only while the agent is recovering from a failed step, or when the page is
+dominated by canvas/embedded content that the DOM cannot describe.
+"""
+
+import logging
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Share of the viewport covered by <canvas>, <embed> and <object> elements
+CANVAS_COVERAGE_JS = """
+() => {
+  const viewport = Math.max(1, window.innerWidth * window.innerHeight);
+  let area = 0;
+  for (const el of document.querySelectorAll("canvas, embed, object")) {
+    const r = el.getBoundingClientRect();
+    area += Math.max(0, r.width) * Math.max(0, r.height);
+  }
+  return area / viewport;
+}
+"""
+
+# browser_use's own per-screenshot estimate (MessageManagerSettings.image_tokens)
+DEFAULT_IMAGE_TOKENS = 800
+
+
+@dataclass
+class VisionStats:
+    text_steps: int = 0
+    vision_steps: int = 0
+    escalations: int = 0
+    canvas_escalations: int = 0
+    text_seconds: float = 0.0
+    vision_seconds: float = 0.0
+    image_tokens: int = DEFAULT_IMAGE_TOKENS
+
+    @property
+    def estimated_tokens_saved(self) -> int:
+        return self.text_steps * self.image_tokens
+
+    @property
+    def estimated_seconds_saved(self) -> Optional[float]:
+        """Text steps times the measured vision/text step-time difference."""
+        if not self.text_steps or not self.vision_steps:
+            return None
+        per_step = (
+            self.vision_seconds / self.vision_steps
+            - self.text_seconds / self.text_steps
+        )
+        return round(max(0.0, per_step) * self.text_steps, 2)
+
+    def as_dict(self) -> dict:
+        return {
+            "text_steps": self.text_steps,
+            "vision_steps": self.vision_steps,
+            "escalations": self.escalations,
+            "canvas_escalations": self.canvas_escalations,
+            "estimated_tokens_saved": self.estimated_tokens_saved,
+            "estimated_seconds_saved": self.estimated_seconds_saved,
+        }
+
+
+class AdaptiveVision:
+    """
+    Wraps Agent.step to choose use_vision per step.
+
+    mode is "adaptive", "always" (browser_use's default behaviour) or "never".
+    After a failed step, the next escalation_steps steps use vision.
+    """
+
+    def __init__(
+        self,
+        mode: str = "adaptive",
+        escalation_steps: int = 2,
+        canvas_ratio: float = 0.3,
+    ):
+        self.mode = mode
+        self.escalation_steps = escalation_steps
+        self.canvas_ratio = canvas_ratio
+        self.stats = VisionStats()
+        self._vision_steps_left = 0
+
+    @classmethod
+    def from_settings(cls) -> "AdaptiveVision":
+        return cls(
+            mode=settings.BROWSER_VISION_MODE,
+            escalation_steps=settings.BROWSER_VISION_ESCALATION_STEPS,
+            canvas_ratio=settings.BROWSER_VISION_CANVAS_RATIO,
+        )
+
+    def install(self, agent) -> None:
+        message_settings = getattr(agent._message_manager, "settings", None)
+        self.stats.image_tokens = getattr(
+            message_settings, "image_tokens", DEFAULT_IMAGE_TOKENS
+        )
+        original_step = agent.step
+
+        async def step(step_info=None):
+            use_vision = await self._wants_vision(agent)
+            agent.settings.use_vision = use_vision
+            started = time.monotonic()
+            await original_step(step_info)
+            elapsed = time.monotonic() - started
+            if use_vision:
+                self.stats.vision_steps += 1
+                self.stats.vision_seconds += elapsed
+            else:
+                self.stats.text_steps += 1
+                self.stats.text_seconds += elapsed
+            if self.mode == "adaptive" and self._step_failed(agent):
+                if self._vision_steps_left == 0 and not use_vision:
+                    self.stats.escalations += 1
+                    logger.info("Agent step failed, escalating to vision")
+                self._vision_steps_left = self.escalation_steps
+
+        agent.step = step
+
+    async def _wants_vision(self, agent) -> bool:
+        if self.mode != "adaptive":
+            return self.mode == "always"
+        if self._vision_steps_left > 0:
+            self._vision_steps_left -= 1
+            return True
+        if await self._canvas_heavy(agent):
+            self.stats.canvas_escalations += 1
+            return True
+        return False
+
+    async def _canvas_heavy(self, agent) -> bool:
+        try:
+            page = await agent.browser_context.get_current_page()
+            coverage = await page.evaluate(CANVAS_COVERAGE_JS)
+        except Exception as e:
+            # No page yet or it is navigating; the DOM step is still safe
+            logger.debug(f"Canvas coverage check failed: {e}")
+            return False
+        return coverage >= self.canvas_ratio
+
+    @staticmethod
+    def _step_failed(agent) -> bool:
+        if agent.state.consecutive_failures > 0:
+            return True
+        return any(r.error for r in agent.state.last_result or [])
@@ -0,0 +1,219 @@
+"""
+Demand signal for scaling the worker fleet.
+
+A snapshot combines:
+
+- queue depths: the Celery broker lists and the outbox rows not yet relayed
+  to them (with its lag) or, with QUEUE_BACKEND=postgres, the available
+  job_queue rows;
+- pending/in-flight applications, from the per-status counters;
+- the age of the oldest waiting application (a partial index keeps this to
+  the few RECEIVED/QUEUED rows);
+- arrival and service rates and the mean run time over the last
+  AUTOSCALE_WINDOW_SECONDS, from application_events.
+
+The recommendation uses Little's law: keeping up with arrivals needs
+arrival_rate * run_seconds busy slots (or the slots busy right now, if more),
+and draining the backlog within AUTOSCALE_TARGET_WAIT_SECONDS needs
+pending * run_seconds / target_wait more. Slots are divided by the
+concurrency of one worker and clamped to [AUTOSCALE_MIN_WORKERS,
+AUTOSCALE_MAX_WORKERS].
+
+Snapshots are cached per process for AUTOSCALE_CACHE_SECONDS, so frequent
+scrapes cost a few indexed queries at most once per interval.
+"""
+
+import logging
+import math
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional, Tuple
+
+import redis
+from redis.exceptions import RedisError
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app import crud, models, schemas
+from app.config import settings
+from app.worker import outbox
+
+logger = logging.getLogger(__name__)
+
+_broker: Optional[redis.Redis] = None
+_cached: Optional[schemas.AutoscaleSignal] = None
+_cached_at = 0.0
+_lock = threading.Lock()
+
+
+def _broker_client() -> Optional[redis.Redis]:
+    global _broker
+    if not settings.CELERY_BROKER_URL.startswith(("redis://", "rediss://")):
+        return None
+    if _broker is None:
+        _broker = redis.Redis.from_url(
+            settings.CELERY_BROKER_URL, socket_connect_timeout=1, socket_timeout=1
+        )
+    return _broker
+
+
+def _queue_depths(db: Session) -> Tuple[Dict[str, int], Optional[float]]:
+    """Depth per queue, and the outbox lag in seconds (None without an outbox)."""
+    if settings.QUEUE_BACKEND == "postgres":
+        available = db.execute(
+            text(
+                "SELECT count(*) FROM job_queue "
+                "WHERE dead_at IS NULL AND available_at <= now()"
+            )
+        ).scalar()
+        return {"job_queue": int(available)}, None
+
+    lag = outbox.outbox_lag(db)
+    depths = {"outbox": int(lag["pending"])}
+    client = _broker_client()
+    queues = [q.strip() for q in settings.AUTOSCALE_QUEUES.split(",") if q.strip()]
+    if client is not None and queues:
+        try:
+            with client.pipeline(transaction=False) as pipe:
+                for queue in queues:
+                    pipe.llen(queue)
+                depths.update(zip(queues, pipe.execute()))
+        except RedisError as e:
+            logger.warning(f"Could not read broker queue depths: {e}")
+    return depths, lag["lag_seconds"]
+
+
+def recommend_workers(
+    pending: int, in_flight: int, arrival_rate: float, run_seconds: float
+) -> int:
+    """Workers needed to keep up with arrivals and drain the backlog in time."""
+    steady_slots = max(arrival_rate * run_seconds, in_flight)
+    drain_slots = pending * run_seconds / max(settings.AUTOSCALE_TARGET_WAIT_SECONDS, 1)
+    workers = math.ceil(
+        (steady_slots + drain_slots) / max(settings.AUTOSCALE_SLOTS_PER_WORKER, 1)
+    )
+    return min(
+        max(workers, settings.AUTOSCALE_MIN_WORKERS), settings.AUTOSCALE_MAX_WORKERS
+    )
+
+
+def _snapshot(db: Session) -> schemas.AutoscaleSignal:
+    now = datetime.now(timezone.utc)
+    window = settings.AUTOSCALE_WINDOW_SECONDS
+    since = now - timedelta(seconds=window)
+
+    by_status = {
+        row.status: int(row.count) for row in crud.get_application_status_totals(db)
+    }
+    pending = sum(by_status.get(status, 0) for status in crud.PENDING_STATUSES)
+    in_flight = by_status.get(models.JobApplicationStatus.PROCESSING, 0)
+    oldest = crud.get_oldest_pending_application_created_at(db)
+    throughput = crud.get_recent_throughput(
+        db, since, since - timedelta(seconds=settings.AUTOSCALE_MAX_RUN_SECONDS)
+    )
+    arrival_rate = throughput.received / window
+    service_rate = throughput.finished / window
+    avg_run_seconds = (
+        float(throughput.avg_run_seconds)
+        if throughput.avg_run_seconds is not None
+        else None
+    )
+
+    queues, outbox_lag_seconds = _queue_depths(db)
+    return schemas.AutoscaleSignal(
+        queues=queues,
+        outbox_lag_seconds=outbox_lag_seconds,
+        pending_applications=pending,
+        oldest_pending_age_seconds=(
+            round((now - oldest).total_seconds(), 1) if oldest else 0.0
+        ),
+        in_flight=in_flight,
+        arrival_rate_per_minute=round(arrival_rate * 60, 3),
+        service_rate_per_minute=round(service_rate * 60, 3),
+        avg_run_seconds=round(avg_run_seconds, 1) if avg_run_seconds else None,
+        recommended_workers=recommend_workers(
+            pending,
+            in_flight,
+            arrival_rate,
+            avg_run_seconds or settings.AUTOSCALE_DEFAULT_RUN_SECONDS,
+        ),
+        generated_at=now,
+    )
+
+
+def get_signal(db: Session) -> schemas.AutoscaleSignal:
+    """The current snapshot, computed at most once per AUTOSCALE_CACHE_SECONDS."""
+    global _cached, _cached_at
+    with _lock:
+        if (
+            _cached is None
+            or time.monotonic() - _cached_at >= settings.AUTOSCALE_CACHE_SECONDS
+        ):
+            _cached = _snapshot(db)
+            _cached_at = time.monotonic()
+        return _cached
+
+
+def to_prometheus(signal: schemas.AutoscaleSignal) -> str:
+    """The snapshot in the Prometheus text exposition format."""
+    gauges = [
+        (
+            "swifty_pending_applications",
+            "Applications waiting for a worker",
+            signal.pending_applications,
+        ),
+        (
+            "swifty_oldest_pending_age_seconds",
+            "Age of the oldest waiting application",
+            signal.oldest_pending_age_seconds,
+        ),
+        (
+            "swifty_in_flight_applications",
+            "Applications being processed",
+            signal.in_flight,
+        ),
+        (
+            "swifty_arrival_rate_per_minute",
+            "Submissions per minute",
+            signal.arrival_rate_per_minute,
+        ),
+        (
+            "swifty_service_rate_per_minute",
+            "Finished runs per minute",
+            signal.service_rate_per_minute,
+        ),
+        (
+            "swifty_recommended_workers",
+            "Recommended worker count",
+            signal.recommended_workers,
+        ),
+    ]
+    lines = []
+    for name, help_text, value in gauges:
+        lines += [
+            f"# HELP {name} {help_text}",
+            f"# TYPE {name} gauge",
+            f"{name} {value}",
+        ]
+    if signal.avg_run_seconds is not None:
+        lines += [
+            "# HELP swifty_avg_run_seconds Mean application run time",
+            "# TYPE swifty_avg_run_seconds gauge",
+            f"swifty_avg_run_seconds {signal.avg_run_seconds}",
+        ]
+    if signal.outbox_lag_seconds is not None:
+        lines += [
+            "# HELP swifty_outbox_lag_seconds Age of the oldest unrelayed outbox row",
+            "# TYPE swifty_outbox_lag_seconds gauge",
+            f"swifty_outbox_lag_seconds {signal.outbox_lag_seconds}",
+        ]
+    lines += [
+        "# HELP swifty_queue_depth Messages waiting per queue",
+        "# TYPE swifty_queue_depth gauge",
+    ]
+    lines += [
+        f'swifty_queue_depth{{queue="{queue}"}} {depth}'
+        for queue, depth in signal.queues.items()
+    ]
+    return "\n".join(lines) + "\n"
@@ -2,8 +2,6 @@ import asyncio
 import logging
 import os
 import sys
-import tempfile
-import re  # For parsing GCS URI
 
 # Standard library imports should generally come first, but this needs to run early.
 from dotenv import load_dotenv
@@ -15,10 +13,11 @@ from browser_use import Agent, Browser, BrowserConfig, Controller, SystemPrompt
 from browser_use.agent.views import ActionResult
 from browser_use.browser.context import BrowserContext
 from langchain_core.messages import SystemMessage
-from langchain_google_genai import ChatGoogleGenerativeAI
 from pydantic import BaseModel
-from google.cloud import storage  # Import GCS client
-from google.cloud.exceptions import NotFound, GoogleCloudError
+
+from app.services import storage
+from app.services.adaptive_vision import AdaptiveVision
+from app.services.network_policy import NetworkPolicy
 
 # TODO: Consider restructuring the project to avoid sys.path manipulation.
 # This line assumes 'auto_apply.ipynb' is two levels up from the script's directory.
@@ -29,48 +28,6 @@ from google.cloud.exceptions import NotFound, GoogleCloudError
 logger = logging.getLogger(__name__)
 
 
-# --- GCS Helper Function ---
-def download_gcs_file(gcs_uri: str) -> str:
-    """Downloads a file from GCS to a temporary local path."""
-    match = re.match(r"gs://([^/]+)/(.+)", gcs_uri)
-    if not match:
-        raise ValueError(f"Invalid GCS URI format: {gcs_uri}")
-
-    bucket_name, blob_name = match.groups()
-    logger.info(f"Attempting to download gs://{bucket_name}/{blob_name}")
-
-    try:
-        storage_client = storage.Client()
-        bucket = storage_client.bucket(bucket_name)
-        blob = bucket.blob(blob_name)
-
-        # Create a temporary file to download into
-        # Suffix helps identify the file type if needed, preserve original extension
-        original_filename = os.path.basename(blob_name)
-        suffix = (
-            os.path.splitext(original_filename)[1] if "." in original_filename else None
-        )
-        temp_file = tempfile.NamedTemporaryFile(
-            delete=False, suffix=suffix
-        )  # Keep file after close initially
-
-        logger.info(f"Downloading GCS file to temporary path: {temp_file.name}")
-        blob.download_to_filename(temp_file.name)
-        temp_file.close()  # Close the file handle
-        logger.info(f"Successfully downloaded GCS file to {temp_file.name}")
-        return temp_file.name  # Return the path
-
-    except NotFound:
-        logger.error(f"GCS file not found: {gcs_uri}")
-        raise FileNotFoundError(f"GCS file not found: {gcs_uri}")
-    except GoogleCloudError as e:
-        logger.error(f"GCS download error for {gcs_uri}: {e}")
-        raise ConnectionError(f"Failed to download from GCS: {e}")
-    except Exception as e:
-        logger.error(f"Unexpected error downloading {gcs_uri}: {e}")
-        raise RuntimeError(f"Unexpected error during GCS download: {e}")
-
-
 class ApplicationStatus(BaseModel):
     job_title: str
     job_company: str
@@ -80,18 +37,50 @@ class ApplicationStatus(BaseModel):
 
 controller = Controller(output_model=ApplicationStatus)
 
-llm = ChatGoogleGenerativeAI(
-    model="gemini-2.0-flash",  # gemini-2.5-pro-exp-03-25
-    temperature=0,
-    max_tokens=None,
-    timeout=None,
-    max_retries=2,
-    # other params...
-)
+# The LLM client and the Browser are created on first use rather than at import,
+# so importing this module (or anything that imports it) stays cheap.
+_llm = None
+_browser = None
+
+
+def get_llm():
+    """Returns the shared Gemini chat model, creating it on first use."""
+    global _llm
+    if _llm is None:
+        from langchain_google_genai import ChatGoogleGenerativeAI
+
+        _llm = ChatGoogleGenerativeAI(
+            model="gemini-2.0-flash",  # gemini-2.5-pro-exp-03-25
+            temperature=0,
+            max_tokens=None,
+            timeout=None,
+            max_retries=2,
+            # other params...
+        )
+    return _llm
+
+
+def get_browser() -> Browser:
+    """Returns the shared Browser, creating it on first use."""
+    global _browser
+    if _browser is None:
+        config = BrowserConfig(headless=True, disable_security=True)
+        _browser = Browser(config=config)
+    return _browser
 
-config = BrowserConfig(headless=True, disable_security=True)
 
-browser = Browser(config=config)
+def reset_browser() -> None:
+    """
+    Drops the shared Browser so the next get_browser() launches a fresh
+    Chromium. Only call between runs; an agent using it would lose its pages.
+
+    The Browser cannot be closed here: its Playwright connection belongs to
+    the event loop of the run that opened it, which asyncio.run() has already
+    closed. The caller stops its processes instead (see
+    worker/memory.restart_browser).
+    """
+    global _browser
+    _browser = None
 
 
 @controller.action(
@@ -164,75 +153,89 @@ class MySystemPrompt(SystemPrompt):
         return SystemMessage(content=extended_content)
 
 
-async def execute_browser(task, sensitive_data, link):
+async def execute_browser(task, sensitive_data, link, owner_id):
     initial_actions = [{"open_tab": {"url": link}}]
-    temp_resume_path = None
+    resume_local_path = None
+    resume_is_temporary = False
     final_available_paths = []
+    browser = get_browser()
+    # The agent gets its own context so request interception can be installed
+    # before the first navigation; it is closed again in the finally block.
+    browser_context = BrowserContext(
+        browser=browser, config=browser.config.new_context_config
+    )
+    network_stats = None
+    vision = AdaptiveVision.from_settings()
 
     try:
-        # Check for GCS resume path and download if necessary
-        gcs_resume_uri = sensitive_data.get("resume_path")
-        if gcs_resume_uri and gcs_resume_uri.startswith("gs://"):
+        # Resolve the stored resume (gs://, s3:// or file://) to a local file.
+        # Local-backend files are used in place; remote ones are downloaded.
+        resume_uri = sensitive_data.get("resume_path")
+        if resume_uri and not storage.is_user_object(resume_uri, owner_id):
+            # resume_path is user-editable; never hand another user's file
+            # (or an arbitrary path) to the agent
+            logger.warning(
+                f"Resume path {resume_uri} is outside the storage area of user "
+                f"{owner_id}. Proceeding without resume."
+            )
+        elif resume_uri:
             try:
-                logger.info(f"Found GCS resume path: {gcs_resume_uri}. Downloading...")
-                temp_resume_path = download_gcs_file(gcs_resume_uri)
+                logger.info(f"Found resume path: {resume_uri}. Fetching...")
+                resume_local_path, resume_is_temporary = storage.fetch_local(
+                    resume_uri
+                )
                 sensitive_data["resume_path"] = (
-                    temp_resume_path  # Update sensitive data with temp path
+                    resume_local_path  # Update sensitive data with local path
                 )
-                final_available_paths = [temp_resume_path]
-                logger.info(f"Using temporary resume path: {temp_resume_path}")
-            except (FileNotFoundError, ConnectionError, ValueError, RuntimeError) as e:
+                final_available_paths = [resume_local_path]
+                logger.info(f"Using local resume path: {resume_local_path}")
+            except (FileNotFoundError, ConnectionError, ValueError) as e:
                 logger.warning(
-                    f"Failed to download resume from GCS ({gcs_resume_uri}): {e}. Proceeding without resume."
+                    f"Failed to fetch resume ({resume_uri}): {e}. Proceeding without resume."
                 )
-                # Keep sensitive_data['resume_path'] as the GCS URI or remove it?
-                # Let's keep it as is, but ensure available_paths is empty.
+                # Keep sensitive_data['resume_path'] as the URI, but ensure available_paths is empty.
                 final_available_paths = []
             except Exception as e:
-                logger.error(
-                    f"Unexpected error processing GCS path {gcs_resume_uri}: {e}"
-                )
+                logger.error(f"Unexpected error fetching resume {resume_uri}: {e}")
                 final_available_paths = []
         else:
-            logger.info(
-                "No GCS resume path found in sensitive data or path is not a GCS URI."
-            )
-            final_available_paths = (
-                []
-            )  # Ensure it's empty if no GCS path or download failed
+            logger.info("No resume path found in sensitive data.")
+
+        network_policy = NetworkPolicy.from_settings()
+        if network_policy.enabled:
+            session = await browser_context.get_session()
+            network_stats = await network_policy.install(session.context)
 
         agent = Agent(
             task=task,
             initial_actions=initial_actions,
             controller=controller,
-            llm=llm,
+            llm=get_llm(),
             browser=browser,
+            browser_context=browser_context,
             retry_delay=20,
             max_actions_per_step=15,
-            sensitive_data=sensitive_data,  # Now potentially contains the temp path
+            sensitive_data=sensitive_data,  # Now potentially contains the local path
             available_file_paths=final_available_paths,  # Use the determined paths
             system_prompt_class=MySystemPrompt,
             # generate_gif=True,
         )
+        vision.install(agent)
 
         result = await agent.run()
         res = result.final_result()
         parsed: ApplicationStatus = ApplicationStatus.model_validate_json(res)
-        print(parsed)
+        logger.info(f"Agent result for {link}: {parsed}")
         return parsed
 
     finally:
-        # Clean up the temporary file if it was created
-        if temp_resume_path and os.path.exists(temp_resume_path):
-            try:
-                os.remove(temp_resume_path)
-                logger.info(
-                    f"Successfully removed temporary resume file: {temp_resume_path}"
-                )
-            except OSError as e:
-                logger.error(
-                    f"Failed to remove temporary resume file {temp_resume_path}: {e}"
-                )
+        await browser_context.close()
+        if network_stats is not None:
+            logger.info(f"Network policy stats for {link}: {network_stats.as_dict()}")
+        logger.info(f"Vision stats for {link}: {vision.stats.as_dict()}")
+        # Clean up the downloaded copy; local-backend files are left in place
+        if resume_local_path:
+            storage.release_local(resume_local_path, resume_is_temporary)
 
 
 if __name__ == "__main__":
@@ -250,5 +253,6 @@ if __name__ == "__main__":
                 "years_of_experience": "5",
             },
             link="http://localhost:8001/static/index.html",
+            owner_id=1,
         )
     )
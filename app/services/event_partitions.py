@@ -0,0 +1,219 @@
+"""
+Monthly partition maintenance for application_events.
+
+Partitions are named application_events_yYYYYmMM and cover one UTC calendar
+month. ensure_partitions() creates the upcoming months ahead of time, so
+inserts normally never land in application_events_default; drop_old_partitions()
+detaches and drops months past the retention window, which frees their space
+immediately without a bulk DELETE and the vacuum work that follows it. Only
+expired rows left in the default partition are deleted row by row.
+
+If maintenance falls behind and a month's events already sit in the default
+partition, Postgres refuses to create that month's partition. create_partition()
+then detaches the default, creates the month, moves its rows over and
+reattaches the default, all in one transaction. maintain_partitions() creates
+each month in its own transaction, so one failing month is logged and retried
+on the next run without holding back the others.
+
+Runs daily from Celery beat, or by hand:
+    python -m app.services.event_partitions
+"""
+
+import logging
+import re
+from datetime import date, datetime, timezone
+from typing import List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+PARENT_TABLE = "application_events"
+DEFAULT_PARTITION = f"{PARENT_TABLE}_default"
+PARTITION_NAME_RE = re.compile(rf"^{PARENT_TABLE}_y(\d{{4}})m(\d{{2}})$")
+
+
+def _month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def _add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{PARENT_TABLE}_y{month:%Y}m{month:%m}"
+
+
+def _bounds(month: date) -> Tuple[str, str]:
+    start, end = _month_start(month), _add_months(_month_start(month), 1)
+    return f"{start.isoformat()} 00:00:00+00", f"{end.isoformat()} 00:00:00+00"
+
+
+def create_partition_sql(month: date) -> str:
+    start, end = _bounds(month)
+    return (
+        f"CREATE TABLE IF NOT EXISTS {partition_name(month)} "
+        f"PARTITION OF {PARENT_TABLE} "
+        f"FOR VALUES FROM ('{start}') TO ('{end}')"
+    )
+
+
+def _today() -> date:
+    return datetime.now(timezone.utc).date()
+
+
+def list_partitions(connection: Connection) -> List[str]:
+    return list(
+        connection.execute(
+            text(
+                "SELECT c.relname FROM pg_inherits i "
+                "JOIN pg_class c ON c.oid = i.inhrelid "
+                "WHERE i.inhparent = CAST(:parent AS regclass) "
+                "ORDER BY c.relname"
+            ),
+            {"parent": PARENT_TABLE},
+        ).scalars()
+    )
+
+
+def missing_months(
+    connection: Connection,
+    months_ahead: Optional[int] = None,
+    today: Optional[date] = None,
+) -> List[date]:
+    """This month and the next months_ahead months that have no partition yet."""
+    if months_ahead is None:
+        months_ahead = settings.EVENT_PARTITION_MONTHS_AHEAD
+    current = _month_start(today or _today())
+    existing = set(list_partitions(connection))
+    months = (_add_months(current, offset) for offset in range(months_ahead + 1))
+    return [month for month in months if partition_name(month) not in existing]
+
+
+def create_partition(connection: Connection, month: date) -> int:
+    """
+    Creates the partition for month. Rows of that month already in the default
+    partition are moved into it; returns how many were moved.
+    """
+    start, end = _bounds(month)
+    in_month = (
+        "created_at >= CAST(:start AS timestamptz) "
+        "AND created_at < CAST(:end AS timestamptz)"
+    )
+    stranded = connection.execute(
+        text(f"SELECT EXISTS (SELECT 1 FROM {DEFAULT_PARTITION} WHERE {in_month})"),
+        {"start": start, "end": end},
+    ).scalar()
+    if not stranded:
+        connection.execute(text(create_partition_sql(month)))
+        return 0
+
+    name = partition_name(month)
+    connection.execute(
+        text(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {DEFAULT_PARTITION}")
+    )
+    connection.execute(text(create_partition_sql(month)))
+    moved = connection.execute(
+        text(
+            f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} WHERE {in_month} "
+            f"RETURNING *) "
+            f"INSERT INTO {name} OVERRIDING SYSTEM VALUE SELECT * FROM moved"
+        ),
+        {"start": start, "end": end},
+    ).rowcount
+    connection.execute(
+        text(f"ALTER TABLE {PARENT_TABLE} ATTACH PARTITION {DEFAULT_PARTITION} DEFAULT")
+    )
+    logger.info(f"Moved {moved} events from {DEFAULT_PARTITION} into {name}")
+    return moved
+
+
+def ensure_partitions(
+    connection: Connection,
+    months_ahead: Optional[int] = None,
+    today: Optional[date] = None,
+) -> List[str]:
+    """Creates the partitions for this month and the next months_ahead months."""
+    created = []
+    for month in missing_months(connection, months_ahead, today):
+        create_partition(connection, month)
+        created.append(partition_name(month))
+    return created
+
+
+def drop_old_partitions(
+    connection: Connection,
+    retention_months: Optional[int] = None,
+    today: Optional[date] = None,
+) -> List[str]:
+    """
+    Detaches and drops monthly partitions that end before the retention window,
+    and deletes the default partition's events from before it; returns the
+    dropped partitions. retention_months counts whole months before the
+    current one; 0 keeps all.
+    """
+    if retention_months is None:
+        retention_months = settings.EVENT_RETENTION_MONTHS
+    if retention_months <= 0:
+        return []
+    cutoff = _add_months(_month_start(today or _today()), -retention_months)
+    partitions = list_partitions(connection)
+    dropped = []
+    for name in partitions:
+        match = PARTITION_NAME_RE.match(name)
+        if not match:
+            continue  # the default partition, or one created by hand
+        month = date(int(match.group(1)), int(match.group(2)), 1)
+        if month >= cutoff:
+            continue
+        connection.execute(text(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {name}"))
+        connection.execute(text(f"DROP TABLE {name}"))
+        dropped.append(name)
+    if DEFAULT_PARTITION in partitions:
+        # Months that never got a partition (e.g. seeded history) sit here
+        deleted = connection.execute(
+            text(
+                f"DELETE FROM {DEFAULT_PARTITION} "
+                "WHERE created_at < CAST(:cutoff AS timestamptz)"
+            ),
+            {"cutoff": f"{cutoff.isoformat()} 00:00:00+00"},
+        ).rowcount
+        if deleted:
+            logger.info(f"Deleted {deleted} expired events from {DEFAULT_PARTITION}")
+    return dropped
+
+
+def maintain_partitions(engine) -> dict:
+    with engine.connect() as connection:
+        months = missing_months(connection)
+    created, failed = [], []
+    for month in months:
+        name = partition_name(month)
+        try:
+            with engine.begin() as connection:
+                create_partition(connection, month)
+        except SQLAlchemyError:
+            logger.exception(f"Could not create partition {name}")
+            failed.append(name)
+        else:
+            created.append(name)
+    with engine.begin() as connection:
+        dropped = drop_old_partitions(connection)
+    if created or dropped:
+        logger.info(
+            f"application_events partitions created: {created}, dropped: {dropped}"
+        )
+    return {"created": created, "failed": failed, "dropped": dropped}
+
+
+if __name__ == "__main__":
+    from app.database import engine
+
+    logging.basicConfig(level=logging.INFO)
+    print(maintain_partitions(engine))
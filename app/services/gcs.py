@@ -0,0 +1,239 @@
+import asyncio
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from functools import partial
+from typing import Callable, Optional, TypeVar
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# One GCS client and one bounded executor per process. Both are created lazily
+# and dropped in forked children (Celery prefork, gunicorn), which must not
+# share the parent's HTTP connections or executor threads.
+_client = None
+_client_pid: Optional[int] = None
+_executor: Optional[ThreadPoolExecutor] = None
+_lock = threading.Lock()
+
+
+def _reset_after_fork() -> None:
+    global _client, _client_pid, _executor, _lock
+    _client = None
+    _client_pid = None
+    _executor = None
+    _lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def _create_client():
+    from google.cloud import storage
+    from google.auth.transport.requests import AuthorizedSession
+    from requests.adapters import HTTPAdapter
+
+    if settings.GCS_EMULATOR_HOST:
+        from google.auth.credentials import AnonymousCredentials
+
+        credentials, project = AnonymousCredentials(), settings.GCS_PROJECT or "local"
+    else:
+        import google.auth
+
+        credentials, project = google.auth.default(scopes=storage.Client.SCOPE)
+        project = settings.GCS_PROJECT or project
+
+    # A dedicated session whose pool is sized for the executor, so concurrent
+    # uploads/downloads reuse TLS connections instead of opening new ones.
+    session = AuthorizedSession(credentials)
+    adapter = HTTPAdapter(
+        pool_connections=settings.GCS_HTTP_POOL_SIZE,
+        pool_maxsize=settings.GCS_HTTP_POOL_SIZE,
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+
+    client_options = (
+        {"api_endpoint": settings.GCS_EMULATOR_HOST}
+        if settings.GCS_EMULATOR_HOST
+        else None
+    )
+    logger.info("Initializing GCS client")
+    return storage.Client(
+        project=project,
+        credentials=credentials,
+        client_options=client_options,
+        _http=session,
+    )
+
+
+def get_client():
+    """Returns this process's GCS client, creating it on first use."""
+    global _client, _client_pid
+    pid = os.getpid()
+    if _client is None or _client_pid != pid:
+        with _lock:
+            if _client is None or _client_pid != pid:
+                _client = _create_client()
+                _client_pid = pid
+    return _client
+
+
+def reset_client() -> None:
+    """Drops the cached client so the next call builds a fresh one."""
+    global _client
+    with _lock:
+        _client = None
+
+
+def _call(fn: Callable[..., T]) -> T:
+    """Runs fn(client), resetting the client on transport or auth failures."""
+    from google.api_core.exceptions import RetryError
+    from google.auth.exceptions import GoogleAuthError
+    from requests.exceptions import ConnectionError as RequestsConnectionError
+
+    try:
+        return fn(get_client())
+    except (GoogleAuthError, RequestsConnectionError, RetryError):
+        logger.warning("GCS transport/auth failure, resetting client", exc_info=True)
+        reset_client()
+        raise
+
+
+# --- Blocking helpers (worker processes, threadpool callers) ---
+
+
+def upload_bytes(
+    bucket_name: str, blob_name: str, data: bytes, content_type: Optional[str] = None
+) -> None:
+    _call(
+        lambda client: client.bucket(bucket_name)
+        .blob(blob_name)
+        .upload_from_string(data, content_type=content_type)
+    )
+
+
+def upload_file(
+    bucket_name: str, blob_name: str, file_obj, content_type: Optional[str] = None
+) -> None:
+    """Streams a file object to GCS without reading it into memory first."""
+    _call(
+        lambda client: client.bucket(bucket_name)
+        .blob(blob_name)
+        .upload_from_file(file_obj, content_type=content_type, rewind=True)
+    )
+
+
+def download_to_filename(bucket_name: str, blob_name: str, filename: str) -> None:
+    _call(
+        lambda client: client.bucket(bucket_name)
+        .blob(blob_name)
+        .download_to_filename(filename)
+    )
+
+
+def get_blob(bucket_name: str, blob_name: str):
+    """Returns the blob with its metadata loaded, or None if it does not exist."""
+    return _call(lambda client: client.bucket(bucket_name).get_blob(blob_name))
+
+
+def open_reader(bucket_name: str, blob_name: str, chunk_size: int):
+    """Opens a buffered reader that streams the blob in chunk_size requests."""
+    return _call(
+        lambda client: client.bucket(bucket_name)
+        .blob(blob_name)
+        .open("rb", chunk_size=chunk_size)
+    )
+
+
+def download_range(bucket_name: str, blob_name: str, start: int, end: int) -> bytes:
+    """Downloads bytes start..end (inclusive) of a blob."""
+    return _call(
+        lambda client: client.bucket(bucket_name)
+        .blob(blob_name)
+        .download_as_bytes(start=start, end=end)
+    )
+
+
+def generate_signed_url(
+    bucket_name: str,
+    blob_name: str,
+    method: str,
+    expiration: timedelta,
+    content_type: Optional[str] = None,
+    headers: Optional[dict] = None,
+) -> str:
+    """
+    Creates a V4 signed URL for a blob.
+
+    Works with key-file credentials and with token-only credentials (GCE, Cloud
+    Run, workload identity), which sign through the IAM signBlob API instead.
+    """
+
+    def sign(client) -> str:
+        credentials = client._credentials
+        kwargs = {}
+        if not hasattr(credentials, "sign_bytes"):
+            from google.auth.transport.requests import Request
+
+            if not credentials.valid:
+                credentials.refresh(Request())
+            kwargs = {
+                "service_account_email": credentials.service_account_email,
+                "access_token": credentials.token,
+            }
+        return (
+            client.bucket(bucket_name)
+            .blob(blob_name)
+            .generate_signed_url(
+                version="v4",
+                expiration=expiration,
+                method=method,
+                content_type=content_type,
+                headers=headers,
+                **kwargs,
+            )
+        )
+
+    return _call(sign)
+
+
+def delete_blob(bucket_name: str, blob_name: str) -> None:
+    _call(lambda client: client.bucket(bucket_name).blob(blob_name).delete())
+
+
+# --- Async wrappers (API event loop) ---
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.GCS_MAX_WORKERS, thread_name_prefix="gcs"
+                )
+    return _executor
+
+
+async def run_blocking(fn: Callable[..., T], *args, **kwargs) -> T:
+    """Runs a blocking GCS call in the bounded GCS executor."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), partial(fn, *args, **kwargs))
+
+
+async def upload_bytes_async(
+    bucket_name: str, blob_name: str, data: bytes, content_type: Optional[str] = None
+) -> None:
+    await run_blocking(upload_bytes, bucket_name, blob_name, data, content_type)
+
+
+async def download_to_filename_async(
+    bucket_name: str, blob_name: str, filename: str
+) -> None:
+    await run_blocking(download_to_filename, bucket_name, blob_name, filename)
@@ -0,0 +1,119 @@
+import hashlib
+import logging
+from dataclasses import dataclass
+from typing import Optional
+
+from redis.exceptions import RedisError
+
+from app.config import settings
+from app.services.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+MAX_KEY_LENGTH = 255
+
+STATE_PENDING = "p"
+STATE_DONE = "d"
+
+
+@dataclass
+class IdempotencyRecord:
+    """A stored Idempotency-Key entry.
+
+    Entries are kept as a compact ``state|fingerprint|application_id|status_code``
+    string so a day's worth of keys stays small in Redis.
+    """
+
+    state: str
+    fingerprint: str
+    application_id: Optional[int] = None
+    status_code: Optional[int] = None
+
+    @property
+    def is_pending(self) -> bool:
+        return self.state == STATE_PENDING
+
+    def encode(self) -> str:
+        return "|".join(
+            [
+                self.state,
+                self.fingerprint,
+                str(self.application_id or ""),
+                str(self.status_code or ""),
+            ]
+        )
+
+    @classmethod
+    def decode(cls, raw: str) -> "IdempotencyRecord":
+        state, fingerprint, application_id, status_code = raw.split("|")
+        return cls(
+            state=state,
+            fingerprint=fingerprint,
+            application_id=int(application_id) if application_id else None,
+            status_code=int(status_code) if status_code else None,
+        )
+
+
+def fingerprint(*parts: str) -> str:
+    """Hashes the request attributes that must match when a key is reused."""
+    return hashlib.sha256("\x1f".join(parts).encode()).hexdigest()[:32]
+
+
+def _redis_key(user_id: int, key: str) -> str:
+    # Keys are namespaced per user so clients cannot observe each other's entries.
+    return f"idem:{user_id}:{hashlib.sha256(key.encode()).hexdigest()[:32]}"
+
+
+def reserve(user_id: int, key: str, request_fingerprint: str) -> Optional[IdempotencyRecord]:
+    """
+    Tries to claim an Idempotency-Key for a new request.
+
+    Returns None if the caller now owns the key and should process the request.
+    Otherwise returns the existing record (pending or completed) for the key.
+    If Redis is unavailable the request is processed without idempotency.
+    """
+    redis_key = _redis_key(user_id, key)
+    pending = IdempotencyRecord(STATE_PENDING, request_fingerprint).encode()
+    try:
+        client = get_redis()
+        # Two attempts: the existing entry may expire between SET NX and GET.
+        for _ in range(2):
+            if client.set(
+                redis_key, pending, nx=True, ex=settings.IDEMPOTENCY_PENDING_TTL_SECONDS
+            ):
+                return None
+            raw = client.get(redis_key)
+            if raw is not None:
+                return IdempotencyRecord.decode(raw)
+    except RedisError as e:
+        logger.warning(f"Idempotency store unavailable, processing request anyway: {e}")
+    return None
+
+
+def complete(
+    user_id: int,
+    key: str,
+    request_fingerprint: str,
+    application_id: int,
+    status_code: int,
+) -> None:
+    """Stores the outcome of a processed request for replay."""
+    record = IdempotencyRecord(
+        STATE_DONE, request_fingerprint, application_id, status_code
+    )
+    try:
+        get_redis().set(
+            _redis_key(user_id, key),
+            record.encode(),
+            ex=settings.IDEMPOTENCY_TTL_SECONDS,
+        )
+    except RedisError as e:
+        logger.error(f"Failed to store idempotency record for user {user_id}: {e}")
+
+
+def release(user_id: int, key: str) -> None:
+    """Drops a pending reservation so the client can retry after a failure."""
+    try:
+        get_redis().delete(_redis_key(user_id, key))
+    except RedisError as e:
+        logger.error(f"Failed to release idempotency key for user {user_id}: {e}")
@@ -0,0 +1,190 @@
+"""
+Request interception for the automation browser.
+
+The agent only needs the DOM and the forms on a job page, so images, media,
+fonts and third-party trackers are aborted before Chromium downloads them.
+Allowlisted domains (captcha providers by default) are never blocked, or
+only for the resource types listed for them.
+"""
+
+import logging
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, Optional
+from urllib.parse import urlsplit
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TRACKER_DOMAINS = frozenset(
+    {
+        "google-analytics.com",
+        "googletagmanager.com",
+        "googleadservices.com",
+        "doubleclick.net",
+        "googlesyndication.com",
+        "connect.facebook.net",
+        "px.ads.linkedin.com",
+        "snap.licdn.com",
+        "bat.bing.com",
+        "clarity.ms",
+        "hotjar.com",
+        "fullstory.com",
+        "segment.io",
+        "segment.com",
+        "mixpanel.com",
+        "amplitude.com",
+        "heap.io",
+        "heapanalytics.com",
+        "optimizely.com",
+        "newrelic.com",
+        "nr-data.net",
+        "adsrvr.org",
+        "quantserve.com",
+        "scorecardresearch.com",
+        "tiktok.com",
+        "widget.intercom.io",
+        "js.driftt.com",
+    }
+)
+
+# Captcha widgets need their scripts and images to render
+DEFAULT_ALLOWED_DOMAINS = (
+    "recaptcha.net,google.com,gstatic.com,hcaptcha.com,challenges.cloudflare.com"
+)
+
+# Rough transfer sizes of blocked requests, used to estimate bytes saved
+# without downloading them.
+ESTIMATED_BYTES = {
+    "image": 45_000,
+    "media": 500_000,
+    "font": 35_000,
+    "stylesheet": 20_000,
+    "script": 60_000,
+    "xhr": 2_000,
+    "fetch": 2_000,
+    "ping": 500,
+    "beacon": 500,
+}
+DEFAULT_ESTIMATED_BYTES = 5_000
+
+
+def _split(value: str) -> FrozenSet[str]:
+    return frozenset(item.strip().lower() for item in value.split(",") if item.strip())
+
+
+def _parse_allowlist(value: str) -> Dict[str, FrozenSet[str]]:
+    """
+    Parses "domain" or "domain:type|type" entries. An empty type set allows
+    every resource type for the domain.
+    """
+    allowlist = {}
+    for entry in _split(value):
+        domain, _, types = entry.partition(":")
+        allowlist[domain] = frozenset(t for t in types.split("|") if t)
+    return allowlist
+
+
+def _domain_match(host: str, domains) -> Optional[str]:
+    """Returns the entry of domains that host equals or is a subdomain of."""
+    parts = host.split(".")
+    for i in range(len(parts) - 1):
+        candidate = ".".join(parts[i:])
+        if candidate in domains:
+            return candidate
+    return None
+
+
+@dataclass
+class NetworkStats:
+    """Per-run counters of what the policy let through and what it blocked."""
+
+    requests_allowed: int = 0
+    requests_blocked: int = 0
+    estimated_bytes_saved: int = 0
+    blocked_by_reason: Counter = field(default_factory=Counter)
+    blocked_by_type: Counter = field(default_factory=Counter)
+
+    def record_blocked(self, reason: str, resource_type: str) -> None:
+        self.requests_blocked += 1
+        self.blocked_by_reason[reason] += 1
+        self.blocked_by_type[resource_type] += 1
+        self.estimated_bytes_saved += ESTIMATED_BYTES.get(
+            resource_type, DEFAULT_ESTIMATED_BYTES
+        )
+
+    def as_dict(self) -> dict:
+        return {
+            "requests_allowed": self.requests_allowed,
+            "requests_blocked": self.requests_blocked,
+            "estimated_bytes_saved": self.estimated_bytes_saved,
+            "blocked_by_reason": dict(self.blocked_by_reason),
+            "blocked_by_type": dict(self.blocked_by_type),
+        }
+
+
+@dataclass(frozen=True)
+class NetworkPolicy:
+    enabled: bool = True
+    blocked_resource_types: FrozenSet[str] = frozenset({"image", "media", "font"})
+    blocked_domains: FrozenSet[str] = DEFAULT_TRACKER_DOMAINS
+    allowed_domains: Dict[str, FrozenSet[str]] = field(
+        default_factory=lambda: _parse_allowlist(DEFAULT_ALLOWED_DOMAINS)
+    )
+
+    @classmethod
+    def from_settings(cls) -> "NetworkPolicy":
+        blocked_domains = _split(settings.BROWSER_BLOCKED_DOMAINS)
+        if settings.BROWSER_BLOCK_TRACKERS:
+            blocked_domains |= DEFAULT_TRACKER_DOMAINS
+        return cls(
+            enabled=settings.BROWSER_NETWORK_POLICY_ENABLED,
+            blocked_resource_types=_split(settings.BROWSER_BLOCK_RESOURCE_TYPES),
+            blocked_domains=blocked_domains,
+            allowed_domains=_parse_allowlist(settings.BROWSER_ALLOWED_DOMAINS),
+        )
+
+    def block_reason(self, url: str, resource_type: str) -> Optional[str]:
+        """Returns why a request should be blocked ("tracker" or "type"), or None."""
+        if not self.enabled:
+            return None
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https"):
+            return None  # data:, blob: and friends never hit the network
+        host = (parts.hostname or "").lower()
+
+        allowed = _domain_match(host, self.allowed_domains)
+        if allowed is not None:
+            allowed_types = self.allowed_domains[allowed]
+            if not allowed_types or resource_type in allowed_types:
+                return None
+
+        if resource_type == "document":
+            # Never block navigations, or the agent would see error pages
+            return None
+        if _domain_match(host, self.blocked_domains) is not None:
+            return "tracker"
+        if resource_type in self.blocked_resource_types:
+            return "type"
+        return None
+
+    async def install(self, context) -> NetworkStats:
+        """
+        Routes every request of a Playwright BrowserContext through the policy.
+        Returns the stats object the handler updates for the rest of the run.
+        """
+        stats = NetworkStats()
+
+        async def handle(route):
+            request = route.request
+            reason = self.block_reason(request.url, request.resource_type)
+            if reason is None:
+                stats.requests_allowed += 1
+                await route.continue_()
+            else:
+                stats.record_blocked(reason, request.resource_type)
+                await route.abort("blockedbyclient")
+
+        await context.route("**/*", handle)
+        return stats
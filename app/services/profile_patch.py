@@ -0,0 +1,200 @@
+"""
+JSON Patch (RFC 6902) for user profiles, applied inside Postgres.
+
+A patch compiles into one UPDATE: each JSONB column's new value is an
+expression built from jsonb_set, jsonb_insert and #- over the column's
+current value, so only the patch is sent and only the changed row is
+written, whatever the size of the documents. Operations apply in order, and
+later ones see earlier ones because each wraps the previous expression.
+
+Preconditions (a target exists, a "test" matches) go into the WHERE clause,
+again against the expression as of that operation. The patch then applies
+atomically or not at all.
+
+Paths are JSON Pointers whose first token is a profile field, e.g.
+"/skills/-" or "/work_experience/0/title". Values for whole fields and for
+whole list items are validated with the profile schemas. Deeper values are
+stored as given.
+"""
+
+import json
+from typing import Any, Dict, List, Sequence, Tuple
+
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy import ARRAY, Text, case, cast, func, literal, null
+from sqlalchemy.dialects.postgresql import JSONB
+
+from app import models, schemas
+
+# Plain text columns: only the whole value can be patched
+TEXT_FIELDS = ("first_name", "last_name", "phone", "linkedin_url", "portfolio_url")
+# JSONB documents, with the empty container used when the column is NULL
+JSONB_FIELDS = {
+    "address": "{}",
+    "work_experience": "[]",
+    "education": "[]",
+    "skills": "[]",
+    "common_qna": "{}",
+}
+# Validators for one item of a list field, or one value of a dict field
+ITEM_ADAPTERS = {
+    "work_experience": TypeAdapter(schemas.WorkExperienceItem),
+    "education": TypeAdapter(schemas.EducationItem),
+    "skills": TypeAdapter(str),
+    "common_qna": TypeAdapter(str),
+}
+
+
+class PatchError(ValueError):
+    """The patch document is malformed or targets a field that cannot be patched."""
+
+
+def parse_pointer(pointer: str) -> Tuple[str, List[str]]:
+    """Splits "/field/a/0" into ("field", ["a", "0"]), unescaping ~1 and ~0."""
+    if not pointer.startswith("/"):
+        raise PatchError(f"Invalid JSON Pointer: {pointer!r}")
+    tokens = [t.replace("~1", "/").replace("~0", "~") for t in pointer[1:].split("/")]
+    field, rest = tokens[0], tokens[1:]
+    if field not in TEXT_FIELDS and field not in JSONB_FIELDS:
+        raise PatchError(f"Field {field!r} cannot be patched")
+    if field in TEXT_FIELDS and rest:
+        raise PatchError(f"Field {field!r} is not a document")
+    if "-" in rest[:-1]:
+        raise PatchError(f"'-' may only end a path: {pointer!r}")
+    return field, rest
+
+
+def _validate(field: str, rest: Sequence[str], value: Any) -> Any:
+    try:
+        if not rest:
+            update = schemas.UserProfileUpdate.model_validate({field: value})
+            return update.model_dump(mode="json")[field]
+        if len(rest) == 1 and field in ITEM_ADAPTERS:
+            adapter = ITEM_ADAPTERS[field]
+            return adapter.dump_python(adapter.validate_python(value), mode="json")
+    except ValidationError as e:
+        raise PatchError(f"Invalid value for /{field}/{'/'.join(rest)}: {e}") from e
+    return value
+
+
+def _path(tokens: Sequence[str]):
+    return cast(literal(list(tokens), ARRAY(Text)), ARRAY(Text))
+
+
+def _jsonb(value: Any):
+    return cast(json.dumps(value), JSONB)
+
+
+def _get(expr, tokens: Sequence[str]):
+    if not tokens:
+        return expr
+    return expr.op("#>", return_type=JSONB)(_path(tokens))
+
+
+class _Compiler:
+    def __init__(self) -> None:
+        self.values: Dict[str, Any] = {}
+        self.conditions: List[Any] = []
+
+    def current(self, field: str):
+        # Reading does not add the column to the SET list; only writes do
+        return self.values.get(field, getattr(models.UserProfile, field))
+
+    def exists(self, field: str, rest: Sequence[str]) -> None:
+        if rest:
+            self.conditions.append(_get(self.current(field), rest).is_not(None))
+
+    def add(self, field: str, rest: Sequence[str], value) -> None:
+        if field in TEXT_FIELDS or not rest:
+            self.values[field] = value
+            return
+        expr = func.coalesce(
+            self.current(field), _jsonb(json.loads(JSONB_FIELDS[field]))
+        )
+        parent, last = rest[:-1], rest[-1]
+        if last == "-":
+            self.conditions.append(func.jsonb_typeof(_get(expr, parent)) == "array")
+            # A negative index with insert_after appends, also to an empty array
+            self.values[field] = func.jsonb_insert(
+                expr, _path([*parent, "-1"]), value, True
+            )
+            return
+        self.conditions.append(_get(expr, parent).is_not(None))
+        self.values[field] = case(
+            (
+                func.jsonb_typeof(_get(expr, parent)) == "array",
+                func.jsonb_insert(expr, _path(rest), value),
+            ),
+            else_=func.jsonb_set(expr, _path(rest), value, True),
+        )
+
+    def remove(self, field: str, rest: Sequence[str]) -> None:
+        if not rest:
+            self.values[field] = null()
+            return
+        self.exists(field, rest)
+        self.values[field] = self.current(field).op("#-", return_type=JSONB)(
+            _path(rest)
+        )
+
+    def replace(self, field: str, rest: Sequence[str], value) -> None:
+        if not rest:
+            self.values[field] = value
+            return
+        self.exists(field, rest)
+        self.values[field] = func.jsonb_set(
+            self.current(field), _path(rest), value, False
+        )
+
+    def test(self, field: str, rest: Sequence[str], value: Any) -> None:
+        expr = _get(self.current(field), rest)
+        if value is None and (field in TEXT_FIELDS or not rest):
+            self.conditions.append(expr.is_(None))
+        elif field in TEXT_FIELDS:
+            self.conditions.append(expr == value)
+        else:
+            self.conditions.append(expr == _jsonb(value))
+
+
+def compile_patch(
+    operations: Sequence[schemas.JsonPatchOperation],
+) -> Tuple[Dict[str, Any], List[Any]]:
+    """
+    Returns (column -> new value expression, WHERE conditions) for an UPDATE
+    of user_profiles. Raises PatchError for patches that can never apply.
+    """
+    compiler = _Compiler()
+    for operation in operations:
+        field, rest = parse_pointer(operation.path)
+        if operation.op in ("add", "replace", "test"):
+            if "value" not in operation.model_fields_set:
+                raise PatchError(f"'{operation.op}' needs a value")
+            value = _validate(field, rest, operation.value)
+            if operation.op == "test":
+                compiler.test(field, rest, value)
+                continue
+            if value is None and not rest:
+                # A null field is SQL NULL, as after "remove" and for "test"
+                sql_value = null()
+            elif field in TEXT_FIELDS:
+                sql_value = value
+            else:
+                sql_value = _jsonb(value)
+            if operation.op == "add":
+                compiler.add(field, rest, sql_value)
+            else:
+                compiler.replace(field, rest, sql_value)
+        elif operation.op == "remove":
+            compiler.remove(field, rest)
+        else:  # move, copy
+            if operation.from_ is None:
+                raise PatchError(f"'{operation.op}' needs 'from'")
+            from_field, from_rest = parse_pointer(operation.from_)
+            if from_field != field or not from_rest or not rest:
+                raise PatchError(f"'{operation.op}' works within one document only")
+            compiler.exists(from_field, from_rest)
+            moved = _get(compiler.current(from_field), from_rest)
+            if operation.op == "move":
+                compiler.remove(from_field, from_rest)
+            compiler.add(field, rest, moved)
+    return compiler.values, compiler.conditions
@@ -0,0 +1,203 @@
+"""
+Rate limiting and admission control for application submissions.
+
+Every submission costs a browser run, so two checks run before the request
+reaches the route (see middleware.RateLimitMiddleware):
+
+- admission: while the backlog of applications no worker has started on
+  exceeds ADMISSION_MAX_BACKLOG, new submissions are turned away. The backlog
+  comes from the user_application_stats counters and is cached for a few
+  seconds per process.
+- rate limit: a sliding window per user (the JWT subject, decoded without a
+  database lookup) and per client IP, checked and recorded atomically by one
+  Lua script, i.e. one Redis round trip. A request that turns out to start
+  no run (an Idempotency-Key replay) is refunded by the route, see
+  refund_request().
+
+Both fail open: if Redis or the database is unavailable the request goes
+through, since refusing all submissions is worse than briefly not limiting.
+"""
+
+import logging
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from redis.exceptions import RedisError
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.config import settings
+from app.services.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+# KEYS: one sorted set per limited identity; ARGV: now_ms, window_ms, member,
+# then one limit per key. Members are request timestamps. Nothing is recorded
+# unless every key has room, so rejected requests do not extend the wait.
+# Returns {allowed, index of the key that blocked (1-based), retry_after_ms}.
+SLIDING_WINDOW_LUA = """
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local blocked, retry = 0, 0
+for i, key in ipairs(KEYS) do
+  redis.call('ZREMRANGEBYSCORE', key, '-inf', now - window)
+  if redis.call('ZCARD', key) >= tonumber(ARGV[3 + i]) then
+    local oldest = redis.call('ZRANGE', key, 0, 0, 'WITHSCORES')
+    local wait = tonumber(oldest[2]) + window - now
+    if wait > retry then
+      blocked, retry = i, wait
+    end
+  end
+end
+if blocked > 0 then
+  return {0, blocked, retry}
+end
+for _, key in ipairs(KEYS) do
+  redis.call('ZADD', key, now, ARGV[3])
+  redis.call('PEXPIRE', key, window)
+end
+return {1, 0, 0}
+"""
+
+
+@dataclass
+class Rejection:
+    reason: str  # "backlog", "user" or "ip"
+    retry_after: int  # seconds
+
+    @property
+    def detail(self) -> str:
+        if self.reason == "backlog":
+            return "Too many applications are waiting to be processed, try again later."
+        return "Too many applications submitted, try again later."
+
+
+# Request state entry holding (subject, client_ip, member) of an admitted request
+CHARGE_STATE = "rate_limit_charge"
+
+_script = None
+_backlog: Tuple[float, int] = (0.0, 0)  # (fetched at, pending applications)
+_backlog_lock = threading.Lock()
+
+
+def pending_backlog() -> int:
+    """Applications no worker has started on, cached for a few seconds."""
+    global _backlog
+    fetched_at, count = _backlog
+    if time.monotonic() - fetched_at < settings.ADMISSION_BACKLOG_CACHE_SECONDS:
+        return count
+    with _backlog_lock:
+        fetched_at, count = _backlog
+        if time.monotonic() - fetched_at < settings.ADMISSION_BACKLOG_CACHE_SECONDS:
+            return count
+        from app import crud
+        from app.database import SessionLocal
+
+        db = SessionLocal()
+        try:
+            count = crud.get_pending_application_count(db)
+        finally:
+            db.close()
+        _backlog = (time.monotonic(), count)
+    return count
+
+
+def _check_backlog() -> Optional[Rejection]:
+    if settings.ADMISSION_MAX_BACKLOG <= 0:
+        return None
+    try:
+        backlog = pending_backlog()
+    except SQLAlchemyError as e:
+        logger.warning(f"Admission check skipped, backlog unavailable: {e}")
+        return None
+    if backlog < settings.ADMISSION_MAX_BACKLOG:
+        return None
+    return Rejection("backlog", settings.ADMISSION_RETRY_AFTER_SECONDS)
+
+
+def _limits(
+    subject: Optional[str], client_ip: Optional[str]
+) -> List[Tuple[str, str, int]]:
+    """(reason, Redis key, limit) for each window that applies."""
+    limits: List[Tuple[str, str, int]] = []
+    if subject and settings.RATE_LIMIT_PER_USER > 0:
+        limits.append(
+            ("user", f"ratelimit:user:{subject}", settings.RATE_LIMIT_PER_USER)
+        )
+    if client_ip and settings.RATE_LIMIT_PER_IP > 0:
+        limits.append(("ip", f"ratelimit:ip:{client_ip}", settings.RATE_LIMIT_PER_IP))
+    return limits
+
+
+def _check_rate(
+    subject: Optional[str], client_ip: Optional[str], member: str
+) -> Optional[Rejection]:
+    global _script
+    limits = _limits(subject, client_ip)
+    if not limits:
+        return None
+
+    now_ms = int(time.time() * 1000)
+    try:
+        if _script is None:
+            _script = get_redis().register_script(SLIDING_WINDOW_LUA)
+        allowed, blocked, retry_ms = _script(
+            keys=[key for _, key, _ in limits],
+            args=[
+                now_ms,
+                settings.RATE_LIMIT_WINDOW_SECONDS * 1000,
+                member,
+                *(limit for _, _, limit in limits),
+            ],
+        )
+    except RedisError as e:
+        logger.warning(f"Rate limit check skipped, Redis unavailable: {e}")
+        return None
+    if allowed:
+        return None
+    return Rejection(limits[int(blocked) - 1][0], max(1, -(-int(retry_ms) // 1000)))
+
+
+def new_member() -> str:
+    """A unique window entry for one request."""
+    return f"{int(time.time() * 1000)}-{uuid.uuid4().hex[:8]}"
+
+
+def admit(
+    subject: Optional[str], client_ip: Optional[str], member: Optional[str] = None
+) -> Optional[Rejection]:
+    """
+    Returns why a submission must be turned away, or None to let it through.
+    An admitted request is recorded in its windows as member.
+    """
+    if not settings.RATE_LIMIT_ENABLED:
+        return None
+    # Admission first: a request refused for the backlog uses no rate budget
+    return _check_backlog() or _check_rate(subject, client_ip, member or new_member())
+
+
+def refund(subject: Optional[str], client_ip: Optional[str], member: str) -> None:
+    """Removes an admitted request from its windows again."""
+    keys = [key for _, key, _ in _limits(subject, client_ip)]
+    if not keys:
+        return
+    try:
+        pipeline = get_redis().pipeline(transaction=False)
+        for key in keys:
+            pipeline.zrem(key, member)
+        pipeline.execute()
+    except RedisError as e:
+        logger.warning(f"Rate limit refund skipped, Redis unavailable: {e}")
+
+
+def refund_request(request) -> None:
+    """
+    Refunds the request's rate limit charge, recorded by RateLimitMiddleware
+    in the request state; for submissions that start no run.
+    """
+    charge = getattr(request.state, CHARGE_STATE, None)
+    if charge is not None:
+        refund(*charge)
+
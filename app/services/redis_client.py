@@ -0,0 +1,30 @@
+import logging
+import threading
+from typing import Optional
+
+import redis
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# A single connection pool per process. redis-py clients are thread-safe, so the
+# sync route handlers running in FastAPI's threadpool can share it.
+_client: Optional[redis.Redis] = None
+_client_lock = threading.Lock()
+
+
+def get_redis() -> redis.Redis:
+    """Returns the shared Redis client, creating it on first use."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = redis.Redis.from_url(
+                    settings.REDIS_URL,
+                    socket_connect_timeout=1,
+                    socket_timeout=1,
+                    decode_responses=True,
+                )
+                logger.info("Initialized Redis client")
+    return _client
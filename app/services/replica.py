@@ -0,0 +1,98 @@
+"""
+Routing of read-only sessions to the optional read replica.
+
+get_read_db (database.py) hands out a replica session unless:
+
+- no replica is configured (DATABASE_REPLICA_URL is empty);
+- the replica is more than REPLICA_MAX_LAG_SECONDS behind, or unreachable.
+  Lag is measured at most every REPLICA_LAG_CHECK_SECONDS per process;
+- the user wrote something in the last READ_YOUR_WRITES_SECONDS (a Redis key
+  set by mark_recent_write), so they see their own submission right away.
+  If Redis is unavailable, reads go to the primary.
+"""
+
+import hashlib
+import logging
+import threading
+import time
+from typing import Optional, Tuple
+
+from redis.exceptions import RedisError
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.config import settings
+from app.services.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+# Seconds since the last replayed transaction; 0 while fully caught up (no
+# WAL waiting to be replayed), so an idle primary does not look like lag.
+LAG_SQL = text(
+    "SELECT CASE WHEN NOT pg_is_in_recovery() "
+    "OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE coalesce(extract(epoch FROM now() - pg_last_xact_replay_timestamp()), 0) "
+    "END"
+)
+
+_lag: Tuple[float, Optional[float]] = (0.0, None)  # (checked at, lag or None)
+_lag_lock = threading.Lock()
+
+
+def replica_lag(engine) -> Optional[float]:
+    """Replica lag in seconds, cached briefly; None if it cannot be measured."""
+    global _lag
+    checked_at, lag = _lag
+    if (
+        checked_at
+        and time.monotonic() - checked_at < settings.REPLICA_LAG_CHECK_SECONDS
+    ):
+        return lag
+    with _lag_lock:
+        checked_at, lag = _lag
+        if (
+            checked_at
+            and time.monotonic() - checked_at < settings.REPLICA_LAG_CHECK_SECONDS
+        ):
+            return lag
+        try:
+            with engine.connect() as connection:
+                lag = float(connection.execute(LAG_SQL).scalar())
+        except SQLAlchemyError as e:
+            logger.warning(f"Replica lag check failed, reading from primary: {e}")
+            lag = None
+        _lag = (time.monotonic(), lag)
+    return lag
+
+
+def _recent_write_key(subject: str) -> str:
+    return f"ryw:{hashlib.sha256(subject.encode()).hexdigest()[:32]}"
+
+
+def mark_recent_write(subject: str) -> None:
+    """Sends the user's reads to the primary for READ_YOUR_WRITES_SECONDS."""
+    if not settings.DATABASE_REPLICA_URL:
+        return
+    try:
+        get_redis().set(
+            _recent_write_key(subject), 1, ex=settings.READ_YOUR_WRITES_SECONDS
+        )
+    except RedisError as e:
+        logger.warning(f"Could not record recent write for read routing: {e}")
+
+
+def _wrote_recently(subject: str) -> bool:
+    try:
+        return bool(get_redis().exists(_recent_write_key(subject)))
+    except RedisError:
+        return True  # Cannot tell; the primary is always fresh
+
+
+def use_replica(engine, subject: Optional[str]) -> bool:
+    """Whether a read for the given token subject may go to the replica."""
+    if engine is None:
+        return False
+    if subject and _wrote_recently(subject):
+        return False
+    lag = replica_lag(engine)
+    return lag is not None and lag <= settings.REPLICA_MAX_LAG_SECONDS
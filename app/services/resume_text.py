@@ -0,0 +1,148 @@
+"""
+Resume text extraction for agent context.
+
+Uploading a resume queues one extraction (EXTRACT_RESUME_TASK). The worker
+downloads the PDF once, hashes it and, unless resume_extractions already has
+a row for that SHA-256, extracts the text with pypdf and splits it into
+sections by their headings. The profile's resume_hash then points at the
+row, so every application run reads the text from the database instead of
+downloading and parsing the file again, and re-uploading the same file costs
+nothing but the download.
+"""
+
+import hashlib
+import io
+import logging
+import re
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from sqlalchemy.orm import Session
+
+from app import crud, models
+from app.config import settings
+from app.services import storage
+from app.services.storage_backends import backend_for_uri
+
+try:
+    from pypdf import PdfReader
+except ImportError:  # pypdf is optional; without it resumes are not extracted
+    PdfReader = None
+
+logger = logging.getLogger(__name__)
+
+# Section headings, by the key they are stored under
+SECTION_HEADINGS = {
+    "summary": ("summary", "profile", "about me", "objective"),
+    "experience": (
+        "experience",
+        "work experience",
+        "professional experience",
+        "employment",
+        "employment history",
+        "work history",
+    ),
+    "education": ("education", "academic background"),
+    "skills": ("skills", "technical skills", "core competencies", "technologies"),
+    "projects": ("projects", "personal projects"),
+    "certifications": ("certifications", "certificates", "licenses"),
+    "languages": ("languages",),
+    "awards": ("awards", "honors", "achievements"),
+    "publications": ("publications",),
+    "volunteering": ("volunteering", "volunteer experience"),
+}
+_HEADING_KEYS = {
+    heading: key for key, headings in SECTION_HEADINGS.items() for heading in headings
+}
+_HEADING_CLEANUP = re.compile(r"[^a-z ]+")
+
+
+@dataclass
+class ResumeText:
+    text: str
+    sections: Dict[str, str]
+    page_count: int
+
+
+def _heading_key(line: str) -> Optional[str]:
+    if len(line) > 40:
+        return None
+    return _HEADING_KEYS.get(" ".join(_HEADING_CLEANUP.sub(" ", line.lower()).split()))
+
+
+def split_sections(text: str) -> Dict[str, str]:
+    """
+    Splits resume text at lines that are just a known heading ("EXPERIENCE",
+    "Technical Skills:"). Text before the first heading is stored as "header".
+    """
+    sections: Dict[str, list] = {}
+    current = "header"
+    for line in text.splitlines():
+        key = _heading_key(line.strip())
+        if key is not None:
+            current = key
+            continue
+        sections.setdefault(current, []).append(line)
+    joined = {key: "\n".join(lines).strip() for key, lines in sections.items()}
+    return {key: value for key, value in joined.items() if value}
+
+
+def extract(pdf_bytes: bytes) -> ResumeText:
+    """Extracts the text of a PDF, capped at RESUME_TEXT_MAX_CHARS."""
+    reader = PdfReader(io.BytesIO(pdf_bytes))
+    pages = [page.extract_text() or "" for page in reader.pages]
+    text = "\n".join(page.strip() for page in pages if page.strip())
+    text = text[: settings.RESUME_TEXT_MAX_CHARS]
+    return ResumeText(text=text, sections=split_sections(text), page_count=len(pages))
+
+
+def _download(resume_uri: str) -> bytes:
+    buffer = bytearray()
+    for chunk in backend_for_uri(resume_uri).iter_bytes(resume_uri):
+        buffer += chunk
+        if len(buffer) > settings.RESUME_MAX_BYTES:
+            raise ValueError(f"Resume {resume_uri} exceeds RESUME_MAX_BYTES")
+    return bytes(buffer)
+
+
+def extract_for_profile(db: Session, user_id: int, resume_uri: str) -> Optional[str]:
+    """
+    Makes sure the resume at resume_uri has an extraction and links it to the
+    user's profile, unless the profile has moved on to another resume.
+    Returns the content hash, or None when nothing could be extracted.
+    """
+    if PdfReader is None:
+        logger.warning("pypdf is not installed, skipping resume text extraction")
+        return None
+    if not storage.is_user_object(resume_uri, user_id):
+        logger.warning(f"Resume {resume_uri} does not belong to user {user_id}")
+        return None
+    pdf_bytes = _download(resume_uri)
+    content_hash = hashlib.sha256(pdf_bytes).hexdigest()
+    if crud.get_resume_extraction(db, content_hash) is None:
+        resume = extract(pdf_bytes)
+        crud.save_resume_extraction(
+            db,
+            content_hash=content_hash,
+            text=resume.text,
+            sections=resume.sections,
+            page_count=resume.page_count,
+        )
+        logger.info(
+            f"Extracted {len(resume.text)} characters in {len(resume.sections)} "
+            f"sections from resume {content_hash[:12]}"
+        )
+    if not crud.set_user_resume_hash(db, user_id, resume_uri, content_hash):
+        logger.info(f"Resume of user {user_id} changed during extraction")
+    return content_hash
+
+
+def agent_context(extraction: models.ResumeExtraction) -> str:
+    """The resume as a block of text for the agent's task description."""
+    if extraction.sections:
+        body = "\n\n".join(
+            f"{key.upper()}\n{value}" for key, value in extraction.sections.items()
+        )
+    else:
+        body = extraction.text
+    return f"Applicant's resume (extracted text):\n{body}"
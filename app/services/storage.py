@@ -1,48 +1,39 @@
 import logging
+import os
+import time
 import uuid
-from google.cloud import storage
-from google.api_core.exceptions import NotFound
 from fastapi import UploadFile, HTTPException, status
-from typing import Optional
+from jose import JWTError, jwt
+from typing import Optional, Tuple
 
 from app.config import settings
+from app.services.storage_backends import StorageBackend, backend_for_uri, get_backend
 
 logger = logging.getLogger(__name__)
 
-# Initialize GCS client
-# Authentication is typically handled by the environment (GOOGLE_APPLICATION_CREDENTIALS)
-# or Application Default Credentials (ADC) when running on GCP.
-try:
-    storage_client = storage.Client()
-    bucket = storage_client.bucket(settings.GCS_BUCKET_NAME)
-except NotFound as e:
-    logger.error(f"Failed to initialize GCS client or bucket: {e}")
-    # Depending on the application's needs, you might want to raise an error
-    # or handle this case gracefully if GCS is optional for some operations.
-    storage_client = None
-    bucket = None
-except Exception as e:
-    logger.error(f"Unexpected error initializing GCS: {e}")
-    storage_client = None
-    bucket = None
-
-
-async def upload_file_to_gcs(
-    file: UploadFile, user_id: int, destination_folder: str = settings.GCS_RESUME_FOLDER
-) -> Optional[str]:
+PDF_CONTENT_TYPE = "application/pdf"
+PDF_MAGIC = b"%PDF-"
+
+UPLOAD_TOKEN_PURPOSE = "resume-upload"
+# How long after the upload URL expires the client may still confirm the upload
+UPLOAD_CONFIRM_GRACE_SECONDS = 3600
+
+
+async def upload_resume(file: UploadFile, user_id: int) -> str:
     """
-    Uploads a file to Google Cloud Storage.
+    Stores an uploaded resume in the configured storage backend (STORAGE_URI).
 
     Args:
         file: The file uploaded via FastAPI's UploadFile.
         user_id: The ID of the user uploading the file, used for path structuring.
-        destination_folder: The base folder within the GCS bucket.
 
     Returns:
-        The full GCS path (gs://bucket/folder/filename) of the uploaded file, or None if upload fails.
+        The URI of the stored file (gs://..., s3://... or file://...).
     """
-    if not bucket or not storage_client:
-        logger.error("GCS bucket not initialized. Cannot upload file.")
+    try:
+        backend = get_backend()
+    except Exception as e:
+        logger.error(f"Storage backend not available. Cannot upload file: {e}")
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="Storage service is not configured or available.",
@@ -58,29 +49,15 @@ async def upload_file_to_gcs(
     unique_filename = (
         f"{uuid.uuid4()}.{file_extension}" if file_extension else str(uuid.uuid4())
     )
-
-    # Construct the full path in GCS
-    blob_name = f"{destination_folder}/{user_id}/{unique_filename}"
-    blob = bucket.blob(blob_name)
+    key = f"{user_id}/{unique_filename}"
 
     try:
-        # Read file content asynchronously
-        content = await file.read()
-        # Upload the file content
-        blob.upload_from_string(content, content_type=file.content_type)
-        logger.info(f"File {file.filename} uploaded to GCS as {blob_name}")
-
-        # Return the GCS URI (gs://bucket-name/path/to/blob)
-        return f"gs://{settings.GCS_BUCKET_NAME}/{blob_name}"
-
-    except NotFound as e:
-        logger.error(f"GCS Upload Error for {blob_name}: {e}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to upload file to storage: {e}",
-        )
+        # Stream the spooled upload to the backend off the event loop
+        uri = await backend.run(backend.save, key, file.file, file.content_type)
+        logger.info(f"File {file.filename} stored as {uri}")
+        return uri
     except Exception as e:
-        logger.error(f"Unexpected error during GCS upload for {blob_name}: {e}")
+        logger.error(f"Unexpected error storing upload for user {user_id}: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="An unexpected error occurred during file upload.",
@@ -88,3 +65,83 @@ async def upload_file_to_gcs(
     finally:
         # Ensure the file cursor is closed if applicable (FastAPI handles this for UploadFile)
         await file.close()
+
+
+def new_resume_key(user_id: int) -> str:
+    """Allocates a fresh storage key in the user's storage area."""
+    return f"{user_id}/{uuid.uuid4()}.pdf"
+
+
+def create_upload_token(user_id: int, key: str, content_type: str) -> str:
+    """
+    Signs the details of a pending direct upload. The token authorizes the
+    local-backend upload endpoint and is required to confirm the upload.
+    """
+    now = int(time.time())
+    upload_until = now + settings.RESUME_UPLOAD_URL_TTL_SECONDS
+    claims = {
+        "sub": str(user_id),
+        "purpose": UPLOAD_TOKEN_PURPOSE,
+        "key": key,
+        "ct": content_type,
+        "upload_until": upload_until,
+        "exp": upload_until + UPLOAD_CONFIRM_GRACE_SECONDS,
+    }
+    return jwt.encode(claims, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+
+
+def decode_upload_token(token: str) -> Optional[dict]:
+    """Returns the claims of a valid upload token, or None."""
+    try:
+        claims = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except JWTError:
+        return None
+    if claims.get("purpose") != UPLOAD_TOKEN_PURPOSE:
+        return None
+    return claims
+
+
+def validate_stored_resume(backend: StorageBackend, uri: str) -> Optional[str]:
+    """
+    Checks a directly uploaded resume. Returns an error message, or None if the
+    object exists, is within RESUME_MAX_BYTES and is a PDF.
+    """
+    info = backend.stat(uri)
+    if info is None:
+        return "Uploaded file not found."
+    if info.size <= 0 or info.size > settings.RESUME_MAX_BYTES:
+        return f"Resume must be between 1 byte and {settings.RESUME_MAX_BYTES} bytes."
+    if info.content_type and not info.content_type.startswith(PDF_CONTENT_TYPE):
+        return "Invalid file type. Only PDF resumes are accepted."
+    if backend.read_prefix(uri, len(PDF_MAGIC)) != PDF_MAGIC:
+        return "Uploaded file is not a PDF."
+    return None
+
+
+def fetch_local(uri: str) -> Tuple[str, bool]:
+    """
+    Makes a stored file available on local disk for a worker.
+
+    Returns (path, is_temporary). Files from the local backend are used in
+    place; remote objects are downloaded to a temporary file that the caller
+    must remove (see release_local).
+    """
+    return backend_for_uri(uri).fetch_local(uri)
+
+
+def release_local(path: str, is_temporary: bool) -> None:
+    """Removes a temporary copy created by fetch_local."""
+    if is_temporary and os.path.exists(path):
+        try:
+            os.remove(path)
+        except OSError as e:
+            logger.error(f"Failed to remove temporary file {path}: {e}")
+
+
+def is_user_object(uri: str, user_id: int) -> bool:
+    """Whether a stored URI lies inside the given user's storage area."""
+    try:
+        backend = backend_for_uri(uri)
+    except ValueError:
+        return False
+    return backend.canonical_uri(uri).startswith(backend.make_uri(f"{user_id}/"))
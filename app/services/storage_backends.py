@@ -0,0 +1,447 @@
+import logging
+import mimetypes
+import os
+import shutil
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import BinaryIO, Callable, Dict, Iterator, Optional, Tuple, TypeVar
+from urllib.parse import quote, urlparse
+
+from starlette.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.services import gcs
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+CHUNK_SIZE = 256 * 1024
+
+
+@dataclass
+class ObjectInfo:
+    size: int
+    content_type: Optional[str]
+
+
+@dataclass
+class UploadTarget:
+    """Where and how a client should send bytes for a direct upload."""
+
+    url: str
+    method: str
+    headers: Dict[str, str]
+
+
+class StorageBackend(ABC):
+    """
+    A place to keep resumes, addressed by URIs of the backend's scheme.
+
+    Keys passed to ``make_uri`` are relative to the backend's configured
+    prefix (e.g. ``"12/3f2a....pdf"``); everything else takes full URIs, which
+    is what gets stored in ``UserProfile.resume_path``.
+    """
+
+    scheme: str
+
+    def __init__(self, location: str, prefix: str = ""):
+        self.location = location
+        self.prefix = prefix.strip("/")
+
+    def make_uri(self, key: str) -> str:
+        name = f"{self.prefix}/{key}" if self.prefix else key
+        return f"{self.scheme}://{self.location}/{name}"
+
+    def object_name(self, uri: str) -> str:
+        """Returns the object name inside this backend's bucket for a URI."""
+        parsed = urlparse(uri)
+        if parsed.scheme != self.scheme or parsed.netloc != self.location:
+            raise ValueError(f"URI {uri} does not belong to {self.make_uri('')}")
+        name = parsed.path.lstrip("/")
+        if not name:
+            raise ValueError(f"Invalid storage URI: {uri}")
+        return name
+
+    def owns(self, uri: str) -> bool:
+        """Whether the URI points inside this backend's configured prefix."""
+        try:
+            name = self.object_name(uri)
+        except ValueError:
+            return False
+        return not self.prefix or name.startswith(self.prefix + "/")
+
+    def canonical_uri(self, uri: str) -> str:
+        """Normalized form of a URI owned by this backend, for prefix checks."""
+        self.object_name(uri)
+        return uri
+
+    async def run(self, fn: Callable[..., T], *args, **kwargs) -> T:
+        """Runs a blocking backend call off the event loop."""
+        return await run_in_threadpool(fn, *args, **kwargs)
+
+    def local_path(self, uri: str) -> Optional[str]:
+        """Path of the object on this machine, if the backend is the local disk."""
+        return None
+
+    def generate_upload_url(
+        self, uri: str, content_type: str, max_bytes: int, expires_in: int
+    ) -> Optional[UploadTarget]:
+        """
+        Returns a short-lived URL the client can upload to directly, or None if
+        the backend has no native signed uploads (the API then issues its own).
+        """
+        return None
+
+    @abstractmethod
+    def save(self, key: str, file_obj: BinaryIO, content_type: Optional[str]) -> str:
+        """Stores the file under key and returns its URI."""
+
+    @abstractmethod
+    def stat(self, uri: str) -> Optional[ObjectInfo]:
+        """Returns size and content type, or None if the object does not exist."""
+
+    @abstractmethod
+    def fetch_local(self, uri: str) -> Tuple[str, bool]:
+        """
+        Makes the object available as a local file.
+        Returns (path, is_temporary); temporary files must be removed by the caller.
+        Raises FileNotFoundError if missing and ConnectionError on backend errors.
+        """
+
+    @abstractmethod
+    def iter_bytes(self, uri: str) -> Iterator[bytes]:
+        """Yields the object's content in chunks."""
+
+    @abstractmethod
+    def read_prefix(self, uri: str, length: int) -> bytes:
+        """Reads the first length bytes of the object (e.g. to check magic bytes)."""
+
+    @abstractmethod
+    def delete(self, uri: str) -> None:
+        """Deletes the object if it exists."""
+
+
+def _temp_path_for(name: str) -> str:
+    suffix = os.path.splitext(name)[1] or None
+    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as temp_file:
+        return temp_file.name
+
+
+class GCSBackend(StorageBackend):
+    scheme = "gs"
+
+    async def run(self, fn: Callable[..., T], *args, **kwargs) -> T:
+        # Use the bounded GCS executor rather than the shared threadpool.
+        return await gcs.run_blocking(fn, *args, **kwargs)
+
+    def save(self, key: str, file_obj: BinaryIO, content_type: Optional[str]) -> str:
+        uri = self.make_uri(key)
+        gcs.upload_file(self.location, self.object_name(uri), file_obj, content_type)
+        return uri
+
+    def stat(self, uri: str) -> Optional[ObjectInfo]:
+        blob = gcs.get_blob(self.location, self.object_name(uri))
+        if blob is None:
+            return None
+        return ObjectInfo(size=blob.size, content_type=blob.content_type)
+
+    def fetch_local(self, uri: str) -> Tuple[str, bool]:
+        from google.cloud.exceptions import NotFound, GoogleCloudError
+
+        name = self.object_name(uri)
+        temp_path = _temp_path_for(name)
+        logger.info(f"Downloading {uri} to temporary path: {temp_path}")
+        try:
+            gcs.download_to_filename(self.location, name, temp_path)
+        except NotFound:
+            os.remove(temp_path)
+            raise FileNotFoundError(f"GCS file not found: {uri}")
+        except GoogleCloudError as e:
+            os.remove(temp_path)
+            raise ConnectionError(f"Failed to download from GCS: {e}")
+        return temp_path, True
+
+    def iter_bytes(self, uri: str) -> Iterator[bytes]:
+        with gcs.open_reader(self.location, self.object_name(uri), CHUNK_SIZE) as reader:
+            while chunk := reader.read(CHUNK_SIZE):
+                yield chunk
+
+    def read_prefix(self, uri: str, length: int) -> bytes:
+        return gcs.download_range(self.location, self.object_name(uri), 0, length - 1)
+
+    def generate_upload_url(
+        self, uri: str, content_type: str, max_bytes: int, expires_in: int
+    ) -> Optional[UploadTarget]:
+        name = self.object_name(uri)
+        if settings.GCS_EMULATOR_HOST:
+            # fake-gcs-server does not verify signatures; use its simple upload API.
+            return UploadTarget(
+                url=(
+                    f"{settings.GCS_EMULATOR_HOST}/upload/storage/v1/b/"
+                    f"{self.location}/o?uploadType=media&name={quote(name, safe='')}"
+                ),
+                method="POST",
+                headers={"Content-Type": content_type},
+            )
+        # GCS rejects uploads outside this range, and the header is part of the signature.
+        headers = {"x-goog-content-length-range": f"1,{max_bytes}"}
+        url = gcs.generate_signed_url(
+            self.location,
+            name,
+            method="PUT",
+            expiration=timedelta(seconds=expires_in),
+            content_type=content_type,
+            headers=headers,
+        )
+        return UploadTarget(
+            url=url, method="PUT", headers={"Content-Type": content_type, **headers}
+        )
+
+    def delete(self, uri: str) -> None:
+        from google.cloud.exceptions import NotFound
+
+        try:
+            gcs.delete_blob(self.location, self.object_name(uri))
+        except NotFound:
+            pass
+
+
+# boto3 clients are thread-safe but must not be shared across fork().
+_s3_client = None
+_s3_client_pid: Optional[int] = None
+_s3_lock = threading.Lock()
+
+
+def _get_s3_client():
+    global _s3_client, _s3_client_pid
+    pid = os.getpid()
+    if _s3_client is None or _s3_client_pid != pid:
+        with _s3_lock:
+            if _s3_client is None or _s3_client_pid != pid:
+                import boto3  # Optional dependency, only needed for s3:// storage
+
+                _s3_client = boto3.client(
+                    "s3",
+                    endpoint_url=settings.S3_ENDPOINT_URL or None,
+                    region_name=settings.S3_REGION or None,
+                )
+                _s3_client_pid = pid
+    return _s3_client
+
+
+class S3Backend(StorageBackend):
+    """AWS S3 or any S3-compatible store (MinIO, R2, ...) via S3_ENDPOINT_URL."""
+
+    scheme = "s3"
+
+    @staticmethod
+    def _is_missing(error) -> bool:
+        code = error.response.get("Error", {}).get("Code")
+        return code in ("404", "NoSuchKey", "NotFound")
+
+    def save(self, key: str, file_obj: BinaryIO, content_type: Optional[str]) -> str:
+        uri = self.make_uri(key)
+        file_obj.seek(0)
+        extra_args = {"ContentType": content_type} if content_type else None
+        _get_s3_client().upload_fileobj(
+            file_obj, self.location, self.object_name(uri), ExtraArgs=extra_args
+        )
+        return uri
+
+    def stat(self, uri: str) -> Optional[ObjectInfo]:
+        from botocore.exceptions import ClientError
+
+        try:
+            head = _get_s3_client().head_object(
+                Bucket=self.location, Key=self.object_name(uri)
+            )
+        except ClientError as e:
+            if self._is_missing(e):
+                return None
+            raise
+        return ObjectInfo(size=head["ContentLength"], content_type=head.get("ContentType"))
+
+    def fetch_local(self, uri: str) -> Tuple[str, bool]:
+        from botocore.exceptions import BotoCoreError, ClientError
+
+        name = self.object_name(uri)
+        temp_path = _temp_path_for(name)
+        logger.info(f"Downloading {uri} to temporary path: {temp_path}")
+        try:
+            _get_s3_client().download_file(self.location, name, temp_path)
+        except ClientError as e:
+            os.remove(temp_path)
+            if self._is_missing(e):
+                raise FileNotFoundError(f"S3 object not found: {uri}")
+            raise ConnectionError(f"Failed to download from S3: {e}")
+        except BotoCoreError as e:
+            os.remove(temp_path)
+            raise ConnectionError(f"Failed to download from S3: {e}")
+        return temp_path, True
+
+    def iter_bytes(self, uri: str) -> Iterator[bytes]:
+        response = _get_s3_client().get_object(
+            Bucket=self.location, Key=self.object_name(uri)
+        )
+        yield from response["Body"].iter_chunks(CHUNK_SIZE)
+
+    def read_prefix(self, uri: str, length: int) -> bytes:
+        response = _get_s3_client().get_object(
+            Bucket=self.location, Key=self.object_name(uri), Range=f"bytes=0-{length - 1}"
+        )
+        return response["Body"].read()
+
+    def generate_upload_url(
+        self, uri: str, content_type: str, max_bytes: int, expires_in: int
+    ) -> Optional[UploadTarget]:
+        # Presigned PUTs cannot cap the size; the confirm step checks it instead.
+        url = _get_s3_client().generate_presigned_url(
+            "put_object",
+            Params={
+                "Bucket": self.location,
+                "Key": self.object_name(uri),
+                "ContentType": content_type,
+            },
+            ExpiresIn=expires_in,
+        )
+        return UploadTarget(url=url, method="PUT", headers={"Content-Type": content_type})
+
+    def delete(self, uri: str) -> None:
+        _get_s3_client().delete_object(Bucket=self.location, Key=self.object_name(uri))
+
+
+class LocalBackend(StorageBackend):
+    """
+    Files on a local (or shared) filesystem below a root directory.
+
+    Workers on the same machine read the stored file in place, and the API can
+    hand the path to the server (sendfile / X-Accel-Redirect) for downloads.
+    """
+
+    scheme = "file"
+
+    def __init__(self, location: str, prefix: str = ""):
+        # file:///var/lib/swifty/resumes -> location "", root /var/lib/swifty/resumes
+        super().__init__(location, prefix)
+        self.root = os.path.realpath("/" + self.prefix)
+
+    def make_uri(self, key: str) -> str:
+        return "file://" + os.path.join(self.root, key)
+
+    def object_name(self, uri: str) -> str:
+        parsed = urlparse(uri)
+        if parsed.scheme != self.scheme or parsed.netloc:
+            raise ValueError(f"Invalid local storage URI: {uri}")
+        path = os.path.realpath(parsed.path)
+        # Never resolve outside the storage root (resume_path is user-editable).
+        if os.path.commonpath([path, self.root]) != self.root or path == self.root:
+            raise ValueError(f"URI {uri} is outside the storage root {self.root}")
+        return path
+
+    def owns(self, uri: str) -> bool:
+        try:
+            self.object_name(uri)
+        except ValueError:
+            return False
+        return True
+
+    def canonical_uri(self, uri: str) -> str:
+        return "file://" + self.object_name(uri)
+
+    def local_path(self, uri: str) -> Optional[str]:
+        return self.object_name(uri)
+
+    def save(self, key: str, file_obj: BinaryIO, content_type: Optional[str]) -> str:
+        uri = self.make_uri(key)
+        path = self.object_name(uri)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        file_obj.seek(0)
+        # Write next to the destination and rename, so readers never see partial files.
+        with tempfile.NamedTemporaryFile(
+            dir=os.path.dirname(path), delete=False, prefix=".upload-"
+        ) as temp_file:
+            shutil.copyfileobj(file_obj, temp_file, CHUNK_SIZE)
+        # NamedTemporaryFile creates 0600 files
+        os.chmod(temp_file.name, settings.STORAGE_FILE_MODE)
+        os.replace(temp_file.name, path)
+        return uri
+
+    def stat(self, uri: str) -> Optional[ObjectInfo]:
+        path = self.object_name(uri)
+        try:
+            size = os.stat(path).st_size
+        except FileNotFoundError:
+            return None
+        return ObjectInfo(size=size, content_type=mimetypes.guess_type(path)[0])
+
+    def fetch_local(self, uri: str) -> Tuple[str, bool]:
+        path = self.object_name(uri)
+        if not os.path.isfile(path):
+            raise FileNotFoundError(f"Local file not found: {uri}")
+        return path, False
+
+    def iter_bytes(self, uri: str) -> Iterator[bytes]:
+        with open(self.object_name(uri), "rb") as f:
+            while chunk := f.read(CHUNK_SIZE):
+                yield chunk
+
+    def read_prefix(self, uri: str, length: int) -> bytes:
+        with open(self.object_name(uri), "rb") as f:
+            return f.read(length)
+
+    def delete(self, uri: str) -> None:
+        try:
+            os.remove(self.object_name(uri))
+        except FileNotFoundError:
+            pass
+
+
+BACKENDS: Dict[str, type] = {
+    GCSBackend.scheme: GCSBackend,
+    S3Backend.scheme: S3Backend,
+    LocalBackend.scheme: LocalBackend,
+}
+
+_backend: Optional[StorageBackend] = None
+
+
+def backend_from_uri(storage_uri: str) -> StorageBackend:
+    """Builds the backend for a base URI such as gs://bucket/prefix."""
+    parsed = urlparse(storage_uri)
+    backend_cls = BACKENDS.get(parsed.scheme)
+    if backend_cls is None:
+        raise ValueError(f"Unsupported storage URI scheme: {storage_uri}")
+    return backend_cls(parsed.netloc, parsed.path)
+
+
+def get_backend() -> StorageBackend:
+    """Returns the configured backend for new uploads (STORAGE_URI)."""
+    global _backend
+    if _backend is None:
+        storage_uri = (
+            settings.STORAGE_URI
+            or f"gs://{settings.GCS_BUCKET_NAME}/{settings.GCS_RESUME_FOLDER}"
+        )
+        _backend = backend_from_uri(storage_uri)
+    return _backend
+
+
+def backend_for_uri(uri: str) -> StorageBackend:
+    """
+    Returns the backend able to read a stored object URI.
+
+    Only the configured storage location is accepted, plus the legacy
+    gs://GCS_BUCKET_NAME/GCS_RESUME_FOLDER location that resumes were written
+    to before STORAGE_URI existed.
+    """
+    backend = get_backend()
+    if backend.owns(uri):
+        return backend
+    legacy = GCSBackend(settings.GCS_BUCKET_NAME, settings.GCS_RESUME_FOLDER)
+    if legacy.owns(uri):
+        return legacy
+    raise ValueError(f"URI {uri} is not managed by the configured storage")
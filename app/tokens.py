@@ -0,0 +1,23 @@
+from typing import Optional
+
+from jose import JWTError, jwt
+
+from .config import settings
+
+
+def bearer_subject(authorization: str) -> Optional[str]:
+    """
+    The "sub" (user email) of a valid bearer token from an Authorization
+    header, or None. Only verifies the signature and expiry; it never touches
+    the database, so middleware and session routing can use it cheaply.
+    """
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        payload = jwt.decode(
+            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
+        )
+    except JWTError:
+        return None
+    return payload.get("sub")
@@ -0,0 +1,83 @@
+"""
+Canonical form of job URLs, used to recognise resubmissions of a posting.
+
+Two URLs have the same canonical form when they differ only in:
+
+- scheme and host case, a leading "www.", or the default port;
+- a trailing slash, or repeated slashes in the path;
+- tracking parameters (utm_*, gclid, LinkedIn's trk/refId, Greenhouse's
+  gh_src, ...) or the order of the remaining parameters;
+- a plain fragment ("#apply"). Router fragments ("#/jobs/42", "#!/jobs/42")
+  identify the page and are kept.
+
+The path itself keeps its case, since job boards treat it as case-sensitive.
+"""
+
+import re
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Query parameters that only record where a visitor came from
+TRACKING_PARAMS = frozenset(
+    {
+        "gclid",
+        "gclsrc",
+        "dclid",
+        "fbclid",
+        "msclkid",
+        "yclid",
+        "twclid",
+        "li_fat_id",
+        "mc_cid",
+        "mc_eid",
+        "_hsenc",
+        "_hsmi",
+        "igshid",
+        "ref_src",
+        "referrer",
+        "trk",
+        "trkinfo",
+        "trackingid",
+        "refid",
+        "gh_src",
+        "lever-source",
+        "lever-origin",
+        "lever-source[]",
+    }
+)
+TRACKING_PREFIXES = ("utm_", "pk_", "mtm_")
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+_SLASHES = re.compile(r"/{2,}")
+
+
+def _is_tracking(name: str) -> bool:
+    name = name.lower()
+    return name in TRACKING_PARAMS or name.startswith(TRACKING_PREFIXES)
+
+
+def canonicalize_url(url: str) -> str:
+    """Returns the canonical form of a job URL (see the module docstring)."""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+
+    host = (parts.hostname or "").lower().rstrip(".")
+    if host.startswith("www."):
+        host = host[4:]
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+    netloc = host if port in (None, DEFAULT_PORTS.get(scheme)) else f"{host}:{port}"
+
+    path = _SLASHES.sub("/", parts.path).rstrip("/")
+
+    query = urlencode(
+        sorted(
+            (name, value)
+            for name, value in parse_qsl(parts.query, keep_blank_values=True)
+            if not _is_tracking(name)
+        )
+    )
+
+    fragment = parts.fragment if parts.fragment.startswith(("/", "!")) else ""
+    return urlunsplit((scheme, netloc, path, query, fragment))
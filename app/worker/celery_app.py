@@ -1,6 +1,12 @@
 from celery import Celery
 from ..config import settings
 
+# Task names are fixed so producers (the API) can enqueue by name with
+# send_task() without importing the task modules and their dependencies.
+PROCESS_APPLICATION_TASK = "app.worker.tasks.process_application_placeholder"
+MAINTAIN_EVENT_PARTITIONS_TASK = "app.worker.tasks.maintain_event_partitions"
+EXTRACT_RESUME_TASK = "app.worker.tasks.extract_resume_text"
+
 # Initialize Celery
 # The first argument is the name of the current module, important for Celery's auto-discovery.
 # The broker and backend URLs are taken from the application settings.
@@ -18,6 +24,17 @@ celery_app.conf.update(
     result_serializer="json",
     timezone="UTC",
     enable_utc=True,
+    # Recycle a child (after it reports its current task) once its RSS exceeds
+    # the limit; browser processes are watched separately by worker/memory.py
+    worker_max_memory_per_child=(settings.WORKER_MAX_MEMORY_PER_CHILD_MB * 1024)
+    or None,
+    # Periodic jobs, run with: celery -A app.worker.celery_app beat
+    beat_schedule={
+        "maintain-event-partitions": {
+            "task": MAINTAIN_EVENT_PARTITIONS_TASK,
+            "schedule": 24 * 60 * 60,
+        },
+    },
     # Add other Celery settings if needed
     # Example: task_track_started=True
 )
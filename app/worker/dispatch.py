@@ -0,0 +1,33 @@
+"""
+Enqueues application processing on the configured QUEUE_BACKEND.
+
+Both backends record the work in the caller's transaction, so it commits (or
+rolls back) together with the application it refers to, and the request never
+waits on the broker:
+
+- postgres: a job_queue row, claimed directly by the pg_queue workers;
+- celery: an outbox row, published to the broker by the outbox relay.
+"""
+
+from typing import Any, Sequence
+
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from . import outbox, pg_queue
+from .celery_app import EXTRACT_RESUME_TASK, PROCESS_APPLICATION_TASK
+
+
+def enqueue(db: Session, task: str, args: Sequence[Any] = ()) -> None:
+    if settings.QUEUE_BACKEND == "postgres":
+        pg_queue.enqueue(db, task, args)
+    else:
+        outbox.enqueue(db, task, args)
+
+
+def enqueue_application(db: Session, application_id: int) -> None:
+    enqueue(db, PROCESS_APPLICATION_TASK, [application_id])
+
+
+def enqueue_resume_extraction(db: Session, user_id: int, resume_uri: str) -> None:
+    enqueue(db, EXTRACT_RESUME_TASK, [user_id, resume_uri])
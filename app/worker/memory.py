@@ -0,0 +1,164 @@
+"""
+Memory watchdog for worker children.
+
+Chromium (launched by browser_use through Playwright) runs as descendants of
+the Celery child process, so its memory is invisible to Celery's own
+worker_max_memory_per_child check. This module samples the RSS of the child
+and of its browser processes while a task runs, and after each task:
+
+- restarts the browser when the browser processes exceed
+  BROWSER_RESTART_RSS_MB;
+- leaves recycling of a bloated Python process to Celery, which checks
+  worker_max_memory_per_child (WORKER_MAX_MEMORY_PER_CHILD_MB) only after
+  the task's result has been reported.
+
+Both actions happen between tasks only; a running application is never
+interrupted. Celery drives the checks through its task_prerun/task_postrun
+signals; the Postgres queue worker, which runs tasks without Celery's worker
+machinery, calls start_sampling() and check_memory() around each job.
+"""
+
+import logging
+import os
+import sys
+import threading
+from typing import Optional, Tuple
+
+from celery.signals import task_postrun, task_prerun
+
+from ..config import settings
+
+try:
+    import psutil
+except ImportError:  # pragma: no cover - psutil is optional
+    psutil = None
+
+logger = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+
+
+def rss_breakdown() -> Tuple[int, int]:
+    """Returns (worker RSS, total RSS of its descendant processes) in bytes."""
+    process = psutil.Process(os.getpid())
+    worker_rss = process.memory_info().rss
+    browser_rss = 0
+    for child in process.children(recursive=True):
+        try:
+            browser_rss += child.memory_info().rss
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            continue
+    return worker_rss, browser_rss
+
+
+class _Sampler(threading.Thread):
+    """Records peak RSS while a task runs. Observes only, never kills."""
+
+    def __init__(self, interval: float):
+        super().__init__(name="rss-sampler", daemon=True)
+        self.interval = interval
+        self.stopped = threading.Event()
+        self.peak_worker = 0
+        self.peak_browser = 0
+
+    def sample(self) -> None:
+        try:
+            worker_rss, browser_rss = rss_breakdown()
+        except psutil.Error:
+            return
+        self.peak_worker = max(self.peak_worker, worker_rss)
+        self.peak_browser = max(self.peak_browser, browser_rss)
+
+    def run(self) -> None:
+        while not self.stopped.wait(self.interval):
+            self.sample()
+
+
+_sampler: Optional[_Sampler] = None
+
+
+def _terminate_descendants() -> None:
+    """Stops the browser processes (Chromium and the Playwright driver)."""
+    children = psutil.Process(os.getpid()).children(recursive=True)
+    for child in children:
+        try:
+            child.terminate()
+        except psutil.NoSuchProcess:
+            pass
+    _, alive = psutil.wait_procs(children, timeout=5)
+    for child in alive:
+        try:
+            child.kill()
+        except psutil.NoSuchProcess:
+            pass
+
+
+def restart_browser() -> None:
+    """
+    Forgets the shared Browser and stops its process tree, so the next run
+    launches a fresh Chromium.
+    """
+    # Only a child that has run an application has the browser module loaded
+    browser = sys.modules.get("app.services.browser")
+    if browser is not None:
+        browser.reset_browser()
+    _terminate_descendants()
+
+
+def start_sampling() -> None:
+    """Starts recording peak RSS for the task about to run."""
+    global _sampler
+    if psutil is None or settings.WORKER_RSS_SAMPLE_SECONDS <= 0:
+        return
+    _sampler = _Sampler(settings.WORKER_RSS_SAMPLE_SECONDS)
+    _sampler.sample()
+    _sampler.start()
+
+
+def check_memory(run: str) -> None:
+    """
+    Logs the memory use after a task ("task <id>", "job <id>") and restarts
+    the browser when its processes are over BROWSER_RESTART_RSS_MB.
+    """
+    global _sampler
+    if psutil is None:
+        return
+    sampler, _sampler = _sampler, None
+    if sampler is not None:
+        sampler.stopped.set()
+        sampler.join()
+        sampler.sample()
+
+    try:
+        worker_rss, browser_rss = rss_breakdown()
+    except psutil.Error as e:
+        logger.warning(f"Could not read worker memory usage: {e}")
+        return
+    peak = (
+        f" (peak worker {sampler.peak_worker // MB} MiB, "
+        f"browser {sampler.peak_browser // MB} MiB)"
+        if sampler is not None
+        else ""
+    )
+    logger.info(
+        f"RSS after {run}: worker {worker_rss // MB} MiB, "
+        f"browser {browser_rss // MB} MiB{peak}"
+    )
+
+    limit = settings.BROWSER_RESTART_RSS_MB
+    if limit > 0 and browser_rss > limit * MB:
+        logger.warning(
+            f"Browser processes use {browser_rss // MB} MiB (limit {limit} MiB), "
+            "restarting the browser"
+        )
+        restart_browser()
+
+
+@task_prerun.connect
+def _start_sampling(**kwargs) -> None:
+    start_sampling()
+
+
+@task_postrun.connect
+def _check_memory(task=None, task_id=None, **kwargs) -> None:
+    check_memory(f"task {task_id}")
@@ -0,0 +1,186 @@
+"""
+Transactional outbox for Celery tasks (QUEUE_BACKEND=celery).
+
+The API never talks to the broker: it inserts an outbox row in the same
+transaction as the data the task refers to (see worker/dispatch.py), so a
+committed application always has its task recorded and a rolled back one
+never does. The relay publishes the rows to the broker:
+
+- in id order, in batches of OUTBOX_BATCH_SIZE;
+- from one relay at a time (a Postgres advisory lock; extra relays wait as
+  hot standbys), so batches never interleave;
+- at least once: a row is deleted only after the broker accepted it. A relay
+  that crashes in between republishes with the same task id, and the task
+  skips applications it already picked up;
+- when the broker is down, the batch stops at the failing row and the relay
+  backs off exponentially (up to OUTBOX_MAX_BACKOFF_SECONDS) before retrying
+  from that row.
+
+Run the relay with:
+    python -m app.worker.outbox
+"""
+
+import argparse
+import json
+import logging
+import time
+from typing import Any, Optional, Sequence
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from . import pg_queue
+
+logger = logging.getLogger(__name__)
+
+NOTIFY_CHANNEL = "outbox"
+# pg_try_advisory_lock key held by the active relay
+RELAY_LOCK_ID = 0x6F7574626F78  # "outbox"
+
+
+def enqueue(db: Session, task: str, args: Sequence[Any] = ()) -> None:
+    """Records a task in the caller's transaction; the relay publishes it."""
+    db.execute(
+        text("INSERT INTO outbox (task, args) VALUES (:task, CAST(:args AS jsonb))"),
+        {"task": task, "args": json.dumps(list(args))},
+    )
+    db.execute(text("SELECT pg_notify(:channel, '')"), {"channel": NOTIFY_CHANNEL})
+
+
+def task_id(message_id: int) -> str:
+    """Celery task id of an outbox message; stable across republishing."""
+    return f"outbox-{message_id}"
+
+
+class PublishError(Exception):
+    pass
+
+
+def relay_batch(connection, celery_app, batch_size: int) -> int:
+    """
+    Publishes up to batch_size messages in id order and deletes them.
+    Returns the number published; raises PublishError after committing the
+    messages published before the one that failed.
+    """
+    published = []
+    failure = None
+    with connection.begin():
+        rows = connection.execute(
+            text(
+                "SELECT id, task, args FROM outbox ORDER BY id LIMIT :batch_size "
+                "FOR UPDATE"
+            ),
+            {"batch_size": batch_size},
+        ).all()
+        for row in rows:
+            try:
+                celery_app.send_task(row.task, args=row.args, task_id=task_id(row.id))
+            except Exception as e:
+                failure = (row.id, e)
+                break
+            published.append(row.id)
+
+        if published:
+            connection.execute(
+                text("DELETE FROM outbox WHERE id = ANY(:ids)"), {"ids": published}
+            )
+        if failure is not None:
+            connection.execute(
+                text(
+                    "UPDATE outbox SET attempts = attempts + 1, last_error = :error "
+                    "WHERE id = :id"
+                ),
+                {"id": failure[0], "error": str(failure[1])},
+            )
+    if failure is not None:
+        raise PublishError(
+            f"Publishing outbox message {failure[0]} failed: {failure[1]}"
+        )
+    return len(published)
+
+
+def outbox_lag(connection) -> dict:
+    """
+    Pending messages and the age of the oldest one, in seconds. The age is
+    how far the broker is behind the database; 0 when the outbox is empty.
+    """
+    row = connection.execute(
+        text(
+            "SELECT count(*) AS pending, "
+            "coalesce(extract(epoch FROM now() - min(created_at)), 0) AS lag "
+            "FROM outbox"
+        )
+    ).one()
+    return {"pending": row.pending, "lag_seconds": round(float(row.lag), 3)}
+
+
+def _try_lock(connection) -> bool:
+    with connection.begin():
+        return connection.execute(
+            text("SELECT pg_try_advisory_lock(:id)"), {"id": RELAY_LOCK_ID}
+        ).scalar()
+
+
+def run_relay(
+    engine,
+    batch_size: Optional[int] = None,
+    poll_seconds: Optional[float] = None,
+) -> None:
+    from .celery_app import celery_app
+
+    batch_size = batch_size or settings.OUTBOX_BATCH_SIZE
+    poll_seconds = poll_seconds or settings.OUTBOX_POLL_SECONDS
+    raw, listener = pg_queue.listen_connection(engine, NOTIFY_CHANNEL)
+    backoff = 0.0
+    try:
+        # The lock belongs to this connection's session, so every batch runs
+        # on it: if the connection dies, so does this relay's right to publish.
+        with engine.connect() as connection:
+            while not _try_lock(connection):
+                logger.info("Another outbox relay holds the lock, standing by")
+                time.sleep(poll_seconds * 5)
+            logger.info(f"Outbox relay active, listening on '{NOTIFY_CHANNEL}'")
+
+            while True:
+                try:
+                    published = relay_batch(connection, celery_app, batch_size)
+                except PublishError as e:
+                    backoff = min(
+                        max(backoff * 2, 1.0), settings.OUTBOX_MAX_BACKOFF_SECONDS
+                    )
+                    logger.warning(f"{e}; retrying in {backoff:.0f}s")
+                    time.sleep(backoff)
+                    continue
+                backoff = 0.0
+
+                if published:
+                    with connection.begin():
+                        lag = outbox_lag(connection)
+                    logger.info(
+                        f"Outbox relay published {published}, "
+                        f"pending {lag['pending']}, lag {lag['lag_seconds']}s"
+                    )
+                    if published == batch_size:
+                        continue  # More may be waiting; no need to sleep
+                pg_queue.wait_for_notify(listener, poll_seconds)
+    finally:
+        raw.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Outbox to Celery broker relay")
+    parser.add_argument("--batch-size", type=int, default=settings.OUTBOX_BATCH_SIZE)
+    parser.add_argument(
+        "--poll-seconds", type=float, default=settings.OUTBOX_POLL_SECONDS
+    )
+    args = parser.parse_args()
+
+    from ..database import engine
+
+    logging.basicConfig(level=logging.INFO)
+    run_relay(engine, args.batch_size, args.poll_seconds)
+
+
+if __name__ == "__main__":
+    main()
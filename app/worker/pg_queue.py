@@ -0,0 +1,240 @@
+"""
+Postgres job queue backend (QUEUE_BACKEND=postgres).
+
+Work is a row in job_queue, inserted in the same transaction as the data it
+refers to (see worker/dispatch.py). Workers claim batches with
+FOR UPDATE SKIP LOCKED, so concurrent workers never block on each other's
+rows, and wait on LISTEN/NOTIFY instead of polling tightly.
+
+A claim moves available_at past the visibility timeout; a running job keeps
+extending it with a heartbeat. If a worker dies, its jobs become claimable
+again once the timeout passes. Finished jobs are deleted; failed ones are
+retried with backoff until PG_QUEUE_MAX_ATTEMPTS, then kept as dead rows.
+A job fails when its task raises: process_application records failed runs
+on the application itself and only raises for database errors before a run
+starts, which is what the backoff is for.
+
+Run a worker with:
+    python -m app.worker.pg_queue
+"""
+
+import argparse
+import json
+import logging
+import os
+import select
+import socket
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, List, Optional, Sequence
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from . import memory
+
+logger = logging.getLogger(__name__)
+
+NOTIFY_CHANNEL = "job_queue"
+
+CLAIM_SQL = text("""
+    UPDATE job_queue
+    SET available_at = now() + make_interval(secs => :visibility_timeout),
+        attempts = attempts + 1,
+        claimed_by = :worker_id
+    WHERE id IN (
+        SELECT id FROM job_queue
+        WHERE dead_at IS NULL AND available_at <= now()
+        ORDER BY available_at, id
+        FOR UPDATE SKIP LOCKED
+        LIMIT :batch_size
+    )
+    RETURNING id, task, args, attempts
+    """)
+
+
+@dataclass
+class ClaimedJob:
+    id: int
+    task: str
+    args: List[Any]
+    attempts: int
+
+
+def enqueue(db: Session, task: str, args: Sequence[Any] = ()) -> None:
+    """
+    Adds a job in the caller's transaction. The NOTIFY is delivered only when
+    that transaction commits, and the job is only visible from then on.
+    """
+    db.execute(
+        text("INSERT INTO job_queue (task, args) VALUES (:task, CAST(:args AS jsonb))"),
+        {"task": task, "args": json.dumps(list(args))},
+    )
+    db.execute(text("SELECT pg_notify(:channel, '')"), {"channel": NOTIFY_CHANNEL})
+
+
+def claim(
+    connection,
+    worker_id: str,
+    batch_size: int = 1,
+    visibility_timeout: Optional[int] = None,
+) -> List[ClaimedJob]:
+    """Claims up to batch_size available jobs and commits the claim."""
+    if visibility_timeout is None:
+        visibility_timeout = settings.PG_QUEUE_VISIBILITY_TIMEOUT_SECONDS
+    with connection.begin():
+        rows = connection.execute(
+            CLAIM_SQL,
+            {
+                "visibility_timeout": visibility_timeout,
+                "worker_id": worker_id,
+                "batch_size": batch_size,
+            },
+        ).all()
+    return [ClaimedJob(row.id, row.task, row.args, row.attempts) for row in rows]
+
+
+def extend(connection, job_ids: Sequence[int], worker_id: str, seconds: int) -> None:
+    """Heartbeat: keeps claimed jobs invisible to other workers while they run."""
+    with connection.begin():
+        connection.execute(
+            text(
+                "UPDATE job_queue "
+                "SET available_at = now() + make_interval(secs => :seconds) "
+                "WHERE id = ANY(:ids) AND claimed_by = :worker_id"
+            ),
+            {"seconds": seconds, "ids": list(job_ids), "worker_id": worker_id},
+        )
+
+
+def complete(connection, job_id: int) -> None:
+    with connection.begin():
+        connection.execute(text("DELETE FROM job_queue WHERE id = :id"), {"id": job_id})
+
+
+def fail(connection, job: ClaimedJob, error: str) -> None:
+    """Schedules a retry with exponential backoff, or marks the job dead."""
+    with connection.begin():
+        if job.attempts >= settings.PG_QUEUE_MAX_ATTEMPTS:
+            connection.execute(
+                text(
+                    "UPDATE job_queue SET dead_at = now(), last_error = :error "
+                    "WHERE id = :id"
+                ),
+                {"id": job.id, "error": error},
+            )
+            logger.error(
+                f"Job {job.id} ({job.task}) is dead after {job.attempts} attempts"
+            )
+            return
+        connection.execute(
+            text(
+                "UPDATE job_queue "
+                "SET available_at = now() + make_interval(secs => :delay), "
+                "claimed_by = NULL, last_error = :error WHERE id = :id"
+            ),
+            {"id": job.id, "error": error, "delay": 30 * 2 ** (job.attempts - 1)},
+        )
+
+
+class _Heartbeat(threading.Thread):
+    def __init__(self, engine, job_ids: Sequence[int], worker_id: str):
+        super().__init__(name="pg-queue-heartbeat", daemon=True)
+        self.engine = engine
+        self.job_ids = list(job_ids)
+        self.worker_id = worker_id
+        self.stopped = threading.Event()
+        self.timeout = settings.PG_QUEUE_VISIBILITY_TIMEOUT_SECONDS
+
+    def run(self) -> None:
+        while not self.stopped.wait(self.timeout / 3):
+            try:
+                with self.engine.connect() as connection:
+                    extend(connection, self.job_ids, self.worker_id, self.timeout)
+            except Exception as e:
+                logger.warning(f"Heartbeat for jobs {self.job_ids} failed: {e}")
+
+
+def listen_connection(engine, channel: str = NOTIFY_CHANNEL):
+    """A raw autocommit DBAPI connection subscribed to a NOTIFY channel."""
+    raw = engine.raw_connection()
+    raw.detach()  # Never hand a LISTENing connection back to the pool
+    dbapi_connection = raw.driver_connection
+    dbapi_connection.autocommit = True
+    with dbapi_connection.cursor() as cursor:
+        cursor.execute(f"LISTEN {channel}")
+    return raw, dbapi_connection
+
+
+def wait_for_notify(dbapi_connection, timeout: float) -> None:
+    if select.select([dbapi_connection], [], [], timeout) != ([], [], []):
+        dbapi_connection.poll()
+        dbapi_connection.notifies.clear()
+
+
+def run_worker(engine, batch_size: int, poll_seconds: float) -> None:
+    from .celery_app import celery_app
+    from . import tasks  # noqa: F401  (registers the task functions)
+
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"
+    raw, listener = listen_connection(engine)
+    logger.info(f"pg_queue worker {worker_id} listening on '{NOTIFY_CHANNEL}'")
+    try:
+        while True:
+            with engine.connect() as connection:
+                jobs = claim(connection, worker_id, batch_size)
+            if not jobs:
+                # Poll as a fallback: notifies are lost while no one listens
+                wait_for_notify(listener, poll_seconds)
+                continue
+
+            heartbeat = _Heartbeat(engine, [job.id for job in jobs], worker_id)
+            heartbeat.start()
+            try:
+                for job in jobs:
+                    _run_job(engine, celery_app, job)
+            finally:
+                heartbeat.stopped.set()
+                heartbeat.join()
+    finally:
+        raw.close()
+
+
+def _run_job(engine, celery_app, job: ClaimedJob) -> None:
+    started = time.monotonic()
+    # Celery's task signals do not fire for in-process calls, so the RSS
+    # watchdog is driven from here
+    memory.start_sampling()
+    try:
+        # Calling a Celery task object runs it in-process, without a broker
+        celery_app.tasks[job.task](*job.args)
+    except Exception as e:
+        logger.error(f"Job {job.id} ({job.task}) failed: {e}", exc_info=True)
+        with engine.connect() as connection:
+            fail(connection, job, str(e))
+        return
+    finally:
+        memory.check_memory(f"job {job.id}")
+    with engine.connect() as connection:
+        complete(connection, job.id)
+    logger.info(f"Job {job.id} ({job.task}) done in {time.monotonic() - started:.1f}s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Postgres job queue worker")
+    parser.add_argument("--batch-size", type=int, default=settings.PG_QUEUE_BATCH_SIZE)
+    parser.add_argument(
+        "--poll-seconds", type=float, default=settings.PG_QUEUE_POLL_SECONDS
+    )
+    args = parser.parse_args()
+
+    from ..database import engine
+
+    logging.basicConfig(level=logging.INFO)
+    run_worker(engine, args.batch_size, args.poll_seconds)
+
+
+if __name__ == "__main__":
+    main()
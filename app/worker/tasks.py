@@ -1,14 +1,19 @@
-import time
 import logging
 import asyncio  # Import asyncio
+from datetime import datetime, timedelta, timezone
+from sqlalchemy.exc import InterfaceError, OperationalError
 from sqlalchemy.orm import Session
 from typing import Optional, Any, Union
 
-
-from app.services.browser import execute_browser, ApplicationStatus
-
-from .celery_app import celery_app
-from ..database import SessionLocal  # Import the session factory
+from .celery_app import (
+    celery_app,
+    EXTRACT_RESUME_TASK,
+    MAINTAIN_EVENT_PARTITIONS_TASK,
+    PROCESS_APPLICATION_TASK,
+)
+from . import memory  # noqa: F401  (connects the RSS watchdog signals)
+from ..config import settings
+from ..database import SessionLocal, engine  # Import the session factory
 from sqlalchemy.orm import joinedload
 from .. import crud, models, schemas  # Import crud functions, models, and schemas
 
@@ -16,6 +21,11 @@ from .. import crud, models, schemas  # Import crud functions, models, and schem
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Errors that leave an application untouched when they happen before its run
+# starts; such deliveries are retried instead of failing the application
+RETRYABLE_ERRORS = (OperationalError, InterfaceError)
+RETRY_COUNTDOWN_SECONDS = 30
+
 
 # 1. Define the recursive conversion function
 def stringify_values(data: Any) -> Any:
@@ -34,13 +44,51 @@ def stringify_values(data: Any) -> Any:
         return str(data)
 
 
-@celery_app.task(bind=True)
+def _should_process(db: Session, application: models.JobApplication) -> bool:
+    """
+    Whether this delivery of an application should run it. Delivery is at
+    least once: the outbox relay may republish a message, and pg_queue hands
+    a job to another worker when the one running it dies. Pending
+    applications are run. An application in PROCESSING whose status has not
+    changed for PROCESSING_STALE_SECONDS belongs to a run whose worker died;
+    it is marked SUBMISSION_FAILED rather than run again, since the form may
+    already have been submitted (resubmitting the URL queues it again).
+    Anything else is a duplicate delivery and is skipped.
+    """
+    if application.status in crud.PENDING_STATUSES:
+        return True
+    if application.status == models.JobApplicationStatus.PROCESSING:
+        # updated_at is when the run moved the application to PROCESSING
+        started = application.updated_at or application.created_at
+        stale_before = datetime.now(timezone.utc) - timedelta(
+            seconds=settings.PROCESSING_STALE_SECONDS
+        )
+        if started is None or started <= stale_before:
+            if crud.update_job_application_status(
+                db,
+                application.id,
+                models.JobApplicationStatus.SUBMISSION_FAILED,
+                error_message="The worker stopped while processing this application.",
+                only_from=(models.JobApplicationStatus.PROCESSING,),
+            ):
+                logger.warning(
+                    f"Application ID: {application.id} was left in PROCESSING by a "
+                    "stopped worker, marked SUBMISSION_FAILED."
+                )
+            return False
+    logger.info(
+        f"Application ID: {application.id} is already "
+        f"{application.status.value}, skipping duplicate delivery."
+    )
+    return False
+
+
+@celery_app.task(bind=True, name=PROCESS_APPLICATION_TASK)
 def process_application_placeholder(self, application_id: int):
     """
     Placeholder task to process a job application.
     - Fetches the application from the DB.
     - Updates status to QUEUED initially.
-    - Simulates some processing time.
     - In a real scenario, this task would:
         1. Update status to PROCESSING.
         2. Use web scraping/automation tools (like Selenium, Playwright, or requests-html)
@@ -51,9 +99,13 @@ def process_application_placeholder(self, application_id: int):
         6. Handle potential errors (PARSING_FAILED, FILLING_FAILED).
         7. Update status to NEEDS_REVIEW or SUBMITTED (or SUBMISSION_FAILED).
         8. Store extracted job title/company.
+    Failures once the run has started are recorded as the application's
+    status and the task returns normally. Database errors before that are
+    raised (RETRYABLE_ERRORS), so the queue retries the delivery.
     """
     logger.info(f"Received task for application ID: {application_id}")
     db: Session = SessionLocal()  # Create a new session for this task
+    run_started = False
     try:
         # 1. Fetch Application and User Profile Data
         logger.info(f"Fetching data for application ID: {application_id}")
@@ -70,6 +122,9 @@ def process_application_placeholder(self, application_id: int):
             logger.error(f"Application ID: {application_id} not found in DB.")
             return  # Exit if application not found
 
+        if not _should_process(db, application):
+            return
+
         if not application.owner or not application.owner.profile:
             logger.error(
                 f"User or User Profile not found for application ID: {application_id}"
@@ -77,7 +132,7 @@ def process_application_placeholder(self, application_id: int):
             crud.update_job_application_status(
                 db,
                 application_id,
-                models.JobApplicationStatus.PROCESSING_FAILED,
+                models.JobApplicationStatus.FILLING_FAILED,
                 error_message="User profile data missing.",
             )
             return  # Exit if profile data is missing
@@ -88,9 +143,17 @@ def process_application_placeholder(self, application_id: int):
         job_url = application.job_url
 
         # 2. Update Status to PROCESSING
-        crud.update_job_application_status(
-            db, application_id, models.JobApplicationStatus.PROCESSING
-        )
+        if not crud.update_job_application_status(
+            db,
+            application_id,
+            models.JobApplicationStatus.PROCESSING,
+            only_from=crud.PENDING_STATUSES,
+        ):
+            logger.info(
+                f"Application ID: {application_id} was picked up concurrently, skipping."
+            )
+            return
+        run_started = True
         logger.info(f"Application ID: {application_id} status updated to PROCESSING.")
 
         # --- START: Your Automation Logic ---
@@ -113,31 +176,48 @@ def process_application_placeholder(self, application_id: int):
             #   user_profile_data.education (list of dicts/EducationItem),
             #   user_profile_data.skills (list), user_profile_data.resume_path (string), etc.
 
+            # Imported here so the worker only loads browser_use, LangChain and
+            # the Gemini client once it actually runs an application.
+            from app.services.browser import execute_browser
+
             user_original = user_profile_data.model_dump()
             user_stringified = stringify_values(user_original)
 
+            # Resume text extracted once at upload, so the agent can answer
+            # from it without the PDF being parsed for every application
+            agent_task = "Fill and submit the job application"
+            profile = application.owner.profile
+            extraction = (
+                crud.get_resume_extraction(db, profile.resume_hash)
+                if profile.resume_hash
+                else None
+            )
+            if extraction is not None:
+                from app.services.resume_text import agent_context
+
+                agent_task += "\n\n" + agent_context(extraction)
+            elif profile.resume_path:
+                logger.info(
+                    f"No extracted resume text for application ID: {application_id}"
+                )
+
             # Run the async function using asyncio.run()
             result_model = asyncio.run(
                 execute_browser(
-                    task="Fill and submit the job application",
+                    task=agent_task,
                     link=job_url,
                     sensitive_data=user_stringified,
+                    owner_id=application.owner_id,
                 )
             )
-            print(user_profile_data)
-
-            logger.info(f"Simulating automation steps for {job_url}...")
-            # Example: Simulate parsing and filling
-            time.sleep(10)  # Replace with actual browser interaction time
-
-            # Example: Simulate extracting data from the job page
+            # Details the agent read from the job page
             extracted_title = result_model.job_title
             extracted_company = result_model.job_company
 
-            # Example: Simulate successful form submission
             automation_success = result_model.is_success
             logger.info(
-                f"Simulated successful submission for application ID: {application_id}"
+                f"Automation finished for application ID: {application_id} "
+                f"(success: {automation_success})"
             )
 
             # Example: Or simulate a case where user review is needed
@@ -195,6 +275,15 @@ def process_application_placeholder(self, application_id: int):
             )
 
     except Exception as e:
+        if isinstance(e, RETRYABLE_ERRORS) and not run_started:
+            # Nothing has run yet, so the delivery can simply be retried: by
+            # Celery, or (called in-process, where retry() re-raises e) by
+            # pg_queue's backoff and dead-letter handling
+            logger.warning(
+                f"Database unavailable for application ID {application_id}, "
+                f"retrying: {e}"
+            )
+            raise self.retry(exc=e, countdown=RETRY_COUNTDOWN_SECONDS)
         # General error handling for issues outside the automation block (e.g., DB connection)
         logger.error(
             f"Error processing application ID {application_id}: {e}", exc_info=True
@@ -212,11 +301,11 @@ def process_application_placeholder(self, application_id: int):
                 crud.update_job_application_status(
                     db,
                     application_id,
-                    models.JobApplicationStatus.PROCESSING_FAILED,
+                    models.JobApplicationStatus.SUBMISSION_FAILED,
                     error_message=str(e),
                 )  # Or a more specific error status
                 logger.warning(
-                    f"Application ID: {application_id} status updated to PROCESSING_FAILED due to error."
+                    f"Application ID: {application_id} status updated to SUBMISSION_FAILED due to error."
                 )
             else:
                 logger.error(
@@ -228,10 +317,28 @@ def process_application_placeholder(self, application_id: int):
                 exc_info=True,
             )
             # Handle potential issues writing the error status back to the DB
-        # Optional: Retry the task based on the exception type
-        # raise self.retry(exc=e, countdown=60) # Example retry after 60 seconds
     finally:
         db.close()  # Ensure the session is closed
 
 
+@celery_app.task(name=MAINTAIN_EVENT_PARTITIONS_TASK)
+def maintain_event_partitions():
+    """Creates upcoming application_events partitions and drops expired ones."""
+    from ..services.event_partitions import maintain_partitions
+
+    return maintain_partitions(engine)
+
+
+@celery_app.task(name=EXTRACT_RESUME_TASK)
+def extract_resume_text(user_id: int, resume_uri: str):
+    """Extracts an uploaded resume's text once, for every later application."""
+    from ..services import resume_text
+
+    db: Session = SessionLocal()
+    try:
+        return resume_text.extract_for_profile(db, user_id, resume_uri)
+    finally:
+        db.close()
+
+
 # You can add more tasks here as needed, e.g., tasks for sending notifications, etc.
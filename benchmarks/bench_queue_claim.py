@@ -0,0 +1,153 @@
+"""
+Benchmark: job claim throughput, Postgres SKIP LOCKED vs. the Redis broker.
+
+Enqueues --jobs no-op jobs, then drains them with 1, 2, 4, ... worker threads
+and reports jobs/s and the claim latency percentiles for each worker count:
+
+- postgres: the claim/complete statements of app.worker.pg_queue, each in its
+  own transaction as the worker runs them, against a scratch copy of
+  job_queue (job_queue_bench), so live jobs are untouched;
+- redis: kombu's Redis transport (what Celery workers use) on a scratch queue,
+  with acks, i.e. the same visibility bookkeeping Celery does per message.
+
+Needs DATABASE_URL (migrated) and CELERY_BROKER_URL to point at running servers:
+    python -m benchmarks.bench_queue_claim --jobs 5000 --workers 1,4,16
+"""
+
+import argparse
+import statistics
+import threading
+import time
+from typing import Callable, List
+
+from sqlalchemy import create_engine, text
+
+from app.config import settings
+from app.worker import pg_queue
+
+BENCH_TABLE = "job_queue_bench"
+BENCH_QUEUE = "bench_queue_claim"
+
+
+def drain(workers: int, claim_one: Callable[[], bool]) -> dict:
+    """Runs claim_one in worker threads until every thread sees an empty queue."""
+    latencies: List[float] = []
+    lock = threading.Lock()
+
+    def work():
+        local = []
+        while True:
+            start = time.perf_counter()
+            if not claim_one():
+                break
+            local.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=work) for _ in range(workers)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "jobs": len(latencies),
+        "jobs_per_s": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": statistics.median(latencies) * 1000 if latencies else 0.0,
+        "p99_ms": (
+            latencies[int(len(latencies) * 0.99) - 1] * 1000 if latencies else 0.0
+        ),
+    }
+
+
+def bench_postgres(jobs: int, workers: int) -> dict:
+    engine = create_engine(settings.DATABASE_URL, pool_size=workers + 1)
+    claim_sql = text(pg_queue.CLAIM_SQL.text.replace("job_queue", BENCH_TABLE))
+    complete_sql = text(f"DELETE FROM {BENCH_TABLE} WHERE id = :id")
+    with engine.begin() as connection:
+        connection.execute(text(f"DROP TABLE IF EXISTS {BENCH_TABLE}"))
+        connection.execute(
+            text(f"CREATE TABLE {BENCH_TABLE} (LIKE job_queue INCLUDING ALL)")
+        )
+        connection.execute(
+            text(
+                f"INSERT INTO {BENCH_TABLE} (task, args) "
+                "SELECT 'bench', jsonb_build_array(n) FROM generate_series(1, :jobs) n"
+            ),
+            {"jobs": jobs},
+        )
+        connection.execute(text(f"ANALYZE {BENCH_TABLE}"))
+
+    def claim_one() -> bool:
+        # Like pg_queue.run_worker: the claim commits on its own, then the
+        # (no-op) job runs and is completed in a second transaction
+        with engine.begin() as connection:
+            rows = connection.execute(
+                claim_sql,
+                {"visibility_timeout": 600, "worker_id": "bench", "batch_size": 1},
+            ).all()
+        for row in rows:
+            with engine.begin() as connection:
+                connection.execute(complete_sql, {"id": row.id})
+        return bool(rows)
+
+    try:
+        return drain(workers, claim_one)
+    finally:
+        with engine.begin() as connection:
+            connection.execute(text(f"DROP TABLE IF EXISTS {BENCH_TABLE}"))
+        engine.dispose()
+
+
+def bench_redis(jobs: int, workers: int) -> dict:
+    from kombu import Connection
+
+    with Connection(settings.CELERY_BROKER_URL) as connection:
+        queue = connection.SimpleQueue(BENCH_QUEUE)
+        queue.clear()
+        for n in range(jobs):
+            queue.put({"task": "bench", "args": [n]})
+        queue.close()
+
+    local = threading.local()
+
+    def claim_one() -> bool:
+        if not hasattr(local, "queue"):
+            local.connection = Connection(settings.CELERY_BROKER_URL)
+            local.queue = local.connection.SimpleQueue(BENCH_QUEUE)
+        try:
+            message = local.queue.get_nowait()
+        except local.queue.Empty:
+            local.queue.close()
+            local.connection.release()
+            return False
+        message.ack()
+        return True
+
+    return drain(workers, claim_one)
+
+
+BACKENDS = {"postgres": bench_postgres, "redis": bench_redis}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--jobs", type=int, default=5000)
+    parser.add_argument("--workers", default="1,2,4,8,16")
+    parser.add_argument("--backends", default="postgres,redis")
+    args = parser.parse_args()
+
+    for backend in args.backends.split(","):
+        for workers in (int(w) for w in args.workers.split(",")):
+            result = BACKENDS[backend](args.jobs, workers)
+            print(
+                f"{backend:8} workers={workers:<3} jobs={result['jobs']:<6} "
+                f"{result['jobs_per_s']:9.0f} jobs/s  "
+                f"p50 {result['p50_ms']:6.2f} ms  p99 {result['p99_ms']:6.2f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
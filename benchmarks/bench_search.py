@@ -0,0 +1,194 @@
+"""
+Benchmark: application search latency, trigram index vs. scanning.
+
+Fills a scratch copy of job_applications (job_applications_search_bench,
+created with its indexes) with --rows generated applications spread over
+--users owners, then times searches for company names, job titles, URL
+fragments and misspellings of them, each by a random owner:
+
+- index: the query of crud.search_job_application_rows, served by the
+  (owner_id, search text) GIN trigram index;
+- scan: the same query with index scans disabled, i.e. what the search
+  would cost without the index;
+- client: what clients do today, fetching all of the owner's applications
+  and filtering them in Python.
+
+Needs DATABASE_URL (migrated, with pg_trgm and btree_gin available):
+    python -m benchmarks.bench_search --rows 2000000 --users 2000
+"""
+
+import argparse
+import random
+import statistics
+import time
+from typing import Callable, List
+
+from sqlalchemy import (
+    MetaData,
+    Table,
+    create_engine,
+    func,
+    literal,
+    or_,
+    select,
+    text,
+)
+
+from app import models
+from app.config import settings
+
+BENCH_TABLE = "job_applications_search_bench"
+
+COMPANIES = [
+    "google", "microsoft", "amazon", "netflix", "stripe", "shopify", "atlassian",
+    "datadog", "cloudflare", "snowflake", "databricks", "airbnb", "spotify",
+    "dropbox", "gitlab", "hashicorp", "elastic", "mongodb", "twilio", "zendesk",
+]  # fmt: skip
+TITLES = [
+    "backend engineer", "frontend engineer", "data scientist", "product manager",
+    "site reliability engineer", "machine learning engineer", "designer",
+    "engineering manager", "security engineer", "data engineer",
+]  # fmt: skip
+QUERIES = [
+    "stripe", "datadog", "data scientist", "reliability", "greenhouse",
+    "gogle", "shopfy", "enginer", "atlasian", "machin learning",
+]  # fmt: skip
+
+FILL_SQL = f"""
+INSERT INTO {BENCH_TABLE}
+    (owner_id, job_url, status, extracted_company_name, extracted_job_title,
+     created_at)
+SELECT
+    1 + n % :users,
+    'https://' || (ARRAY['boards.greenhouse.io', 'jobs.lever.co',
+        'jobs.ashbyhq.com', 'careers.example.com'])[1 + n % 4]
+        || '/' || company || '/' || n,
+    'SUBMITTED',
+    initcap(company) || ' ' || initcap(substr(md5(n::text), 1, 5)),
+    initcap((:titles)[1 + (n / 7) % cardinality(:titles)]),
+    now() - n * interval '1 second'
+FROM (
+    SELECT n, (:companies)[1 + (n / 3) % cardinality(:companies)] AS company
+    FROM generate_series(1, :rows) n
+) s
+"""
+
+
+def timed(run: Callable[[str, int], None], queries: int, users: int) -> dict:
+    latencies: List[float] = []
+    rng = random.Random(42)
+    for _ in range(queries):
+        query, owner_id = rng.choice(QUERIES), rng.randint(1, users)
+        start = time.perf_counter()
+        run(query, owner_id)
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    return {
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[max(int(len(latencies) * 0.99) - 1, 0)] * 1000,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--modes", default="index,scan,client")
+    args = parser.parse_args()
+
+    engine = create_engine(settings.DATABASE_URL)
+    with engine.begin() as connection:
+        connection.execute(text(f"DROP TABLE IF EXISTS {BENCH_TABLE}"))
+        connection.execute(
+            text(f"CREATE TABLE {BENCH_TABLE} (LIKE job_applications INCLUDING ALL)")
+        )
+        started = time.perf_counter()
+        connection.execute(
+            text(FILL_SQL),
+            {
+                "rows": args.rows,
+                "users": args.users,
+                "companies": COMPANIES,
+                "titles": TITLES,
+            },
+        )
+        connection.execute(text(f"ANALYZE {BENCH_TABLE}"))
+        print(
+            f"filled {args.rows} rows for {args.users} users "
+            f"in {time.perf_counter() - started:.1f} s"
+        )
+
+    bench = Table(BENCH_TABLE, MetaData(), autoload_with=engine)
+    search_text = models.application_search_text(
+        bench.c.extracted_company_name, bench.c.extracted_job_title, bench.c.job_url
+    )
+
+    def search(query: str, owner_id: int, use_index: bool = True) -> None:
+        term = query.lower()
+        score = func.word_similarity(term, search_text)
+        statement = (
+            select(bench, score.label("score"))
+            .where(
+                bench.c.owner_id == owner_id,
+                or_(
+                    search_text.like(f"%{term}%"),
+                    literal(term).op("<%")(search_text),
+                ),
+            )
+            .order_by(score.desc(), bench.c.created_at.desc())
+            .limit(args.limit)
+        )
+        with engine.begin() as connection:
+            connection.execute(
+                select(
+                    func.set_config(
+                        "pg_trgm.word_similarity_threshold",
+                        str(settings.SEARCH_SIMILARITY_THRESHOLD),
+                        True,
+                    )
+                )
+            )
+            if not use_index:
+                connection.execute(text("SET LOCAL enable_indexscan = off"))
+                connection.execute(text("SET LOCAL enable_bitmapscan = off"))
+            connection.execute(statement).all()
+
+    def client(query: str, owner_id: int) -> None:
+        with engine.connect() as connection:
+            rows = connection.execute(
+                select(bench).where(bench.c.owner_id == owner_id)
+            ).all()
+        term = query.lower()
+        for row in rows:
+            haystack = " ".join(
+                str(value)
+                for value in (
+                    row.extracted_company_name,
+                    row.extracted_job_title,
+                    row.job_url,
+                )
+            )
+            term in haystack.lower()
+
+    modes = {
+        "index": search,
+        "scan": lambda query, owner_id: search(query, owner_id, use_index=False),
+        "client": client,
+    }
+    try:
+        for mode in args.modes.split(","):
+            result = timed(modes[mode], args.queries, args.users)
+            print(
+                f"{mode:7} p50 {result['p50_ms']:8.2f} ms  "
+                f"p99 {result['p99_ms']:8.2f} ms"
+            )
+    finally:
+        with engine.begin() as connection:
+            connection.execute(text(f"DROP TABLE IF EXISTS {BENCH_TABLE}"))
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Microbenchmark: response serialization and compression for application listings.
+
+Compares the default FastAPI path (response_model validation of ORM objects,
+then the stdlib JSON encoder) with the fast path used by the read endpoints
+(column rows -> dicts -> orjson), and reports gzip/brotli sizes and timings.
+
+Runs without a database:
+    python -m benchmarks.bench_serialization --rows 5000
+"""
+import argparse
+import datetime
+import json
+import time
+import zlib
+from collections import namedtuple
+from types import SimpleNamespace
+from typing import List
+
+from pydantic import TypeAdapter
+
+from app import schemas
+from app.middleware import brotli
+from app.models import JobApplicationStatus
+from app.serializers import FastJSONResponse
+
+COLUMNS = (
+    "id",
+    "owner_id",
+    "job_url",
+    "status",
+    "submission_timestamp",
+    "extracted_job_title",
+    "extracted_company_name",
+    "error_message",
+    "created_at",
+    "updated_at",
+)
+ApplicationRow = namedtuple("ApplicationRow", COLUMNS)
+
+
+def make_rows(count: int) -> List[ApplicationRow]:
+    now = datetime.datetime.now(datetime.timezone.utc)
+    statuses = list(JobApplicationStatus)
+    return [
+        ApplicationRow(
+            id=i,
+            owner_id=1,
+            job_url=f"https://boards.example.com/company{i % 300}/jobs/{100000 + i}",
+            status=statuses[i % len(statuses)],
+            submission_timestamp=now if i % 3 == 0 else None,
+            extracted_job_title=f"Senior Software Engineer {i % 40}",
+            extracted_company_name=f"Company {i % 300}",
+            error_message=None if i % 5 else "Automation Error: timeout waiting for form",
+            created_at=now - datetime.timedelta(minutes=i),
+            updated_at=now,
+        )
+        for i in range(count)
+    ]
+
+
+def default_path(objects, adapter: TypeAdapter) -> bytes:
+    # Mirrors response_model handling: validate from attributes, dump to JSON-able
+    # Python, then render with the stdlib encoder like JSONResponse does.
+    validated = adapter.validate_python(objects, from_attributes=True)
+    content = adapter.dump_python(validated, mode="json")
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def fast_path(rows) -> bytes:
+    return FastJSONResponse([row._asdict() for row in rows]).body
+
+
+def timeit(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    # ORM objects expose attributes; SimpleNamespace is a cheap stand-in.
+    objects = [SimpleNamespace(**row._asdict()) for row in rows]
+    adapter = TypeAdapter(List[schemas.JobApplication])
+
+    default_body = default_path(objects, adapter)
+    fast_body = fast_path(rows)
+    assert json.loads(default_body) == json.loads(fast_body), "payloads differ"
+
+    default_s = timeit(lambda: default_path(objects, adapter), args.repeat)
+    fast_s = timeit(lambda: fast_path(rows), args.repeat)
+    print(f"rows={args.rows} payload={len(fast_body) / 1024:.1f} KiB")
+    print(f"  response_model + json : {default_s * 1000:8.2f} ms")
+    print(f"  rows + orjson         : {fast_s * 1000:8.2f} ms  ({default_s / fast_s:.1f}x)")
+
+    gzip_s = timeit(lambda: zlib.compress(fast_body, 6), args.repeat)
+    print(
+        f"  gzip level 6          : {gzip_s * 1000:8.2f} ms  "
+        f"{len(zlib.compress(fast_body, 6)) / 1024:.1f} KiB"
+    )
+    if brotli is not None:
+        br_s = timeit(lambda: brotli.compress(fast_body, quality=4), args.repeat)
+        print(
+            f"  brotli quality 4      : {br_s * 1000:8.2f} ms  "
+            f"{len(brotli.compress(fast_body, quality=4)) / 1024:.1f} KiB"
+        )
+    else:
+        print("  brotli                : not installed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Startup benchmark: import time and peak RSS of the API and worker entry points.
+
+Each entry point is imported in a fresh interpreter, several times, and the
+median wall time and peak RSS are reported together with which of the heavy
+browser/LLM/GCS modules ended up loaded.
+
+    python -m benchmarks.bench_startup --runs 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+# What each process imports when it boots:
+#   API:    uvicorn app.main:app
+#   Worker: celery -A app.worker.celery_app worker (which also imports `include`)
+ENTRY_POINTS = {
+    "api": ["app.main"],
+    "worker": ["app.worker.celery_app", "app.worker.tasks"],
+}
+
+HEAVY_MODULES = (
+    "browser_use",
+    "langchain_google_genai",
+    "google.cloud.storage",
+    "playwright",
+)
+
+PROBE = """
+import importlib, json, resource, sys, time
+start = time.perf_counter()
+for name in {modules!r}:
+    importlib.import_module(name)
+elapsed = time.perf_counter() - start
+print(json.dumps({{
+    "seconds": elapsed,
+    "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    "loaded": [m for m in {heavy!r} if m in sys.modules],
+}}))
+"""
+
+
+def measure(modules, runs: int) -> dict:
+    code = PROBE.format(modules=modules, heavy=HEAVY_MODULES)
+    samples = []
+    for _ in range(runs):
+        proc = subprocess.run(
+            [sys.executable, "-c", code],
+            capture_output=True,
+            text=True,
+            env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"},
+        )
+        if proc.returncode != 0:
+            last_line = (proc.stderr.strip().splitlines() or ["unknown error"])[-1]
+            return {"error": last_line}
+        samples.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+    return {
+        "seconds": statistics.median(s["seconds"] for s in samples),
+        "max_rss_mb": statistics.median(s["max_rss_kb"] for s in samples) / 1024,
+        "loaded": samples[-1]["loaded"],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    for name, modules in ENTRY_POINTS.items():
+        result = measure(modules, args.runs)
+        if "error" in result:
+            print(f"{name:<7} import failed: {result['error']}")
+            continue
+        loaded = ", ".join(result["loaded"]) or "none"
+        print(
+            f"{name:<7} import {result['seconds'] * 1000:7.1f} ms  "
+            f"peak RSS {result['max_rss_mb']:6.1f} MiB  heavy modules: {loaded}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,510 @@
+"""
+Seeded synthetic ATS forms for benchmarking the application agent.
+
+A FormSpec (seed, page count, fields per page, share of dropdowns, conditional
+follow-ups and slow widgets) deterministically generates a multi-page form
+whose correct answers follow from CANDIDATE, the fixed applicant profile the
+benchmark worker applies with. The same spec always yields the same form and
+the same expected answers, so runs can be scored for correctness as well as
+speed.
+"""
+
+import html
+import random
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+# The applicant every generated form is filled in for
+CANDIDATE = {
+    "first_name": "Avery",
+    "last_name": "Quinn",
+    "email": "avery.quinn@example.com",
+    "phone": "+1 415 555 0142",
+    "city": "San Francisco",
+    "current_company": "Northwind Labs",
+    "current_title": "Senior Software Engineer",
+    "linkedin": "https://www.linkedin.com/in/avery-quinn",
+    "portfolio": "https://averyquinn.dev",
+    "school": "University of Washington",
+    "years_experience": "8",
+    "notice_period_weeks": "4",
+    "work_authorization": "Yes",
+    "requires_sponsorship": "No",
+    "willing_to_relocate": "Yes",
+    "relocation_city": "Seattle",
+    "highest_degree": "Master's",
+    "heard_about_us": "Referral",
+    "referrer_name": "Jordan Lee",
+    "salary_range": "$180k - $200k",
+    "start_availability": "Within 1 month",
+    "work_arrangement": "Hybrid",
+    "eeo_gender": "Decline to self-identify",
+    "cover_note": "I build reliable distributed systems and enjoy mentoring.",
+    "skills": {
+        "Python": 8,
+        "Go": 3,
+        "PostgreSQL": 6,
+        "Kubernetes": 4,
+        "React": 2,
+        "AWS": 5,
+        "GCP": 3,
+        "Terraform": 2,
+        "Kafka": 3,
+        "Redis": 5,
+    },
+}
+
+SKILLS = [
+    "Python",
+    "Go",
+    "Java",
+    "Rust",
+    "C++",
+    "TypeScript",
+    "React",
+    "Django",
+    "FastAPI",
+    "PostgreSQL",
+    "MySQL",
+    "Redis",
+    "Kafka",
+    "Spark",
+    "Airflow",
+    "AWS",
+    "GCP",
+    "Azure",
+    "Kubernetes",
+    "Docker",
+    "Terraform",
+    "GraphQL",
+    "Elasticsearch",
+    "Celery",
+    "Linux",
+]
+YEARS_OPTIONS = ["0", "1", "2", "3", "4", "5", "6", "7", "8", "9", "10+"]
+
+TITLES = [
+    ("Senior Software Engineer", "Innovate Solutions Inc."),
+    ("Backend Engineer", "Acme Robotics"),
+    ("Platform Engineer", "Globex Cloud"),
+    ("Data Engineer", "Initech Analytics"),
+    ("Staff Engineer", "Umbrella Health"),
+]
+
+MAX_PAGES = 20
+MAX_FIELDS_PER_PAGE = 40
+
+
+@dataclass(frozen=True)
+class FormSpec:
+    seed: int
+    pages: int = 1
+    fields_per_page: int = 8
+    dropdown_ratio: float = 0.3
+    conditional_ratio: float = 0.2
+    slow_ratio: float = 0.0
+    widget_latency_ms: int = 0  # Delay before slow widgets appear in the page
+    page_latency_ms: int = 0  # Server-side delay before each page is served
+
+    def validate(self) -> Optional[str]:
+        if not 1 <= self.pages <= MAX_PAGES:
+            return f"pages must be between 1 and {MAX_PAGES}"
+        if not 1 <= self.fields_per_page <= MAX_FIELDS_PER_PAGE:
+            return f"fields_per_page must be between 1 and {MAX_FIELDS_PER_PAGE}"
+        for name in ("dropdown_ratio", "conditional_ratio", "slow_ratio"):
+            if not 0 <= getattr(self, name) <= 1:
+                return f"{name} must be between 0 and 1"
+        if self.widget_latency_ms < 0 or self.page_latency_ms < 0:
+            return "latencies must not be negative"
+        if self.pages * self.fields_per_page > max_fields():
+            return f"at most {max_fields()} fields per form"
+        return None
+
+    def query(self) -> Dict[str, str]:
+        """The spec as query/hidden-field parameters (without the seed)."""
+        return {k: str(v) for k, v in asdict(self).items() if k != "seed"}
+
+
+@dataclass
+class Field:
+    name: str
+    label: str
+    kind: str  # text, email, tel, number, textarea, select
+    answer: str
+    options: List[str] = field(default_factory=list)
+    required: bool = False
+    match: str = "exact"  # exact, or nonempty for free text
+    # Conditional follow-up: only shown (and expected) when the parent field
+    # has the trigger value
+    parent: Optional[str] = None
+    trigger: Optional[str] = None
+    followups: List["Field"] = field(default_factory=list)
+    slow: bool = False
+
+    def is_expected(self, answers: Dict[str, str]) -> bool:
+        return self.parent is None or answers.get(self.parent) == self.trigger
+
+
+@dataclass
+class GeneratedForm:
+    spec: FormSpec
+    title: str
+    company: str
+    pages: List[List[Field]]
+
+    def all_fields(self) -> List[Field]:
+        fields = []
+        for page in self.pages:
+            for f in page:
+                fields.append(f)
+                fields.extend(f.followups)
+        return fields
+
+    def expected_answers(self) -> Dict[str, str]:
+        """Field name -> correct value, for every field the candidate should fill."""
+        answers: Dict[str, str] = {}
+        for f in self.all_fields():
+            if f.is_expected(answers):
+                answers[f.name] = f.answer
+        return answers
+
+    def score(self, submitted: Dict[str, str]) -> Dict[str, object]:
+        expected = self.expected_answers()
+        wrong, missing, unexpected = [], [], []
+        for f in self.all_fields():
+            value = (submitted.get(f.name) or "").strip()
+            if f.name not in expected:
+                if value:
+                    unexpected.append(f.name)
+                continue
+            if not value:
+                missing.append(f.name)
+            elif f.match == "nonempty":
+                continue
+            elif value.casefold() != f.answer.casefold():
+                wrong.append(f.name)
+        correct = len(expected) - len(wrong) - len(missing)
+        return {
+            "expected_fields": len(expected),
+            "correct": correct,
+            "accuracy": correct / len(expected) if expected else 1.0,
+            "wrong": wrong,
+            "missing": missing,
+            "unexpected": unexpected,
+        }
+
+
+def _select(name, label, options, answer, **kwargs) -> Field:
+    return Field(name, label, "select", answer, options=options, **kwargs)
+
+
+def _base_questions() -> Tuple[List[Field], List[Field]]:
+    """(text-like questions, dropdown questions) answered from CANDIDATE."""
+    c = CANDIDATE
+    text = [
+        Field("first_name", "First Name", "text", c["first_name"], required=True),
+        Field("last_name", "Last Name", "text", c["last_name"], required=True),
+        Field("email", "Email", "email", c["email"], required=True),
+        Field("phone", "Phone", "tel", c["phone"]),
+        Field("city", "Current City", "text", c["city"]),
+        Field("current_company", "Current Company", "text", c["current_company"]),
+        Field("current_title", "Current Job Title", "text", c["current_title"]),
+        Field("linkedin", "LinkedIn Profile URL", "text", c["linkedin"]),
+        Field("portfolio", "Portfolio / Website", "text", c["portfolio"]),
+        Field("school", "School / University", "text", c["school"]),
+        Field(
+            "years_experience",
+            "Total Years of Experience",
+            "number",
+            c["years_experience"],
+        ),
+        Field(
+            "notice_period_weeks",
+            "Notice Period (weeks)",
+            "number",
+            c["notice_period_weeks"],
+        ),
+        Field(
+            "cover_note",
+            "Why do you want to join us?",
+            "textarea",
+            c["cover_note"],
+            match="nonempty",
+        ),
+    ]
+    yes_no = ["Yes", "No"]
+    dropdowns = [
+        _select(
+            "work_authorization",
+            "Are you legally authorized to work in this country?",
+            yes_no,
+            c["work_authorization"],
+            required=True,
+        ),
+        _select(
+            "requires_sponsorship",
+            "Will you now or in the future require visa sponsorship?",
+            yes_no,
+            c["requires_sponsorship"],
+            followups=[
+                _select(
+                    "visa_type",
+                    "Which visa type will you require?",
+                    ["H-1B", "TN", "O-1", "Other"],
+                    "H-1B",
+                    parent="requires_sponsorship",
+                    trigger="Yes",
+                )
+            ],
+        ),
+        _select(
+            "willing_to_relocate",
+            "Are you willing to relocate?",
+            yes_no,
+            c["willing_to_relocate"],
+            followups=[
+                Field(
+                    "relocation_city",
+                    "Preferred relocation city",
+                    "text",
+                    c["relocation_city"],
+                    parent="willing_to_relocate",
+                    trigger="Yes",
+                )
+            ],
+        ),
+        _select(
+            "highest_degree",
+            "Highest level of education",
+            ["High school", "Associate's", "Bachelor's", "Master's", "PhD"],
+            c["highest_degree"],
+        ),
+        _select(
+            "heard_about_us",
+            "How did you hear about this role?",
+            ["Company website", "LinkedIn", "Job board", "Referral", "Other"],
+            c["heard_about_us"],
+            followups=[
+                Field(
+                    "referrer_name",
+                    "Who referred you?",
+                    "text",
+                    c["referrer_name"],
+                    parent="heard_about_us",
+                    trigger="Referral",
+                )
+            ],
+        ),
+        _select(
+            "salary_range",
+            "Expected annual salary",
+            [
+                "Under $120k",
+                "$120k - $150k",
+                "$150k - $180k",
+                "$180k - $200k",
+                "Over $200k",
+            ],
+            c["salary_range"],
+        ),
+        _select(
+            "start_availability",
+            "When could you start?",
+            ["Immediately", "Within 1 month", "1-3 months", "More than 3 months"],
+            c["start_availability"],
+        ),
+        _select(
+            "work_arrangement",
+            "Preferred work arrangement",
+            ["On-site", "Hybrid", "Remote"],
+            c["work_arrangement"],
+        ),
+        _select(
+            "eeo_gender",
+            "Gender (voluntary self-identification)",
+            ["Female", "Male", "Non-binary", "Decline to self-identify"],
+            c["eeo_gender"],
+        ),
+    ]
+    return text, dropdowns
+
+
+def _skill_question(skill: str, as_dropdown: bool) -> Field:
+    years = CANDIDATE["skills"].get(skill, 0)
+    name = "skill_" + "".join(ch if ch.isalnum() else "_" for ch in skill.lower())
+    label = f"Years of professional experience with {skill}"
+    if as_dropdown:
+        answer = "10+" if years >= 10 else str(years)
+        return _select(name, label, YEARS_OPTIONS, answer)
+    return Field(name, label, "number", str(years))
+
+
+def max_fields() -> int:
+    """How many distinct top-level questions a single form can hold."""
+    text, dropdowns = _base_questions()
+    return len(text) + len(dropdowns) + len(SKILLS)
+
+
+def generate_form(spec: FormSpec) -> GeneratedForm:
+    """
+    Builds the form for a spec. Deterministic for a given spec. Conditional
+    follow-ups are added under their parent on top of fields_per_page.
+    """
+    rng = random.Random(spec.seed)
+    total = spec.pages * spec.fields_per_page
+    text, dropdowns = _base_questions()
+    skills = SKILLS[:]
+    rng.shuffle(skills)
+    rng.shuffle(dropdowns)
+
+    # Identity questions come first, like on real ATS forms; the rest is a
+    # seeded mix with the requested share of dropdowns.
+    identity = [f for f in text if f.required][:total]
+    optional_text = [f for f in text if not f.required]
+    rng.shuffle(optional_text)
+    slots = total - len(identity)
+    n_dropdowns = min(round(total * spec.dropdown_ratio), slots)
+
+    chosen = dropdowns[:n_dropdowns]
+    n_skill_dropdowns = n_dropdowns - len(chosen)
+    chosen += [_skill_question(s, True) for s in skills[:n_skill_dropdowns]]
+    others = optional_text + [
+        _skill_question(s, False) for s in skills[n_skill_dropdowns:]
+    ]
+    # Top up with the unused dropdowns if text-like questions run out
+    others += dropdowns[n_dropdowns:]
+    body = chosen + others[: slots - len(chosen)]
+    rng.shuffle(body)
+    fields = identity + body
+
+    for f in fields:
+        # Follow-ups are kept only for the requested share of their parents
+        if f.followups and rng.random() >= spec.conditional_ratio:
+            f.followups = []
+        f.slow = rng.random() < spec.slow_ratio
+        for followup in f.followups:
+            followup.slow = f.slow
+
+    pages = [
+        fields[i * spec.fields_per_page : (i + 1) * spec.fields_per_page]
+        for i in range(spec.pages)
+    ]
+    title, company = TITLES[spec.seed % len(TITLES)]
+    return GeneratedForm(spec=spec, title=title, company=company, pages=pages)
+
+
+# --- HTML rendering ---
+
+PAGE_STYLE = """
+body { font-family: -apple-system, "Segoe UI", Roboto, Helvetica, Arial, sans-serif;
+  background-color: #f8f9fa; color: #333; line-height: 1.6; margin: 0; }
+.container { max-width: 800px; margin: 40px auto; padding: 30px; background-color: #fff;
+  border-radius: 8px; box-shadow: 0 2px 10px rgba(0, 0, 0, 0.1); }
+.form-group { margin-bottom: 20px; }
+label { display: block; margin-bottom: 8px; font-weight: 600; color: #495057; }
+input, select, textarea { width: 100%; padding: 12px; border: 1px solid #ced4da;
+  border-radius: 4px; box-sizing: border-box; font-size: 1em; }
+.loading { color: #6c757d; font-style: italic; }
+button { font-weight: 600; color: #fff; background-color: #007bff; border: 1px solid #007bff;
+  padding: 12px 25px; font-size: 1em; border-radius: 4px; cursor: pointer; }
+"""
+
+# Reveals conditional follow-ups and mounts slow widgets after a delay
+PAGE_SCRIPT = """
+function syncFollowups() {
+  document.querySelectorAll("[data-parent]").forEach(function (group) {
+    var parent = document.querySelector('[name="' + group.dataset.parent + '"]');
+    var visible = parent && parent.value === group.dataset.trigger;
+    group.style.display = visible ? "" : "none";
+    group.querySelectorAll("input, select, textarea").forEach(function (el) {
+      el.disabled = !visible;
+    });
+  });
+}
+document.addEventListener("change", syncFollowups);
+document.addEventListener("DOMContentLoaded", function () {
+  syncFollowups();
+  document.querySelectorAll("template[data-slow]").forEach(function (tpl) {
+    setTimeout(function () {
+      var placeholder = document.getElementById(tpl.dataset.slow);
+      placeholder.replaceWith(tpl.content.cloneNode(true));
+      syncFollowups();
+    }, Number(tpl.dataset.delay));
+  });
+});
+"""
+
+
+def _render_input(f: Field) -> str:
+    name = html.escape(f.name)
+    required = " required" if f.required else ""
+    if f.kind == "select":
+        options = ['<option value="">Select...</option>'] + [
+            f'<option value="{html.escape(o)}">{html.escape(o)}</option>'
+            for o in f.options
+        ]
+        return (
+            f'<select id="{name}" name="{name}"{required}>{"".join(options)}</select>'
+        )
+    if f.kind == "textarea":
+        return f'<textarea id="{name}" name="{name}" rows="4"{required}></textarea>'
+    return f'<input type="{f.kind}" id="{name}" name="{name}"{required} />'
+
+
+def _render_group(f: Field) -> str:
+    attrs = ""
+    if f.parent:
+        attrs = f' data-parent="{html.escape(f.parent)}" data-trigger="{html.escape(f.trigger)}"'
+    return (
+        f'<div class="form-group"{attrs}>'
+        f'<label for="{html.escape(f.name)}">{html.escape(f.label)}</label>'
+        f"{_render_input(f)}</div>"
+    )
+
+
+def _render_field(f: Field, widget_latency_ms: int) -> str:
+    groups = "".join(_render_group(x) for x in [f] + f.followups)
+    if not f.slow or widget_latency_ms <= 0:
+        return groups
+    placeholder = f"slow-{html.escape(f.name)}"
+    return (
+        f'<div id="{placeholder}" class="form-group loading">Loading...</div>'
+        f'<template data-slow="{placeholder}" data-delay="{widget_latency_ms}">{groups}</template>'
+    )
+
+
+def render_page(
+    form: GeneratedForm, page: int, action: str, carried: Dict[str, str]
+) -> str:
+    """
+    Renders one page. Answers from earlier pages travel along as hidden inputs,
+    so multi-page forms need no server-side session.
+    """
+    fields = form.pages[page]
+    last_page = page == len(form.pages) - 1
+    hidden = "".join(
+        f'<input type="hidden" name="{html.escape(k)}" value="{html.escape(v)}" />'
+        for k, v in carried.items()
+    )
+    body = "".join(_render_field(f, form.spec.widget_latency_ms) for f in fields)
+    button = "Submit Application" if last_page else "Next"
+    return f"""<!DOCTYPE html>
+<html lang="en">
+  <head>
+    <meta charset="UTF-8" />
+    <title>Apply for {html.escape(form.title)}</title>
+    <style>{PAGE_STYLE}</style>
+    <script>{PAGE_SCRIPT}</script>
+  </head>
+  <body>
+    <div class="container">
+      <h1>{html.escape(form.title)}</h1>
+      <div class="company">{html.escape(form.company)}</div>
+      <p>Step {page + 1} of {len(form.pages)}</p>
+      <form method="post" action="{html.escape(action)}">
+        {hidden}{body}
+        <button type="submit">{button}</button>
+      </form>
+    </div>
+  </body>
+</html>"""
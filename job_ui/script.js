@@ -34,7 +34,7 @@ document
       // Handle successful submission
       const result = await response.json();
       alert(
-        `Success: ${result.message} (Data saved as ${result.application_file})`
+        `Success: ${result.message} (Application ID ${result.application_id})`
       );
       form.reset(); // Clear the form after successful submission
     } catch (error) {
@@ -1,24 +1,52 @@
 import os
-import os
-import json
-import shutil
+import uuid
+import asyncio
 import datetime
-from fastapi import FastAPI, Form, UploadFile, File, HTTPException
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from urllib.parse import urlencode
+
+import anyio
+from fastapi import Depends, FastAPI, Form, UploadFile, File, HTTPException, Request
+from fastapi.responses import HTMLResponse
 from fastapi.staticfiles import StaticFiles  # Add StaticFiles import
 from fastapi.middleware.cors import CORSMiddleware
 from typing import Optional, List
 
-# Define the directory for uploads relative to this script
-UPLOAD_DIR = os.path.join(os.path.dirname(__file__), "uploads")
-DATA_DIR = os.path.dirname(__file__)  # Save JSON in job_ui directory
+from forms import CANDIDATE, FormSpec, GeneratedForm, generate_form, render_page
+from store import SubmissionStore
+
+# Submissions and uploads live outside the source tree (override with JOB_UI_DATA_DIR)
+DATA_DIR = os.getenv(
+    "JOB_UI_DATA_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+)
+UPLOAD_DIR = os.path.join(DATA_DIR, "uploads")
+SUBMISSIONS_FILE = os.path.join(DATA_DIR, "submissions.jsonl")
+UPLOAD_CHUNK_SIZE = 64 * 1024
 
 # Ensure the upload directory exists
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
+store = SubmissionStore(
+    SUBMISSIONS_FILE,
+    max_batch_size=int(os.getenv("JOB_UI_MAX_BATCH_SIZE", "256")),
+    max_batch_delay=float(os.getenv("JOB_UI_MAX_BATCH_DELAY_MS", "5")) / 1000,
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await store.start()
+    yield
+    # Flush queued submissions before the process exits
+    await store.stop()
+
+
 app = FastAPI(
     title="Job UI Form Handler",
     description="Simple API to handle job application form submissions from job_ui/index.html",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
 # Configure CORS to allow requests from the file:// protocol (local HTML file)
@@ -40,6 +68,17 @@ app.add_middleware(
 app.mount("/static", StaticFiles(directory="."), name="static")
 
 
+async def save_upload(upload: UploadFile) -> str:
+    """Streams an upload to UPLOAD_DIR in chunks without blocking the event loop."""
+    # Sanitize filename (basic example) and make it unique under concurrency
+    safe_filename = os.path.basename(upload.filename)
+    path = os.path.join(UPLOAD_DIR, f"{uuid.uuid4().hex}_{safe_filename}")
+    async with await anyio.open_file(path, "wb") as buffer:
+        while chunk := await upload.read(UPLOAD_CHUNK_SIZE):
+            await buffer.write(chunk)
+    return path
+
+
 @app.post("/api/submit-application")  # Change path to /api/submit-application
 async def submit_application(
     fullName: str = Form(...),
@@ -56,7 +95,8 @@ async def submit_application(
     coverLetter: Optional[UploadFile] = File(None),
 ):
     """
-    Receives job application data, saves uploaded files, and stores form data as JSON.
+    Receives job application data, streams uploaded files to disk, and appends
+    the form data to the JSONL submission store.
     """
     application_data = {
         "fullName": fullName,
@@ -76,16 +116,8 @@ async def submit_application(
 
     # --- Handle Resume File ---
     if resume and resume.filename:
-        # Sanitize filename (basic example)
-        safe_resume_filename = os.path.basename(resume.filename)
-        resume_path = os.path.join(
-            UPLOAD_DIR,
-            f"{datetime.datetime.utcnow().timestamp()}_{safe_resume_filename}",
-        )
         try:
-            with open(resume_path, "wb") as buffer:
-                shutil.copyfileobj(resume.file, buffer)
-            application_data["resume"] = resume_path  # Store the path
+            application_data["resume"] = await save_upload(resume)  # Store the path
         except Exception as e:
             raise HTTPException(
                 status_code=500, detail=f"Could not save resume file: {e}"
@@ -97,37 +129,149 @@ async def submit_application(
 
     # --- Handle Cover Letter File (Optional) ---
     if coverLetter and coverLetter.filename:
-        safe_cl_filename = os.path.basename(coverLetter.filename)
-        cl_path = os.path.join(
-            UPLOAD_DIR, f"{datetime.datetime.utcnow().timestamp()}_{safe_cl_filename}"
-        )
         try:
-            with open(cl_path, "wb") as buffer:
-                shutil.copyfileobj(coverLetter.file, buffer)
-            application_data["coverLetter"] = cl_path  # Store the path
+            application_data["coverLetter"] = await save_upload(coverLetter)
         except Exception as e:
             # Log error but don't fail the whole request if cover letter fails
             print(f"Warning: Could not save cover letter file: {e}")
         finally:
             await coverLetter.close()  # Close the file handle
 
-    # --- Save Application Data as JSON ---
-    timestamp_str = datetime.datetime.utcnow().strftime("%Y%m%d_%H%M%S_%f")
-    json_filename = f"application_{timestamp_str}.json"
-    json_filepath = os.path.join(DATA_DIR, json_filename)
-
+    # --- Append Application Data to the JSONL store ---
+    application_id = uuid.uuid4().hex
+    application_data["id"] = application_id
     try:
-        with open(json_filepath, "w") as f:
-            json.dump(application_data, f, indent=2)
+        await store.append(application_data)
     except Exception as e:
-        # If JSON saving fails, we might want to clean up saved files, but for simplicity:
         raise HTTPException(
-            status_code=500, detail=f"Could not save application data as JSON: {e}"
+            status_code=500, detail=f"Could not save application data: {e}"
         )
 
     return {
         "message": "Application submitted successfully!",
-        "application_file": json_filename,
+        "application_id": application_id,
+    }
+
+
+@app.get("/api/summary")
+async def submissions_summary():
+    """Counts of received submissions, for checking load-test results."""
+    return store.summary()
+
+
+# --- Synthetic ATS forms (see forms.py) ---
+
+
+def form_spec(
+    seed: int,
+    pages: int = 1,
+    fields_per_page: int = 8,
+    dropdown_ratio: float = 0.3,
+    conditional_ratio: float = 0.2,
+    slow_ratio: float = 0.0,
+    widget_latency_ms: int = 0,
+    page_latency_ms: int = 0,
+) -> FormSpec:
+    spec = FormSpec(
+        seed=seed,
+        pages=pages,
+        fields_per_page=fields_per_page,
+        dropdown_ratio=dropdown_ratio,
+        conditional_ratio=conditional_ratio,
+        slow_ratio=slow_ratio,
+        widget_latency_ms=widget_latency_ms,
+        page_latency_ms=page_latency_ms,
+    )
+    error = spec.validate()
+    if error:
+        raise HTTPException(status_code=400, detail=error)
+    return spec
+
+
+@lru_cache(maxsize=256)
+def get_form(spec: FormSpec) -> GeneratedForm:
+    return generate_form(spec)
+
+
+def form_action(spec: FormSpec, page: int, pages: int) -> str:
+    target = f"pages/{page}" if page < pages else "submit"
+    return f"/forms/{spec.seed}/{target}?{urlencode(spec.query())}"
+
+
+async def render_form_page(spec: FormSpec, page: int, carried: dict) -> HTMLResponse:
+    form = get_form(spec)
+    if not 0 <= page < len(form.pages):
+        raise HTTPException(status_code=404, detail="Page not found")
+    if spec.page_latency_ms:
+        await asyncio.sleep(spec.page_latency_ms / 1000)
+    action = form_action(spec, page + 1, len(form.pages))
+    return HTMLResponse(render_page(form, page, action, carried))
+
+
+@app.get("/forms/candidate")
+async def form_candidate():
+    """The applicant profile every generated form expects to be filled with."""
+    return CANDIDATE
+
+
+@app.get("/forms/{seed}", response_class=HTMLResponse)
+async def form_first_page(spec: FormSpec = Depends(form_spec)):
+    """
+    First page of a seeded synthetic form. Query parameters pick the variant:
+    pages, fields_per_page, dropdown_ratio, conditional_ratio, slow_ratio,
+    widget_latency_ms and page_latency_ms.
+    """
+    return await render_form_page(spec, 0, {})
+
+
+@app.post("/forms/{seed}/pages/{page}", response_class=HTMLResponse)
+async def form_next_page(
+    page: int, request: Request, spec: FormSpec = Depends(form_spec)
+):
+    """Later pages; answers so far are carried along as hidden inputs."""
+    carried = {k: v for k, v in (await request.form()).items() if isinstance(v, str)}
+    return await render_form_page(spec, page, carried)
+
+
+@app.get("/forms/{seed}/expected")
+async def form_expected_answers(spec: FormSpec = Depends(form_spec)):
+    """The correct answers for a variant, for scoring benchmark runs offline."""
+    form = get_form(spec)
+    return {
+        "spec": spec,
+        "title": form.title,
+        "company": form.company,
+        "pages": [[f.name for f in page] for page in form.pages],
+        "expected": form.expected_answers(),
+    }
+
+
+@app.post("/forms/{seed}/submit")
+async def form_submit(request: Request, spec: FormSpec = Depends(form_spec)):
+    """Scores the submitted answers and records the submission in the store."""
+    form = get_form(spec)
+    answers = {k: v for k, v in (await request.form()).items() if isinstance(v, str)}
+    score = form.score(answers)
+    application_id = uuid.uuid4().hex
+    try:
+        await store.append(
+            {
+                "id": application_id,
+                "position": form.title,
+                "form": spec.query() | {"seed": spec.seed},
+                "answers": answers,
+                "score": score,
+                "submissionTimestamp": datetime.datetime.utcnow().isoformat() + "Z",
+            }
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Could not save application data: {e}"
+        )
+    return {
+        "message": "Application submitted successfully!",
+        "application_id": application_id,
+        "score": score,
     }
 
 
@@ -141,3 +285,5 @@ async def root():
 # cd job_ui
 # uvicorn server:app --reload --port 8001
 # Then access the UI at http://localhost:8001/static/index.html
+# Synthetic form variants: http://localhost:8001/forms/42?pages=3&fields_per_page=10
+# (expected answers at /forms/42/expected with the same query parameters)
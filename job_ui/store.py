@@ -0,0 +1,157 @@
+import asyncio
+import json
+import os
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class SubmissionStore:
+    """
+    Append-only JSONL store for form submissions.
+
+    Handlers hand records to a single background writer, which appends them in
+    batches and fsyncs once per batch (group commit). Each append() resolves
+    only after its batch is on disk, so a success response still means the
+    submission is durable, but a burst of N submissions costs one fsync
+    instead of N file creations.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_batch_size: int = 256,
+        max_batch_delay: float = 0.005,
+    ):
+        self.path = path
+        self.max_batch_size = max_batch_size
+        self.max_batch_delay = max_batch_delay
+        self._queue: Optional[asyncio.Queue] = None
+        self._writer: Optional[asyncio.Task] = None
+        self._file = None
+        self.count = 0
+        self.by_position: Counter = Counter()
+        self.first_timestamp: Optional[str] = None
+        self.last_timestamp: Optional[str] = None
+        self.batches_written = 0
+        # Synthetic form submissions carry a score (see forms.py)
+        self.scored = 0
+        self.accuracy_sum = 0.0
+
+    async def start(self) -> None:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        await asyncio.to_thread(self._load_existing)
+        self._file = open(self.path, "ab")
+        self._queue = asyncio.Queue()
+        self._writer = asyncio.create_task(self._run_writer())
+
+    async def stop(self) -> None:
+        """Flushes everything queued so far and closes the file."""
+        if self._writer is None:
+            return
+        await self._queue.put(None)
+        await self._writer
+        self._writer = None
+        self._file.close()
+        self._file = None
+
+    async def append(self, record: Dict[str, Any]) -> None:
+        """Queues a record and waits until its batch has been fsynced."""
+        if self._writer is None:
+            raise RuntimeError("SubmissionStore is not running")
+        line = (json.dumps(record, separators=(",", ":")) + "\n").encode()
+        done = asyncio.get_running_loop().create_future()
+        await self._queue.put((line, record, done))
+        await done
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "submissions": self.count,
+            "by_position": dict(self.by_position),
+            "first_submission": self.first_timestamp,
+            "last_submission": self.last_timestamp,
+            "scored_submissions": self.scored,
+            "mean_accuracy": self.accuracy_sum / self.scored if self.scored else None,
+            "batches_written": self.batches_written,
+            "pending_writes": self._queue.qsize() if self._queue else 0,
+            "store": self.path,
+        }
+
+    def _load_existing(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        complete = 0
+        with open(self.path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                complete += len(line)
+                try:
+                    self._count(json.loads(line))
+                except ValueError:
+                    continue
+        if complete < os.path.getsize(self.path):
+            # A torn last line from a crash mid-write; cut it off so the next
+            # append starts on a line of its own
+            os.truncate(self.path, complete)
+
+    def _count(self, record: Dict[str, Any]) -> None:
+        self.count += 1
+        self.by_position[record.get("position") or "unknown"] += 1
+        timestamp = record.get("submissionTimestamp")
+        if self.first_timestamp is None:
+            self.first_timestamp = timestamp
+        self.last_timestamp = timestamp
+        score = record.get("score")
+        if score:
+            self.scored += 1
+            self.accuracy_sum += score.get("accuracy", 0.0)
+
+    async def _run_writer(self) -> None:
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            batch: List[Tuple[bytes, Dict[str, Any], asyncio.Future]] = []
+            if item is None:
+                stopping = True
+            else:
+                batch.append(item)
+                # Give concurrent handlers a moment to join this batch
+                loop = asyncio.get_running_loop()
+                deadline = loop.time() + self.max_batch_delay
+                while len(batch) < self.max_batch_size:
+                    try:
+                        item = self._queue.get_nowait()
+                    except asyncio.QueueEmpty:
+                        timeout = deadline - loop.time()
+                        if timeout <= 0:
+                            break
+                        try:
+                            item = await asyncio.wait_for(self._queue.get(), timeout)
+                        except asyncio.TimeoutError:
+                            break
+                    if item is None:
+                        stopping = True
+                        break
+                    batch.append(item)
+            if not batch:
+                continue
+
+            try:
+                await asyncio.to_thread(
+                    self._write_batch, [line for line, _, _ in batch]
+                )
+            except Exception as e:
+                for _, _, done in batch:
+                    if not done.done():
+                        done.set_exception(e)
+                continue
+            self.batches_written += 1
+            for _, record, done in batch:
+                self._count(record)
+                if not done.done():
+                    done.set_result(None)
+
+    def _write_batch(self, lines: List[bytes]) -> None:
+        self._file.write(b"".join(lines))
+        self._file.flush()
+        os.fsync(self._file.fileno())
@@ -0,0 +1,65 @@
+import pytest
+
+from app.services import autoscale
+
+
+@pytest.fixture(autouse=True)
+def fleet(monkeypatch):
+    settings = autoscale.settings
+    monkeypatch.setattr(settings, "AUTOSCALE_TARGET_WAIT_SECONDS", 300)
+    monkeypatch.setattr(settings, "AUTOSCALE_SLOTS_PER_WORKER", 2)
+    monkeypatch.setattr(settings, "AUTOSCALE_MIN_WORKERS", 1)
+    monkeypatch.setattr(settings, "AUTOSCALE_MAX_WORKERS", 20)
+    return settings
+
+
+def test_idle_fleet_keeps_the_minimum():
+    assert autoscale.recommend_workers(0, 0, 0.0, 120.0) == 1
+
+
+def test_steady_state_follows_littles_law():
+    # 0.1 arrivals/s * 120 s per run = 12 busy slots = 6 workers of 2 slots
+    assert autoscale.recommend_workers(0, 0, 0.1, 120.0) == 6
+
+
+def test_busy_slots_count_when_above_the_arrival_rate():
+    assert autoscale.recommend_workers(0, 9, 0.0, 120.0) == 5
+
+
+def test_backlog_is_drained_within_the_target_wait():
+    # 50 waiting * 120 s / 300 s = 20 extra slots
+    assert autoscale.recommend_workers(50, 0, 0.0, 120.0) == 10
+    assert autoscale.recommend_workers(50, 4, 0.0, 120.0) == 12
+
+
+def test_recommendation_is_clamped(fleet, monkeypatch):
+    assert autoscale.recommend_workers(10_000, 0, 5.0, 120.0) == 20
+    monkeypatch.setattr(fleet, "AUTOSCALE_MIN_WORKERS", 3)
+    assert autoscale.recommend_workers(0, 0, 0.0, 120.0) == 3
+
+
+def test_zero_settings_do_not_divide_by_zero(fleet, monkeypatch):
+    monkeypatch.setattr(fleet, "AUTOSCALE_TARGET_WAIT_SECONDS", 0)
+    monkeypatch.setattr(fleet, "AUTOSCALE_SLOTS_PER_WORKER", 0)
+    assert autoscale.recommend_workers(1, 0, 0.0, 10.0) == 10
+
+
+@pytest.mark.parametrize(
+    "token, authorization, expected",
+    [
+        ("", None, 404),
+        ("", "Bearer ", 404),
+        ("secret", None, 401),
+        ("secret", "Bearer wrong", 401),
+        ("secret", "Bearer secret", 200),
+    ],
+)
+def test_metrics_require_a_configured_token(
+    client, fleet, monkeypatch, token, authorization, expected
+):
+    monkeypatch.setattr(fleet, "METRICS_TOKEN", token)
+    monkeypatch.setattr(autoscale, "to_prometheus", lambda signal: "")
+    monkeypatch.setattr(autoscale, "get_signal", lambda db: {})
+    headers = {"Authorization": authorization} if authorization else {}
+
+    assert client.get("/metrics", headers=headers).status_code == expected
@@ -0,0 +1,86 @@
+import json
+
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from app import middleware
+from app.middleware import CompressionMiddleware, negotiate_encoding
+
+LARGE = {"items": ["x" * 40] * 100}
+
+
+@pytest.mark.parametrize(
+    "header, with_brotli, expected",
+    [
+        ("", "br", None),
+        ("identity", "br", None),
+        ("gzip", "br", "gzip"),
+        ("gzip, br", "br", "br"),
+        ("GZIP;q=0.8, br;q=0.5", "br", "gzip"),
+        ("br;q=0, gzip;q=0.1", "br", "gzip"),
+        ("gzip;q=0", "br", None),
+        ("*", "br", "br"),
+        ("*;q=0.5, br;q=0", "br", "gzip"),
+        ("gzip;q=bogus, br", "br", "br"),
+        ("gzip, br", None, "gzip"),
+        ("br", None, None),
+    ],
+)
+def test_negotiate_encoding(monkeypatch, header, with_brotli, expected):
+    if with_brotli is None:
+        monkeypatch.setattr(middleware, "brotli", None)
+    assert negotiate_encoding(header) == expected
+
+
+@pytest.fixture
+def client():
+    app = Starlette(
+        routes=[
+            Route("/large", lambda request: JSONResponse(LARGE)),
+            Route("/small", lambda request: JSONResponse({"ok": True})),
+            Route(
+                "/pdf",
+                lambda request: Response(b"%PDF" * 1000, media_type="application/pdf"),
+            ),
+            Route(
+                "/not-modified",
+                lambda request: Response(status_code=304, headers={"ETag": '"abc"'}),
+            ),
+        ]
+    )
+    app.add_middleware(CompressionMiddleware, minimum_size=1024)
+    return TestClient(app)
+
+
+def test_large_json_is_gzipped(client):
+    response = client.get("/large", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.headers["Vary"] == "Accept-Encoding"
+    assert response.json() == LARGE
+    assert int(response.headers["Content-Length"]) < len(json.dumps(LARGE)) // 10
+
+
+@pytest.mark.parametrize("encoding", ["gzip", "identity"])
+@pytest.mark.parametrize("path", ["/large", "/small", "/not-modified"])
+def test_vary_on_every_compressible_response(client, path, encoding):
+    response = client.get(path, headers={"Accept-Encoding": encoding})
+
+    assert response.headers["Vary"] == "Accept-Encoding"
+
+
+def test_incompressible_types_pass_through(client):
+    response = client.get("/pdf", headers={"Accept-Encoding": "gzip"})
+
+    assert "Content-Encoding" not in response.headers
+    assert "Vary" not in response.headers
+
+
+def test_not_modified_echoes_the_compressed_etag(client):
+    response = client.get("/not-modified", headers={"Accept-Encoding": "gzip"})
+
+    assert response.status_code == 304
+    assert response.headers["ETag"] == '"abc-gzip"'
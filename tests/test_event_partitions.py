@@ -0,0 +1,168 @@
+from datetime import date
+
+import pytest
+
+from app.services import event_partitions as ep
+
+
+class FakeResult:
+    def __init__(self, value):
+        self.value = value
+
+    def scalars(self):
+        return iter(self.value)
+
+    def scalar(self):
+        return self.value
+
+    @property
+    def rowcount(self):
+        return self.value
+
+
+class FakeConnection:
+    """Answers the catalog and default-partition queries; records the rest."""
+
+    def __init__(self, partitions, stranded=False):
+        self.partitions = list(partitions)
+        self.stranded = stranded
+        self.statements = []
+        self.params = []
+
+    def execute(self, statement, params=None):
+        sql = str(statement)
+        if "pg_inherits" in sql:
+            return FakeResult(sorted(self.partitions))
+        if sql.startswith("SELECT EXISTS"):
+            return FakeResult(self.stranded)
+        self.statements.append(sql)
+        self.params.append(params)
+        if sql.startswith("WITH moved"):
+            return FakeResult(5)
+        return FakeResult(None)
+
+
+@pytest.mark.parametrize(
+    "month, months, expected",
+    [
+        (date(2026, 10, 1), 1, date(2026, 11, 1)),
+        (date(2026, 12, 1), 1, date(2027, 1, 1)),
+        (date(2026, 11, 1), 14, date(2028, 1, 1)),
+        (date(2026, 1, 1), -1, date(2025, 12, 1)),
+        (date(2026, 3, 1), -15, date(2024, 12, 1)),
+        (date(2026, 5, 1), 0, date(2026, 5, 1)),
+    ],
+)
+def test_add_months(month, months, expected):
+    assert ep._add_months(month, months) == expected
+
+
+def test_partition_name_round_trips():
+    name = ep.partition_name(date(2027, 3, 17))
+
+    assert name == "application_events_y2027m03"
+    assert ep.PARTITION_NAME_RE.match(name).groups() == ("2027", "03")
+    assert not ep.PARTITION_NAME_RE.match(ep.DEFAULT_PARTITION)
+
+
+def test_create_partition_sql_covers_the_utc_month():
+    sql = ep.create_partition_sql(date(2026, 12, 15))
+
+    assert "application_events_y2026m12 PARTITION OF application_events" in sql
+    assert "FROM ('2026-12-01 00:00:00+00') TO ('2027-01-01 00:00:00+00')" in sql
+
+
+def test_ensure_partitions_creates_only_missing_months():
+    connection = FakeConnection(
+        ["application_events_default", "application_events_y2026m12"]
+    )
+
+    created = ep.ensure_partitions(connection, months_ahead=2, today=date(2026, 11, 20))
+
+    assert created == ["application_events_y2026m11", "application_events_y2027m01"]
+    assert all(sql.startswith("CREATE TABLE") for sql in connection.statements)
+
+
+def test_stranded_rows_are_moved_out_of_the_default():
+    connection = FakeConnection(["application_events_default"], stranded=True)
+
+    moved = ep.create_partition(connection, date(2026, 11, 1))
+
+    assert moved == 5
+    detach, create, move, attach = connection.statements
+    assert detach.endswith("DETACH PARTITION application_events_default")
+    assert create.startswith("CREATE TABLE IF NOT EXISTS application_events_y2026m11")
+    assert "DELETE FROM application_events_default" in move
+    assert "INSERT INTO application_events_y2026m11" in move
+    assert attach.endswith("ATTACH PARTITION application_events_default DEFAULT")
+
+
+def test_drop_old_partitions_keeps_the_retention_window():
+    connection = FakeConnection(
+        [
+            "application_events_default",
+            "application_events_y2026m01",
+            "application_events_y2026m02",
+            "application_events_y2026m03",
+        ]
+    )
+
+    dropped = ep.drop_old_partitions(
+        connection, retention_months=9, today=date(2026, 11, 5)
+    )
+
+    assert dropped == ["application_events_y2026m01"]
+    detach, drop, delete = connection.statements
+    assert detach == (
+        "ALTER TABLE application_events DETACH PARTITION application_events_y2026m01"
+    )
+    assert drop == "DROP TABLE application_events_y2026m01"
+    assert delete.startswith("DELETE FROM application_events_default")
+    assert "created_at < CAST(:cutoff AS timestamptz)" in delete
+    assert connection.params[-1] == {"cutoff": "2026-02-01 00:00:00+00"}
+
+
+def test_drop_old_partitions_without_a_default_deletes_nothing():
+    connection = FakeConnection(["application_events_y2026m01"])
+
+    ep.drop_old_partitions(connection, retention_months=9, today=date(2026, 11, 5))
+
+    assert not any(sql.startswith("DELETE") for sql in connection.statements)
+
+
+def test_retention_of_zero_keeps_everything():
+    connection = FakeConnection(["application_events_y2000m01"])
+
+    assert ep.drop_old_partitions(connection, retention_months=0) == []
+
+
+def test_maintain_partitions_isolates_failing_months(monkeypatch):
+    from contextlib import contextmanager
+
+    from sqlalchemy.exc import OperationalError
+
+    connection = FakeConnection(["application_events_default"])
+
+    class FakeEngine:
+        @contextmanager
+        def connect(self):
+            yield connection
+
+        begin = connect
+
+    def create_partition(connection, month):
+        if month == date(2026, 11, 1):
+            raise OperationalError("CREATE TABLE", {}, Exception("locked"))
+
+    monkeypatch.setattr(ep, "_today", lambda: date(2026, 11, 5))
+    monkeypatch.setattr(ep.settings, "EVENT_PARTITION_MONTHS_AHEAD", 1)
+    monkeypatch.setattr(ep.settings, "EVENT_RETENTION_MONTHS", 0)
+    monkeypatch.setattr(ep, "create_partition", create_partition)
+
+    result = ep.maintain_partitions(FakeEngine())
+
+    assert result == {
+        "created": ["application_events_y2026m12"],
+        "failed": ["application_events_y2026m11"],
+        "dropped": [],
+    }
@@ -0,0 +1,103 @@
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from app import crud, models
+from app.routers import applications
+from app.services import idempotency
+
+
+@pytest.fixture
+def submissions(monkeypatch, fake_redis):
+    """Patches the submit route's storage; returns the enqueued application ids."""
+    rows = {}
+    enqueued = []
+
+    def create_job_application(db, application, owner_id, commit=True):
+        row = SimpleNamespace(
+            id=len(rows) + 1,
+            owner_id=owner_id,
+            job_url=str(application.job_url),
+            status=models.JobApplicationStatus.RECEIVED,
+            submission_timestamp=None,
+            extracted_job_title=None,
+            extracted_company_name=None,
+            error_message=None,
+            created_at=datetime.now(timezone.utc),
+            updated_at=None,
+        )
+        rows[row.id] = row
+        return row
+
+    monkeypatch.setattr(idempotency, "get_redis", lambda: fake_redis)
+    monkeypatch.setattr(crud, "create_job_application", create_job_application)
+    monkeypatch.setattr(
+        crud, "get_job_application_by_canonical_url", lambda *args, **kwargs: None
+    )
+    monkeypatch.setattr(
+        crud,
+        "get_job_application",
+        lambda db, application_id, owner_id: rows.get(application_id),
+    )
+    monkeypatch.setattr(
+        applications.dispatch,
+        "enqueue_application",
+        lambda db, application_id: enqueued.append(application_id),
+    )
+    monkeypatch.setattr(applications.replica, "mark_recent_write", lambda email: None)
+    return enqueued
+
+
+def submit(client, job_url, key):
+    return client.post(
+        "/api/applications/",
+        json={"job_url": job_url},
+        headers={"Idempotency-Key": key},
+    )
+
+
+def test_record_round_trip():
+    record = idempotency.IdempotencyRecord(idempotency.STATE_DONE, "abc", 42, 201)
+    assert idempotency.IdempotencyRecord.decode(record.encode()) == record
+    pending = idempotency.IdempotencyRecord(idempotency.STATE_PENDING, "abc")
+    assert idempotency.IdempotencyRecord.decode(pending.encode()).is_pending
+
+
+def test_replay_returns_original_without_dispatching(client, submissions):
+    first = submit(client, "https://jobs.example.com/1", "key-1")
+    replay = submit(client, "https://jobs.example.com/1", "key-1")
+
+    assert first.status_code == 201
+    assert replay.status_code == 201
+    assert replay.json()["id"] == first.json()["id"]
+    assert replay.headers["Idempotent-Replayed"] == "true"
+    assert submissions == [first.json()["id"]]
+
+
+def test_key_reused_for_another_request_is_rejected(client, submissions):
+    submit(client, "https://jobs.example.com/1", "key-1")
+    response = submit(client, "https://jobs.example.com/2", "key-1")
+
+    assert response.status_code == 422
+    assert len(submissions) == 1
+
+
+def test_key_in_progress_answers_conflict(client, submissions, user, fake_redis):
+    fingerprint = idempotency.fingerprint("https://jobs.example.com/1")
+    idempotency.reserve(user.id, "key-1", fingerprint)
+
+    response = submit(client, "https://jobs.example.com/1", "key-1")
+
+    assert response.status_code == 409
+    assert response.headers["Retry-After"] == "1"
+    assert submissions == []
+
+
+def test_keys_are_scoped_per_user(fake_redis, monkeypatch):
+    monkeypatch.setattr(idempotency, "get_redis", lambda: fake_redis)
+    fingerprint = idempotency.fingerprint("https://jobs.example.com/1")
+
+    assert idempotency.reserve(1, "key-1", fingerprint) is None
+    assert idempotency.reserve(2, "key-1", fingerprint) is None
+    assert idempotency.reserve(1, "key-1", fingerprint).is_pending
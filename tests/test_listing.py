@@ -0,0 +1,58 @@
+from sqlalchemy.dialects import postgresql
+
+from app import crud
+
+
+class RecordingSession:
+    """Compiles the statement it is given and answers with an empty page."""
+
+    def __init__(self):
+        self.sql = None
+
+    def execute(self, statement):
+        self.sql = str(statement.compile(dialect=postgresql.dialect()))
+        return self
+
+    def one(self):
+        return (0, None)
+
+
+def test_version_covers_only_the_requested_page():
+    db = RecordingSession()
+
+    crud.get_job_applications_version(db, owner_id=1, skip=20, limit=10)
+
+    assert "LIMIT" in db.sql and "OFFSET" in db.sql
+    assert "ORDER BY job_applications.created_at DESC" in db.sql
+    assert "md5(string_agg(" in db.sql
+
+
+def test_listing_etag_follows_the_page_version(client, monkeypatch):
+    versions = []
+    pages = []
+
+    def get_version(db, owner_id, skip=0, limit=100):
+        versions.append((skip, limit))
+        return (2, "digest")
+
+    def get_rows(db, owner_id, skip=0, limit=100, fields=()):
+        pages.append((skip, limit))
+        return []
+
+    monkeypatch.setattr(crud, "get_job_applications_version", get_version)
+    monkeypatch.setattr(crud, "get_job_application_rows_by_user", get_rows)
+
+    first = client.get("/api/applications/?skip=10&limit=5")
+    etag = first.headers["ETag"]
+    cached = client.get(
+        "/api/applications/?skip=10&limit=5", headers={"If-None-Match": etag}
+    )
+    other_page = client.get(
+        "/api/applications/?skip=15&limit=5", headers={"If-None-Match": etag}
+    )
+
+    assert first.status_code == 200
+    assert cached.status_code == 304
+    assert other_page.status_code == 200
+    assert versions == [(10, 5), (10, 5), (15, 5)]
+    assert pages == [(10, 5), (15, 5)]
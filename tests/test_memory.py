@@ -0,0 +1,37 @@
+import subprocess
+import sys
+from types import SimpleNamespace
+
+import psutil
+
+from app.worker import memory
+
+
+def test_restart_browser_stops_the_process_tree(monkeypatch):
+    resets = []
+    fake_browser = SimpleNamespace(reset_browser=lambda: resets.append(True))
+    monkeypatch.setitem(sys.modules, "app.services.browser", fake_browser)
+    child = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(60)"])
+
+    try:
+        memory.restart_browser()
+
+        assert resets == [True]
+        assert child.wait(timeout=10) is not None
+        assert not psutil.pid_exists(child.pid)
+    finally:
+        if child.poll() is None:
+            child.kill()
+
+
+def test_restart_without_a_browser_module_still_stops_processes(monkeypatch):
+    monkeypatch.delitem(sys.modules, "app.services.browser", raising=False)
+    child = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(60)"])
+
+    try:
+        memory.restart_browser()
+
+        assert child.wait(timeout=10) is not None
+    finally:
+        if child.poll() is None:
+            child.kill()
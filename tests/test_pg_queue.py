@@ -0,0 +1,167 @@
+import os
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from app.worker import pg_queue, tasks
+from app.worker.pg_queue import ClaimedJob
+
+
+class FakeConnection:
+    """Records statements; claim queries return the given rows."""
+
+    def __init__(self, rows=()):
+        self.rows = list(rows)
+        self.statements = []
+
+    @contextmanager
+    def begin(self):
+        yield self
+
+    def execute(self, statement, params=None):
+        self.statements.append((" ".join(str(statement).split()), params))
+        return SimpleNamespace(all=lambda: self.rows)
+
+
+class FakeEngine:
+    def __init__(self):
+        self.connection = FakeConnection()
+
+    @contextmanager
+    def connect(self):
+        yield self.connection
+
+
+@pytest.fixture(autouse=True)
+def queue_settings(monkeypatch):
+    monkeypatch.setattr(pg_queue.settings, "PG_QUEUE_VISIBILITY_TIMEOUT_SECONDS", 600)
+    monkeypatch.setattr(pg_queue.settings, "PG_QUEUE_MAX_ATTEMPTS", 3)
+
+
+def test_claim_hides_jobs_for_the_visibility_timeout():
+    row = SimpleNamespace(id=4, task="t", args=[1], attempts=1)
+    connection = FakeConnection([row])
+
+    jobs = pg_queue.claim(connection, "host:1", batch_size=5)
+
+    assert jobs == [ClaimedJob(4, "t", [1], 1)]
+    sql, params = connection.statements[0]
+    assert "FOR UPDATE SKIP LOCKED" in sql
+    assert params == {"visibility_timeout": 600, "worker_id": "host:1", "batch_size": 5}
+
+
+def test_extend_only_touches_jobs_still_claimed_by_the_worker():
+    connection = FakeConnection()
+
+    pg_queue.extend(connection, [4, 5], "host:1", 600)
+
+    sql, params = connection.statements[0]
+    assert "claimed_by = :worker_id" in sql
+    assert params == {"seconds": 600, "ids": [4, 5], "worker_id": "host:1"}
+
+
+@pytest.mark.parametrize("attempts, delay", [(1, 30), (2, 60)])
+def test_fail_retries_with_exponential_backoff(attempts, delay):
+    connection = FakeConnection()
+
+    pg_queue.fail(connection, ClaimedJob(4, "t", [], attempts), "boom")
+
+    sql, params = connection.statements[0]
+    assert "claimed_by = NULL" in sql
+    assert params == {"id": 4, "error": "boom", "delay": delay}
+
+
+def test_fail_dead_letters_after_max_attempts():
+    connection = FakeConnection()
+
+    pg_queue.fail(connection, ClaimedJob(4, "t", [], 3), "boom")
+
+    sql, params = connection.statements[0]
+    assert "dead_at = now()" in sql
+    assert params == {"id": 4, "error": "boom"}
+
+
+def test_run_job_completes_or_fails_the_job():
+    engine = FakeEngine()
+
+    def broken():
+        raise OperationalError("SELECT 1", {}, Exception("connection refused"))
+
+    celery_app = SimpleNamespace(tasks={"ok": lambda: None, "broken": broken})
+    pg_queue._run_job(engine, celery_app, ClaimedJob(1, "ok", [], 1))
+    pg_queue._run_job(engine, celery_app, ClaimedJob(2, "broken", [], 1))
+
+    (done, done_params), (failed, failed_params) = engine.connection.statements
+    assert done.startswith("DELETE FROM job_queue") and done_params == {"id": 1}
+    assert failed.startswith("UPDATE job_queue") and failed_params["id"] == 2
+
+
+class BrokenSession:
+    def __init__(self, error):
+        self.error = error
+
+    def query(self, *args):
+        raise self.error
+
+    def close(self):
+        pass
+
+
+def test_database_errors_before_the_run_reach_the_queue(monkeypatch):
+    error = OperationalError("SELECT", {}, Exception("connection refused"))
+    monkeypatch.setattr(tasks, "SessionLocal", lambda: BrokenSession(error))
+
+    # Called in-process, as pg_queue does; retry() re-raises the error
+    with pytest.raises(OperationalError):
+        tasks.process_application_placeholder(1)
+
+
+def test_other_errors_are_handled_by_the_task(monkeypatch):
+    monkeypatch.setattr(
+        tasks, "SessionLocal", lambda: BrokenSession(RuntimeError("bug"))
+    )
+
+    assert tasks.process_application_placeholder(1) is None
+
+
+@pytest.mark.skipif(
+    not os.getenv("TEST_DATABASE_URL"), reason="needs TEST_DATABASE_URL (Postgres)"
+)
+def test_jobs_of_a_dead_worker_are_reclaimed():
+    from sqlalchemy import create_engine, text
+
+    from app import models
+
+    engine = create_engine(os.environ["TEST_DATABASE_URL"])
+    table = models.JobQueueItem.__table__
+    table.drop(engine, checkfirst=True)
+    table.create(engine)
+    try:
+        with engine.begin() as connection:
+            connection.execute(
+                text("INSERT INTO job_queue (task, args) VALUES ('t', '[7]')")
+            )
+        with engine.connect() as connection:
+            (first,) = pg_queue.claim(connection, "a", visibility_timeout=600)
+            assert pg_queue.claim(connection, "b") == []
+            # Worker "a" dies: its claim runs out instead of being extended
+            pg_queue.extend(connection, [first.id], "a", 0)
+            (reclaimed,) = pg_queue.claim(connection, "b")
+            assert (reclaimed.id, reclaimed.attempts) == (first.id, 2)
+            # A late heartbeat from "a" no longer extends "b"'s claim
+            pg_queue.extend(connection, [first.id], "a", 0)
+            assert pg_queue.claim(connection, "c") == []
+
+            pg_queue.fail(connection, reclaimed, "boom")
+            assert pg_queue.claim(connection, "c") == []  # backing off
+            pg_queue.complete(connection, first.id)
+            with connection.begin():
+                assert (
+                    connection.execute(text("SELECT count(*) FROM job_queue")).scalar()
+                    == 0
+                )
+    finally:
+        table.drop(engine, checkfirst=True)
+        engine.dispose()
@@ -0,0 +1,169 @@
+from collections import namedtuple
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.sql.elements import Null
+from starlette.requests import Request
+
+from app import crud, etags, schemas
+from app.routers import profile
+from app.services import profile_patch
+
+Version = namedtuple("Version", "id xmin updated_at version")
+
+ADD_SKILL = [{"op": "add", "path": "/skills/-", "value": "Rust"}]
+
+
+def request_with(**headers):
+    raw = [
+        (name.replace("_", "-").encode(), value.encode())
+        for name, value in headers.items()
+    ]
+    return Request({"type": "http", "method": "PATCH", "headers": raw})
+
+
+@pytest.fixture
+def profile_store(monkeypatch):
+    """The profile's version and the outcome of the next conditional UPDATE."""
+    state = {"version": Version(1, "100", None, 3), "outcome": "applied"}
+
+    def patch_user_profile(db, user_id, expected_version, values, conditions):
+        if state["outcome"] == "raced":
+            # Another writer committed between the If-Match check and the UPDATE
+            state["version"] = Version(1, "101", None, expected_version + 1)
+            return None
+        if state["outcome"] == "test_failed":
+            return None
+        state["version"] = Version(1, "102", None, expected_version + 1)
+        return state["version"]
+
+    monkeypatch.setattr(
+        crud, "get_user_profile_version", lambda db, user_id: state["version"]
+    )
+    monkeypatch.setattr(crud, "patch_user_profile", patch_user_profile)
+    monkeypatch.setattr(profile.replica, "mark_recent_write", lambda email: None)
+    return state
+
+
+def current_etag(state):
+    return etags.make_etag("profile", *state["version"])
+
+
+def test_patch_returns_new_etag(client, profile_store):
+    before = current_etag(profile_store)
+
+    response = client.patch(
+        "/api/profile/", json=ADD_SKILL, headers={"If-Match": before}
+    )
+
+    assert response.status_code == 204
+    assert response.headers["ETag"] == current_etag(profile_store) != before
+
+
+def test_stale_if_match_is_412(client, profile_store):
+    response = client.patch(
+        "/api/profile/", json=ADD_SKILL, headers={"If-Match": '"stale"'}
+    )
+
+    assert response.status_code == 412
+    assert profile_store["version"].version == 3
+
+
+def test_compressed_variant_of_current_etag_matches(client, profile_store):
+    tag = current_etag(profile_store)
+
+    response = client.patch(
+        "/api/profile/", json=ADD_SKILL, headers={"If-Match": tag[:-1] + '-gzip"'}
+    )
+
+    assert response.status_code == 204
+
+
+def test_concurrent_change_is_412(client, profile_store):
+    profile_store["outcome"] = "raced"
+
+    response = client.patch("/api/profile/", json=ADD_SKILL)
+
+    assert response.status_code == 412
+
+
+def test_failed_test_operation_is_409(client, profile_store):
+    profile_store["outcome"] = "test_failed"
+
+    response = client.patch(
+        "/api/profile/", json=[{"op": "test", "path": "/first_name", "value": "Ada"}]
+    )
+
+    assert response.status_code == 409
+
+
+def test_unpatchable_field_is_422(client, profile_store):
+    response = client.patch(
+        "/api/profile/", json=[{"op": "replace", "path": "/resume_path", "value": "x"}]
+    )
+
+    assert response.status_code == 422
+
+
+@pytest.mark.parametrize(
+    "header, failed",
+    [
+        (None, False),
+        ("*", False),
+        ('"abc"', False),
+        ('"other", "abc"', False),
+        ('"abc-br"', False),
+        ('W/"abc"', True),
+        ('"other"', True),
+    ],
+)
+def test_if_match(header, failed):
+    request = request_with(if_match=header) if header else request_with()
+    assert etags.precondition_failed(request, '"abc"') is failed
+
+
+def test_if_none_match_uses_weak_comparison():
+    assert etags.is_not_modified(request_with(if_none_match='W/"abc-gzip"'), '"abc"')
+    assert not etags.is_not_modified(request_with(if_none_match='"other"'), '"abc"')
+
+
+def test_compile_patch_writes_only_touched_fields():
+    operations = [
+        schemas.JsonPatchOperation(op="add", path="/skills/-", value="Rust"),
+        schemas.JsonPatchOperation(op="test", path="/first_name", value="Ada"),
+    ]
+
+    values, conditions = profile_patch.compile_patch(operations)
+
+    assert set(values) == {"skills"}
+    assert conditions
+
+
+@pytest.mark.parametrize(
+    "path", ["skills", "/resume_path", "/first_name/0", "/skills/-/name"]
+)
+def test_compile_patch_rejects_bad_paths(path):
+    with pytest.raises(profile_patch.PatchError):
+        profile_patch.compile_patch(
+            [schemas.JsonPatchOperation(op="add", path=path, value="x")]
+        )
+
+
+@pytest.mark.parametrize("op", ["add", "replace"])
+@pytest.mark.parametrize("path", ["/address", "/skills", "/phone"])
+def test_whole_field_null_is_stored_as_sql_null(op, path):
+    values, _ = profile_patch.compile_patch(
+        [schemas.JsonPatchOperation(op=op, path=path, value=None)]
+    )
+
+    assert isinstance(values[path[1:]], Null)
+
+
+def test_null_inside_a_document_stays_json():
+    values, _ = profile_patch.compile_patch(
+        [schemas.JsonPatchOperation(op="replace", path="/address/street", value=None)]
+    )
+
+    sql = values["address"].compile(dialect=postgresql.dialect())
+    assert "jsonb_set" in str(sql)
+    assert "null" in sql.params.values()
@@ -0,0 +1,130 @@
+from types import SimpleNamespace
+
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from app import crud, models
+from app.middleware import RateLimitMiddleware
+from app.routers import applications
+from app.services import rate_limit
+
+
+@pytest.fixture
+def refunds(monkeypatch):
+    """Admits every request; returns the refunded (subject, ip, member) charges."""
+    refunded = []
+    monkeypatch.setattr(rate_limit, "admit", lambda subject, ip, member: None)
+    monkeypatch.setattr(
+        rate_limit,
+        "refund",
+        lambda subject, ip, member: refunded.append((subject, ip, member)),
+    )
+    return refunded
+
+
+def limited_client(status_code):
+    async def submit(request):
+        if status_code is None:
+            raise RuntimeError("boom")
+        return JSONResponse({}, status_code=status_code)
+
+    app = Starlette(routes=[Route("/submit", submit, methods=["POST"])])
+    app.add_middleware(RateLimitMiddleware, paths=["/submit"])
+    return TestClient(app, raise_server_exceptions=False)
+
+
+def test_successful_request_keeps_its_charge(refunds):
+    response = limited_client(201).post("/submit")
+
+    assert response.status_code == 201
+    assert refunds == []
+
+
+@pytest.mark.parametrize("status_code", [401, 422, 500])
+def test_error_response_is_refunded(refunds, status_code):
+    response = limited_client(status_code).post("/submit")
+
+    assert response.status_code == status_code
+    assert len(refunds) == 1
+
+
+def test_unhandled_exception_is_refunded(refunds):
+    response = limited_client(None).post("/submit")
+
+    assert response.status_code == 500
+    assert len(refunds) == 1
+
+
+def test_other_paths_are_not_charged(refunds):
+    client = limited_client(201)
+
+    assert client.post("/other").status_code == 404
+    assert refunds == []
+
+
+def existing(status):
+    return SimpleNamespace(id=7, status=status, error_message="failed")
+
+
+def charged_request():
+    charge = ("user@example.com", "127.0.0.1", "member")
+    return SimpleNamespace(state=SimpleNamespace(**{rate_limit.CHARGE_STATE: charge}))
+
+
+@pytest.mark.parametrize(
+    "status",
+    [
+        models.JobApplicationStatus.RECEIVED,
+        models.JobApplicationStatus.PROCESSING,
+        models.JobApplicationStatus.SUBMITTED,
+    ],
+)
+def test_duplicate_without_requeue_is_refunded(refunds, user, status):
+    response = SimpleNamespace(status_code=None)
+
+    applications._existing_application(
+        charged_request(), None, existing(status), response, None, None, user
+    )
+
+    assert response.status_code == 200
+    assert refunds == [("user@example.com", "127.0.0.1", "member")]
+
+
+def test_requeued_duplicate_keeps_its_charge(monkeypatch, refunds, user):
+    enqueued = []
+    row = existing(models.JobApplicationStatus.SUBMISSION_FAILED)
+    monkeypatch.setattr(
+        crud, "update_job_application_status", lambda *args, **kwargs: row
+    )
+    monkeypatch.setattr(
+        applications.dispatch,
+        "enqueue_application",
+        lambda db, application_id: enqueued.append(application_id),
+    )
+    monkeypatch.setattr(applications.replica, "mark_recent_write", lambda email: None)
+    db = SimpleNamespace(commit=lambda: None, refresh=lambda instance: None)
+    response = SimpleNamespace(status_code=None)
+
+    applications._existing_application(
+        charged_request(), db, row, response, None, None, user
+    )
+
+    assert enqueued == [7]
+    assert row.error_message is None
+    assert refunds == []
+
+
+def test_failed_duplicate_requeued_concurrently_is_refunded(monkeypatch, refunds, user):
+    monkeypatch.setattr(
+        crud, "update_job_application_status", lambda *args, **kwargs: None
+    )
+    row = existing(models.JobApplicationStatus.SUBMISSION_FAILED)
+
+    applications._existing_application(
+        charged_request(), None, row, SimpleNamespace(), None, None, user
+    )
+
+    assert len(refunds) == 1
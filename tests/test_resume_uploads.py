@@ -0,0 +1,175 @@
+import os
+import time
+from datetime import datetime, timezone
+
+import pytest
+from jose import jwt
+
+from app import schemas
+from app.routers import profile
+from app.services import storage, storage_backends
+
+PDF = b"%PDF-1.4\n%resume\n"
+
+
+@pytest.fixture
+def local(monkeypatch, tmp_path):
+    """A file:// backend in a temporary directory; records saved resume URIs."""
+    backend = storage_backends.backend_from_uri(f"file://{tmp_path}")
+    saved = []
+
+    def save_resume_path(db, user_id, resume_uri):
+        saved.append(resume_uri)
+        return schemas.UserProfile(
+            id=1,
+            user_id=user_id,
+            resume_path=resume_uri,
+            created_at=datetime.now(timezone.utc),
+        )
+
+    monkeypatch.setattr(storage_backends, "_backend", backend)
+    monkeypatch.setattr(profile, "_save_resume_path", save_resume_path)
+    monkeypatch.setattr(profile.replica, "mark_recent_write", lambda email: None)
+    backend.saved = saved
+    return backend
+
+
+def signed(**overrides):
+    now = int(time.time())
+    claims = {
+        "sub": "1",
+        "purpose": storage.UPLOAD_TOKEN_PURPOSE,
+        "key": "1/resume.pdf",
+        "ct": storage.PDF_CONTENT_TYPE,
+        "upload_until": now + 60,
+        "exp": now + 120,
+        **overrides,
+    }
+    settings = storage.settings
+    return jwt.encode(claims, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+
+
+def upload(client, token, content=PDF, content_type=storage.PDF_CONTENT_TYPE):
+    return client.put(
+        f"/api/profile/resume/uploads/{token}",
+        content=content,
+        headers={"Content-Type": content_type},
+    )
+
+
+def confirm(client, token):
+    return client.post("/api/profile/resume/confirm", json={"upload_token": token})
+
+
+def test_token_round_trip():
+    token = storage.create_upload_token(1, "1/resume.pdf", storage.PDF_CONTENT_TYPE)
+
+    claims = storage.decode_upload_token(token)
+    assert claims["sub"] == "1"
+    assert claims["key"] == "1/resume.pdf"
+    assert claims["upload_until"] < claims["exp"]
+
+
+@pytest.mark.parametrize(
+    "token",
+    [
+        signed(purpose="access"),
+        signed(exp=int(time.time()) - 1),
+        signed() + "x",
+        jwt.encode({"sub": "1", "purpose": "resume-upload"}, "another-secret"),
+    ],
+)
+def test_invalid_tokens_do_not_decode(token):
+    assert storage.decode_upload_token(token) is None
+
+
+def test_direct_upload_then_confirm(client, local):
+    token = signed()
+
+    assert upload(client, token).status_code == 204
+    response = confirm(client, token)
+
+    assert response.status_code == 200
+    assert local.saved == [local.make_uri("1/resume.pdf")]
+    assert response.json()["resume_path"] == local.make_uri("1/resume.pdf")
+
+
+@pytest.mark.parametrize(
+    "token",
+    [
+        signed(upload_until=int(time.time()) - 1),
+        signed(exp=int(time.time()) - 1),
+        signed(purpose="access"),
+    ],
+)
+def test_upload_with_an_invalid_token_is_forbidden(client, local, token):
+    assert upload(client, token).status_code == 403
+    assert not os.path.exists(os.path.join(local.root, "1"))
+
+
+def test_upload_with_another_content_type_is_rejected(client, local):
+    assert upload(client, signed(), content_type="text/html").status_code == 400
+
+
+def test_declared_size_over_the_limit_is_rejected(client, local, monkeypatch):
+    monkeypatch.setattr(profile.settings, "RESUME_MAX_BYTES", 8)
+
+    assert upload(client, signed()).status_code == 413
+
+
+def test_streamed_upload_over_the_limit_is_cut_off(client, local, monkeypatch):
+    monkeypatch.setattr(profile.settings, "RESUME_MAX_BYTES", 8)
+
+    def chunks():
+        # No Content-Length: the cap has to hold while the body is spooled
+        yield PDF[:6]
+        yield PDF[6:]
+
+    response = upload(client, signed(), content=chunks())
+
+    assert response.status_code == 413
+    assert not os.path.exists(os.path.join(local.root, "1", "resume.pdf"))
+
+
+@pytest.mark.parametrize(
+    "token",
+    [
+        signed(sub="2"),
+        signed(exp=int(time.time()) - 1),
+        signed(purpose="access"),
+    ],
+)
+def test_confirm_with_an_invalid_token_is_rejected(client, local, token):
+    upload(client, signed())
+
+    response = confirm(client, token)
+
+    assert response.status_code == 400
+    assert local.saved == []
+
+
+def test_confirm_rejects_and_deletes_content_that_is_not_a_pdf(client, local):
+    token = signed()
+    upload(client, token, content=b"<html>not a resume</html>")
+
+    response = confirm(client, token)
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Uploaded file is not a PDF."
+    assert not os.path.exists(os.path.join(local.root, "1", "resume.pdf"))
+    assert local.saved == []
+
+
+def test_confirm_rejects_a_missing_upload(client, local):
+    response = confirm(client, signed())
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Uploaded file not found."
+
+
+def test_confirm_rejects_an_empty_upload(client, local):
+    token = signed()
+    upload(client, token, content=b"")
+
+    assert confirm(client, token).status_code == 400
+    assert local.saved == []
@@ -0,0 +1,124 @@
+import io
+import os
+import stat
+
+import pytest
+
+from app.services import storage, storage_backends
+from app.services.storage_backends import GCSBackend, LocalBackend
+
+
+@pytest.fixture
+def local(monkeypatch, tmp_path):
+    """Configures a file:// backend rooted in a temporary directory."""
+    root = tmp_path / "resumes"
+    root.mkdir()
+    backend = storage_backends.backend_from_uri(f"file://{root}")
+    monkeypatch.setattr(storage_backends, "_backend", backend)
+    monkeypatch.setattr(storage_backends.settings, "GCS_BUCKET_NAME", "bucket")
+    monkeypatch.setattr(storage_backends.settings, "GCS_RESUME_FOLDER", "resumes")
+    return backend
+
+
+def test_save_is_readable_by_other_users(local):
+    uri = local.save("1/resume.pdf", io.BytesIO(b"%PDF-1.4"), "application/pdf")
+
+    path = local.local_path(uri)
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o644
+    assert local.read_prefix(uri, 5) == b"%PDF-"
+    assert not [
+        name for name in os.listdir(os.path.dirname(path)) if name != "resume.pdf"
+    ]
+
+
+def test_save_uses_the_configured_mode(local, monkeypatch):
+    monkeypatch.setattr(storage_backends.settings, "STORAGE_FILE_MODE", 0o640)
+
+    uri = local.save("1/resume.pdf", io.BytesIO(b"%PDF-1.4"), "application/pdf")
+
+    assert stat.S_IMODE(os.stat(local.local_path(uri)).st_mode) == 0o640
+
+
+@pytest.mark.parametrize(
+    "path",
+    [
+        "/etc/passwd",
+        "/../etc/passwd",
+        "{root}/../secret.pdf",
+        "{root}/1/../../secret.pdf",
+        "{root}",
+        "{root}-other/1/resume.pdf",
+    ],
+)
+def test_local_paths_outside_the_root_are_rejected(local, path):
+    uri = "file://" + path.format(root=local.root)
+
+    with pytest.raises(ValueError):
+        local.object_name(uri)
+    assert not local.owns(uri)
+
+
+def test_local_uri_with_a_host_is_rejected(local):
+    assert not local.owns(f"file://evil{local.root}/1/resume.pdf")
+
+
+def test_symlink_out_of_the_root_is_rejected(local, tmp_path):
+    outside = tmp_path / "secret.pdf"
+    outside.write_bytes(b"%PDF-secret")
+    os.makedirs(os.path.join(local.root, "1"))
+    link = os.path.join(local.root, "1", "resume.pdf")
+    os.symlink(outside, link)
+
+    assert not local.owns("file://" + link)
+    with pytest.raises(ValueError):
+        local.fetch_local("file://" + link)
+
+
+def test_is_user_object_checks_the_user_prefix(local):
+    own = local.make_uri("1/resume.pdf")
+
+    assert storage.is_user_object(own, 1)
+    assert not storage.is_user_object(own, 2)
+    assert not storage.is_user_object(local.make_uri("12/resume.pdf"), 1)
+    assert not storage.is_user_object(local.make_uri("1/../2/resume.pdf"), 1)
+    assert not storage.is_user_object(local.make_uri("2/resume.pdf"), 1)
+    assert not storage.is_user_object("file:///etc/passwd", 1)
+
+
+def test_is_user_object_through_a_symlinked_directory(local):
+    os.makedirs(os.path.join(local.root, "1"))
+    os.makedirs(os.path.join(local.root, "2"))
+    os.symlink(os.path.join(local.root, "2"), os.path.join(local.root, "1", "x"))
+
+    assert not storage.is_user_object(local.make_uri("1/x/resume.pdf"), 1)
+
+
+def test_backend_for_uri_accepts_the_configured_and_legacy_locations(local):
+    assert storage_backends.backend_for_uri(local.make_uri("1/a.pdf")) is local
+
+    legacy = storage_backends.backend_for_uri("gs://bucket/resumes/1/a.pdf")
+    assert isinstance(legacy, GCSBackend)
+    assert storage.is_user_object("gs://bucket/resumes/1/a.pdf", 1)
+
+
+@pytest.mark.parametrize(
+    "uri",
+    [
+        "gs://other-bucket/resumes/1/a.pdf",
+        "gs://bucket/elsewhere/1/a.pdf",
+        "gs://bucket/resumes-old/1/a.pdf",
+        "s3://bucket/resumes/1/a.pdf",
+        "http://example.com/resume.pdf",
+        "/etc/passwd",
+    ],
+)
+def test_backend_for_uri_rejects_other_locations(local, uri):
+    with pytest.raises(ValueError):
+        storage_backends.backend_for_uri(uri)
+    assert not storage.is_user_object(uri, 1)
+
+
+def test_local_backend_root_is_resolved():
+    backend = LocalBackend("", "/var/lib/../lib/swifty/resumes/")
+
+    assert backend.root == os.path.realpath("/var/lib/swifty/resumes")
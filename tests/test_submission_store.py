@@ -0,0 +1,94 @@
+import asyncio
+import json
+
+import pytest
+
+from job_ui.store import SubmissionStore
+
+
+def record(i, position="engineer"):
+    return {"position": position, "submissionTimestamp": f"2026-10-19T00:00:{i:02d}Z"}
+
+
+async def append_concurrently(store, records):
+    await store.start()
+    try:
+        await asyncio.gather(*(store.append(r) for r in records))
+    finally:
+        await store.stop()
+
+
+def test_concurrent_appends_share_one_fsync(tmp_path):
+    store = SubmissionStore(str(tmp_path / "submissions.jsonl"), max_batch_delay=0.05)
+
+    asyncio.run(append_concurrently(store, [record(i) for i in range(50)]))
+
+    lines = (tmp_path / "submissions.jsonl").read_text().splitlines()
+    assert len(lines) == 50
+    assert store.count == 50
+    assert store.batches_written == 1
+
+
+def test_batches_are_capped(tmp_path):
+    store = SubmissionStore(
+        str(tmp_path / "submissions.jsonl"), max_batch_size=10, max_batch_delay=0.05
+    )
+
+    asyncio.run(append_concurrently(store, [record(i) for i in range(25)]))
+
+    assert store.count == 25
+    assert store.batches_written == 3
+
+
+def test_restart_counts_existing_records_and_skips_a_torn_line(tmp_path):
+    path = tmp_path / "submissions.jsonl"
+    path.write_text(
+        json.dumps(record(1, "designer"))
+        + "\n"
+        + json.dumps({**record(2), "score": {"accuracy": 0.5}})
+        + "\n"
+        + '{"position": "eng'
+    )
+    store = SubmissionStore(str(path))
+
+    asyncio.run(append_concurrently(store, [record(3)]))
+
+    summary = store.summary()
+    assert summary["submissions"] == 3
+    assert summary["by_position"] == {"designer": 1, "engineer": 2}
+    assert summary["first_submission"] == "2026-10-19T00:00:01Z"
+    assert summary["last_submission"] == "2026-10-19T00:00:03Z"
+    assert summary["mean_accuracy"] == 0.5
+
+    reopened = SubmissionStore(str(path))
+    asyncio.run(append_concurrently(reopened, []))
+    assert reopened.count == 3
+
+
+def test_append_requires_a_running_store(tmp_path):
+    store = SubmissionStore(str(tmp_path / "submissions.jsonl"))
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(store.append(record(1)))
+
+
+def test_write_errors_reach_every_waiter(tmp_path, monkeypatch):
+    store = SubmissionStore(str(tmp_path / "submissions.jsonl"), max_batch_delay=0.05)
+
+    def fail(lines):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(store, "_write_batch", fail)
+
+    async def run():
+        await store.start()
+        try:
+            return await asyncio.gather(
+                *(store.append(record(i)) for i in range(3)), return_exceptions=True
+            )
+        finally:
+            await store.stop()
+
+    results = asyncio.run(run())
+    assert all(isinstance(result, OSError) for result in results)
+    assert store.count == 0
@@ -0,0 +1,69 @@
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from app import crud, models
+from app.worker import tasks
+
+Status = models.JobApplicationStatus
+
+
+@pytest.fixture
+def transitions(monkeypatch):
+    """Records status updates instead of writing them."""
+    calls = []
+
+    def update_job_application_status(
+        db, application_id, status, error_message=None, only_from=None, commit=True
+    ):
+        calls.append((application_id, status, only_from))
+        return SimpleNamespace(id=application_id, status=status)
+
+    monkeypatch.setattr(
+        crud, "update_job_application_status", update_job_application_status
+    )
+    monkeypatch.setattr(tasks.settings, "PROCESSING_STALE_SECONDS", 600)
+    return calls
+
+
+def application(status, seconds_since_update=0):
+    now = datetime.now(timezone.utc)
+    return SimpleNamespace(
+        id=7,
+        status=status,
+        created_at=now - timedelta(hours=1),
+        updated_at=now - timedelta(seconds=seconds_since_update),
+    )
+
+
+@pytest.mark.parametrize("status", crud.PENDING_STATUSES)
+def test_pending_applications_are_processed(transitions, status):
+    assert tasks._should_process(None, application(status))
+    assert transitions == []
+
+
+def test_redelivered_processing_application_of_a_dead_worker_is_failed(transitions):
+    assert not tasks._should_process(None, application(Status.PROCESSING, 3600))
+    assert transitions == [(7, Status.SUBMISSION_FAILED, (Status.PROCESSING,))]
+
+
+def test_processing_application_without_timestamp_counts_as_stale(transitions):
+    stuck = application(Status.PROCESSING)
+    stuck.updated_at = stuck.created_at = None
+
+    assert not tasks._should_process(None, stuck)
+    assert transitions[0][1] == Status.SUBMISSION_FAILED
+
+
+def test_duplicate_delivery_during_a_live_run_is_skipped(transitions):
+    assert not tasks._should_process(None, application(Status.PROCESSING, 30))
+    assert transitions == []
+
+
+@pytest.mark.parametrize(
+    "status", [*crud.SUCCESS_STATUSES, *crud.FAILURE_STATUSES, Status.NEEDS_REVIEW]
+)
+def test_finished_applications_are_skipped(transitions, status):
+    assert not tasks._should_process(None, application(status, 3600))
+    assert transitions == []
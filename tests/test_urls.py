@@ -0,0 +1,60 @@
+import pytest
+
+from app.urls import canonicalize_url
+
+
+@pytest.mark.parametrize(
+    "url, expected",
+    [
+        ("HTTPS://WWW.Example.com/Jobs/42", "https://example.com/Jobs/42"),
+        ("https://example.com:443/jobs/42/", "https://example.com/jobs/42"),
+        ("http://example.com:80/jobs/42", "http://example.com/jobs/42"),
+        ("https://example.com:8443/jobs/42", "https://example.com:8443/jobs/42"),
+        ("https://example.com//jobs///42", "https://example.com/jobs/42"),
+        ("  https://example.com./jobs/42  ", "https://example.com/jobs/42"),
+        ("https://example.com/jobs?b=2&a=1", "https://example.com/jobs?a=1&b=2"),
+        ("https://example.com/jobs/42#apply", "https://example.com/jobs/42"),
+        ("https://example.com/#/jobs/42", "https://example.com#/jobs/42"),
+        ("https://example.com/#!/jobs/42", "https://example.com#!/jobs/42"),
+    ],
+)
+def test_equivalent_forms(url, expected):
+    assert canonicalize_url(url) == expected
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "utm_source=linkedin&utm_campaign=x",
+        "UTM_Medium=email",
+        "gclid=abc",
+        "trk=public_jobs&refId=123",
+        "gh_src=abc123",
+        "lever-origin=applied",
+        "pk_campaign=x&mtm_source=y",
+    ],
+)
+def test_tracking_parameters_are_dropped(query):
+    assert (
+        canonicalize_url(f"https://boards.example.com/acme/jobs/1?gh_jid=7&{query}")
+        == "https://boards.example.com/acme/jobs/1?gh_jid=7"
+    )
+
+
+@pytest.mark.parametrize("name", ["ref", "source", "src"])
+def test_parameters_that_can_select_the_posting_are_kept(name):
+    url = f"https://example.com/apply?{name}=backend"
+    assert canonicalize_url(url) == url
+
+
+def test_blank_values_are_kept():
+    assert (
+        canonicalize_url("https://example.com/jobs?remote=&id=3")
+        == "https://example.com/jobs?id=3&remote="
+    )
+
+
+def test_path_case_is_significant():
+    assert canonicalize_url("https://example.com/Jobs/A") != canonicalize_url(
+        "https://example.com/jobs/a"
+    )